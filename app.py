@@ -1,26 +1,31 @@
 #app.py
 import streamlit as st
-import matplotlib.pyplot as plt
 import pandas as pd
+import numpy as np
 import config
-import time
 from quant_app.data.market_data import get_price
-from quant_app.data.economic_data import get_risk_free_rate
+from quant_app.data.bars import INTERVALS
+from quant_app.data.economic_data import get_risk_free_rate, align_risk_free_rate
 from quant_app.strategies import buy_and_hold, momentum, mean_reversion, regime_switching
-from quant_app.backtesting import metrics
+from quant_app.backtesting import execution, metrics, sweep, walk_forward
 from quant_app.models import forecasting
+from quant_app.core import instrumentation
+from quant_app.core.indicators import IndicatorCache
+from quant_app.core.result_cache import get_default_cache
+from quant_app.core.scheduler import RefreshScheduler
+from quant_app.visualization import charts
 
 #import quant b functions
 from quant_b_app.portfolio_data import get_multi_asset_data
-from quant_b_app.portfolio_strategy import (
-    compute_returns,
-    compute_portfolio_returns,
-    compute_portfolio_value
-)
+from quant_b_app.portfolio_strategy import compute_returns
+from quant_b_app.portfolio_simulation import simulate_portfolio
+from quant_b_app.portfolio_rebalancing import rebalance_portfolio
+from quant_b_app.portfolio_optimizer import optimize_weights, efficient_frontier, estimate_moments
 from quant_b_app.portfolio_metrics import (
     portfolio_volatility,
     portfolio_return,
-    correlation_matrix
+    correlation_matrix,
+    rolling_covariance
 )
 
 # Streamlit configuration
@@ -44,6 +49,50 @@ if st.session_state.last_mode != mode:
 selected_assets = []
 weights = {}
 
+
+@st.cache_resource
+def get_scheduler():
+    """
+    One background scheduler per server process, shared by all the sessions.
+    """
+    return RefreshScheduler(config.WATCHED_TICKERS).start()
+
+
+@st.fragment(run_every=config.LIVE_PANEL_POLL)
+def live_panel(tickers):
+    """
+    Latest background snapshots of the tickers: reading them costs nothing, the computation
+    runs once per ticker and interval in the scheduler whatever the number of sessions.
+    """
+    scheduler = get_scheduler()
+    scheduler.watch(tickers)
+
+    rows = []
+    for ticker in tickers:
+        snapshot = scheduler.latest(ticker)
+        if snapshot is None:
+            rows.append({"Ticker": ticker, "Status": "⏳ pending"})
+        elif snapshot.error:
+            rows.append({"Ticker": ticker, "Status": f"⚠️ {snapshot.error}"})
+        else:
+            sharpe = snapshot.metrics["Sharpe Ratio"]
+            row = {
+                "Ticker": ticker,
+                "Status": f"✅ {snapshot.refreshed_at:%H:%M:%S}",
+                "Last Close": round(float(snapshot.prices.iloc[-1, 0]), 2),
+                "B&H Return": f"{snapshot.metrics.loc['Buy & Hold', 'Total Return']:.2%}",
+                "Best Strategy (Sharpe)": sharpe.idxmax() if sharpe.notna().any() else "N/A",
+                "Invested": ", ".join(snapshot.positions.index[snapshot.positions["Position"] > 0]) or "-"
+            }
+            if snapshot.forecast is not None:
+                row[f"Forecast {len(snapshot.forecast)}d"] = round(float(snapshot.forecast["Forecast"].iloc[-1]), 2)
+            rows.append(row)
+
+    st.subheader("📡 Live data")
+    st.caption(f"Default strategy parameters, refreshed in the background every {config.REFRESH_INTERVAL // 60} min")
+    st.dataframe(pd.DataFrame(rows).set_index("Ticker"))
+
+
 # Layout 
 col_left, col_right = st.columns([3, 1], gap="large")
 
@@ -69,15 +118,27 @@ with col_right:
 
             weight_mode = st.radio(
                 "Weighting scheme",
-                ["Equal weights", "Custom weights"],
+                ["Equal weights", "Custom weights", "Optimized"],
                 key="quant_b_weight_mode"
             )
 
+            if weight_mode == "Optimized":
+                objective = st.selectbox(
+                    "Objective",
+                    ["min_variance", "max_sharpe", "risk_parity"],
+                    key="quant_b_objective"
+                )
+                shrinkage = st.selectbox("Covariance", ["ledoit_wolf", "sample"], key="quant_b_shrinkage")
+                long_only = st.checkbox("Long only", value=True, key="quant_b_long_only")
+
             if selected_assets:
                     if weight_mode == "Equal weights":
                         w = 1 / len(selected_assets)
                         weights = {asset: w for asset in selected_assets}
 
+                    elif weight_mode == "Optimized":
+                        st.caption("Weights computed from the returns when the data is fetched")
+
                     else:
                         st.caption("Custom asset weights (must sum to 1)")
                         remaining = 1.0
@@ -101,8 +162,28 @@ with col_right:
 
                         st.write("Final weights:", weights)
 
+            rebalancing = st.selectbox(
+                "Rebalancing",
+                ["daily", "weekly", "monthly", "threshold"],
+                key="quant_b_rebalancing"
+            )
+            if rebalancing == "threshold":
+                rebalancing_threshold = st.slider("Drift threshold", 0.01, 0.20, 0.05, key="quant_b_threshold")
+            else:
+                rebalancing_threshold = 0.05
+            cost_bps = st.number_input("Transaction cost (bps)", 0.0, 100.0, 0.0, step=1.0, key="quant_b_cost")
+
+            st.markdown("---")
+            st.subheader("🎲 Monte Carlo")
+            enable_simulation = st.checkbox("Simulate future portfolio paths", key="quant_b_simulation")
+            simulation_method = st.selectbox("Model", ["bootstrap", "normal", "student"], key="quant_b_sim_method")
+            simulation_paths = st.select_slider("Paths", [10_000, 50_000, 100_000, 200_000], value=100_000, key="quant_b_sim_paths")
+            simulation_horizon = st.slider("Horizon (days)", 21, 504, 252, key="quant_b_sim_horizon")
+
         elif mode == "Single Asset (Quant A)" :
             ticker = st.text_input("Ticker :", config.DEFAULT_TICKER, key="quant_a_ticker")
+            intervals = list(INTERVALS)[::-1]
+            interval = st.selectbox("Bar interval", intervals, index=intervals.index(config.DEFAULT_INTERVAL), key="quant_a_interval")
             
             st.markdown("---")
             st.subheader("Strategies")
@@ -121,6 +202,13 @@ with col_right:
             st.caption("Regime Switching")
             rs_trend = st.slider("Trend Filter", 100, 300, config.REGIME_TREND_WINDOW, key="rs_trend")
 
+            # Execution costs
+            st.caption("Execution")
+            commission_bps = st.number_input("Commission (bps)", 0.0, 100.0, 0.0, step=1.0, key="quant_a_commission")
+            slippage_bps = st.number_input("Slippage (bps)", 0.0, 100.0, 0.0, step=1.0, key="quant_a_slippage")
+            enable_sweep = st.checkbox("Parameter sweep heatmaps", key="enable_sweep")
+            enable_walk_forward = st.checkbox("Walk-forward evaluation (out-of-sample)", key="enable_walk_forward")
+
             # Forecast
             st.markdown("---")
             st.header("Auto-ARIMA Forecast")
@@ -130,109 +218,171 @@ with col_right:
         fetch_data = st.button("Start the analysis", type="primary")
 
 # Left column : Results
-with col_left:
+# The spans and counters of the hot paths are recorded when QUANT_INSTRUMENTATION=1
+with col_left, instrumentation.recording() as recorder:
+    if auto_refresh:
+        live_panel([ticker] if mode == "Single Asset (Quant A)" else selected_assets)
+
     if fetch_data and mode=="Single Asset (Quant A)":
         try:
             # 1. Data laoding
             with st.spinner('Téléchargement des données...'):
-                df = get_price(ticker, str(start_date), str(end_date))
+                df = get_price(ticker, str(start_date), str(end_date), interval)
 
-            current_rf = get_risk_free_rate()
+            current_rf = get_risk_free_rate(offline=True)
             st.info(f"ℹ️ Risk free rate (US 10Y) : {current_rf:.2%}")
 
             if df.empty:
                 st.warning("⚠️ No data available. Check the ticker or the dates.")
             else:
-                st.success(f"Data fetched for {ticker} ({len(df)} days)")
-            
+                st.success(f"Data fetched for {ticker} ({len(df)} {'days' if interval == '1d' else interval + ' bars'})")
+                if interval != "1d" and df.index[0] > pd.Timestamp(start_date) + pd.Timedelta(days=7):
+                    st.info(f"ℹ️ Intraday bars are only served for the last weeks, the data starts on {df.index[0]:%Y-%m-%d}.")
 
-                # 2. Strategies computation
-                cum_bh = buy_and_hold.buy_and_hold(df)
-                cum_mom = momentum.momentum(df, window_fast=mom_fast, window_slow=mom_slow)
-                cum_mr = mean_reversion.mean_reversion(df, window=mr_window, threshold=mr_thresh)
-                cum_rs = regime_switching.regime_switching(df, trend_window=rs_trend, mom_window=mom_fast, mr_window=mr_window, mr_threshold=mr_thresh)
+                # Time-varying risk free rate over the backtest dates (read from the disk cache)
+                rf_curve = align_risk_free_rate(df.index)
+            
 
-                # 3. Metrics computation
+                # 2. Strategies computation, curves and metrics
+                # Read back from the result cache when these prices and parameters were already analysed
+                execution_model = execution.ExecutionModel(commission=commission_bps / 10_000, slippage=slippage_bps / 10_000)
+
+                def run_strategies():
+                    # The rolling indicators are computed once and shared by the strategies
+                    indicator_cache = IndicatorCache()
+                    signals = {
+                        "Buy & Hold": buy_and_hold.buy_and_hold_signal(df),
+                        "Momentum": momentum.momentum_signal(df, window_fast=mom_fast, window_slow=mom_slow, cache=indicator_cache),
+                        "Mean Reversion": mean_reversion.mean_reversion_signal(df, window=mr_window, threshold=mr_thresh, cache=indicator_cache),
+                        "Regime Switching": regime_switching.regime_switching_signal(df, trend_window=rs_trend, mom_window=mom_fast, mr_window=mr_window, mr_threshold=mr_thresh, cache=indicator_cache)
+                    }
+
+                    # Trades of each strategy, net of commissions and slippage
+                    executions = {name: execution.execute(df, signal, execution_model, indicator_cache) for name, signal in signals.items()}
+                    curves = pd.DataFrame({name: cum_pnl[ticker] for name, (cum_pnl, _) in executions.items()})
+                    return {
+                        "curves": curves,
+                        "metrics": metrics.compute_metrics_batch(curves, risk_free_rate=rf_curve),
+                        "ledger": pd.concat({
+                            name: execution.ledger_frame(ledger, df.index, df.columns).drop(columns="Asset")
+                            for name, (_, ledger) in executions.items()
+                        }, names=["Strategy", "Trade"])
+                    }
+
+                results = get_default_cache().get_or_compute(
+                    [buy_and_hold.buy_and_hold_signal, momentum.momentum_signal, mean_reversion.mean_reversion_signal,
+                     regime_switching.regime_switching_signal, execution.execute, execution.ledger_frame,
+                     metrics.compute_metrics_batch],
+                    [df, rf_curve],
+                    {"mom_fast": mom_fast, "mom_slow": mom_slow, "mr_window": mr_window, "mr_thresh": mr_thresh,
+                     "rs_trend": rs_trend, "execution": execution_model},
+                    run_strategies
+                )
+                strategies_curves, ledgers = results["curves"], results["ledger"]
+
+                # 3. Metrics
                 st.subheader("🏆 Performance comparison")
-                
-                strategies_data = {
-                    "Buy & Hold": metrics.compute_metrics(cum_bh),
-                    "Momentum": metrics.compute_metrics(cum_mom),
-                    "Mean Reversion": metrics.compute_metrics(cum_mr),
-                    "Regime Switching": metrics.compute_metrics(cum_rs)
-                }
-                
-                metrics_df = pd.DataFrame(strategies_data).T 
-                st.table(metrics_df)
+                st.table(metrics.format_metrics(results["metrics"]))
+
+                with st.expander("🧾 Trade ledger"):
+                    trades = ledgers.groupby(level="Strategy", sort=False)["Cost"].agg(Trades="size", Costs="sum")
+                    st.dataframe(trades.reindex(strategies_curves.columns, fill_value=0)
+                                 .style.format({"Trades": "{:.0f}", "Costs": "{:.2%}"}))
+                    st.dataframe(ledgers)
+
+                # Out-of-sample metrics, parameters re-chosen on each rolling train window
+                if enable_walk_forward:
+                    st.subheader("🧪 Walk-forward (out-of-sample)")
+                    with st.spinner("Walk-forward folds in progress..."):
+                        try:
+                            grids = {name: walk_forward.DEFAULT_GRIDS.get(name, {}) for name in strategies_curves.columns}
+
+                            def run_walk_forward():
+                                oos_curves = pd.DataFrame({
+                                    name: walk_forward.walk_forward(df, name, grid=grid, risk_free_rate=rf_curve)[0].iloc[:, 0]
+                                    for name, grid in grids.items()
+                                })
+                                return {"metrics": metrics.compute_metrics_batch(oos_curves, risk_free_rate=rf_curve)}
+
+                            oos_metrics = get_default_cache().get_or_compute(
+                                [walk_forward.walk_forward, metrics.compute_metrics_batch],
+                                [df, rf_curve],
+                                {"strategies": list(grids), "grids": grids},
+                                run_walk_forward
+                            )["metrics"]
+                            st.table(metrics.format_metrics(oos_metrics))
+                        except ValueError as e:
+                            st.warning(f"⚠️ Walk-forward unavailable : {e}")
+
+                # Sharpe surfaces over the slider ranges
+                if enable_sweep:
+                    st.subheader("🔥 Parameter sweep (Sharpe Ratio)")
+                    mom_surface = sweep.momentum_sweep(df, risk_free_rate=rf_curve)["Sharpe Ratio"]
+                    mr_surface = sweep.mean_reversion_sweep(df, risk_free_rate=rf_curve)["Sharpe Ratio"]
+
+                    # pyplot is only loaded for the charts that need it (heatmaps, frontier, Monte Carlo fan)
+                    import matplotlib.pyplot as plt
+                    fig_sweep, (ax_mom, ax_mr) = plt.subplots(1, 2, figsize=(12, 4))
+                    for ax, surface, title in [(ax_mom, mom_surface, "Momentum"), (ax_mr, mr_surface, "Mean Reversion")]:
+                        image = ax.imshow(surface.values, aspect="auto", origin="lower", cmap="RdYlGn",
+                                          extent=[surface.columns[0], surface.columns[-1], surface.index[0], surface.index[-1]])
+                        ax.set_xlabel(surface.columns.name)
+                        ax.set_ylabel(surface.index.name)
+                        ax.set_title(title)
+                        fig_sweep.colorbar(image, ax=ax)
+                    st.pyplot(fig_sweep)
+                    plt.close(fig_sweep)
 
                 # 4. Graphic visualization
                 st.subheader("📈 Évolution du Portefeuille (Base 1.0)")
                 
-                fig2, ax2 = plt.subplots(figsize=(12, 6))
-
-                ax2.plot(cum_bh.index, cum_bh[ticker], label="Buy & Hold", color="green", linewidth=2, alpha=0.6)
-                ax2.plot(cum_mom.index, cum_mom[ticker], label="Momentum", color="red", linewidth=1.5)
-                ax2.plot(cum_mr.index, cum_mr[ticker], label="Mean Reversion", color="blue", linewidth=1.5)
-                ax2.plot(cum_rs.index, cum_rs[ticker], label="Regime Switching", color="purple", linewidth=1.5) 
-                
-                ax2.set_ylabel("Portfolio value")
-                ax2.set_title(f"Comparative Performance : {ticker}")
-                ax2.legend()
-                ax2.grid(True, linestyle='--', alpha=0.3)
-                
-                st.pyplot(fig2)
+                st.image(charts.line_chart(
+                    strategies_curves,
+                    f"Comparative Performance : {ticker}",
+                    ylabel="Portfolio value",
+                    styles={
+                        "Buy & Hold": {"color": "green", "linewidth": 2, "alpha": 0.6},
+                        "Momentum": {"color": "red", "linewidth": 1.5},
+                        "Mean Reversion": {"color": "blue", "linewidth": 1.5},
+                        "Regime Switching": {"color": "purple", "linewidth": 1.5}
+                    }
+                ))
 
                 # 5. Gross price
                 with st.expander("See the gross price chart"):
-                    fig1, ax1 = plt.subplots(figsize=(12, 4))
-                    ax1.plot(df.index, df[ticker], color="black", linewidth=1)
-                    ax1.set_title(f"{ticker} Stock price")
-                    ax1.grid(True, alpha=0.3)
-                    st.pyplot(fig1)
-
-                # ARIMA Forecasting
-                if enable_forecast:
+                    st.image(charts.line_chart(
+                        df,
+                        f"{ticker} Stock price",
+                        styles={ticker: {"color": "black", "linewidth": 1}},
+                        figsize=(12, 4)
+                    ))
+
+                # ARIMA Forecasting (daily bars, the forecast horizon is in days)
+                if enable_forecast and interval != "1d":
+                    st.info("ℹ️ The ARIMA forecast runs on daily bars only.")
+                elif enable_forecast:
                     with st.spinner(f"Auto-ARIMA model calibration in progress..."):
                         price_series = df[ticker]
                         
-                        # 1. Prediction computing
-                        pred_df, model_order = forecasting.forecast_arima(price_series, n_days=forecast_days)
+                        # 1. Prediction computing (read back when this series was already forecast)
+                        def run_forecast():
+                            pred_df, model_order = forecasting.forecast_arima(price_series, n_days=forecast_days, ticker=ticker)
+                            return {"forecast": pred_df, "order": pd.DataFrame([model_order], columns=["p", "d", "q"])}
+
+                        forecast = get_default_cache().get_or_compute(
+                            [forecasting.forecast_arima], [price_series], {"n_days": forecast_days}, run_forecast
+                        )
+                        pred_df, model_order = forecast["forecast"], tuple(int(v) for v in forecast["order"].iloc[0])
                         
                         st.success(f"Calibrated model : ARIMA{model_order}")
 
                         # Prediction graphic
                         st.subheader(f"ARIMA prediction at {forecast_days} days")
-                        fig_pred, ax_pred = plt.subplots(figsize=(12, 5))
-                        
-                        # Historical data
-                        display_hist = price_series.iloc[-180:]
-                        
-                        last_real_date = display_hist.index[-1]
-                        last_real_price = display_hist.iloc[-1]
-                        
-                        plot_pred_dates = [last_real_date] + list(pred_df.index)
-                        plot_pred_values = [last_real_price] + list(pred_df['Forecast'])
-                        
-                        plot_lower = [last_real_price] + list(pred_df['Lower_CI'])
-                        plot_upper = [last_real_price] + list(pred_df['Upper_CI'])
-
-                        # 2. Tracing historic
-                        ax_pred.plot(display_hist.index, display_hist, label="Historic", color="black", linewidth=1.5)
-                        
-                        # 3. Tracing prediction
-                        ax_pred.plot(plot_pred_dates, plot_pred_values, label="Prediction", color="darkorange", linestyle="-", linewidth=2)
-                        
-                        # 4. Confidence interval
-                        ax_pred.fill_between(plot_pred_dates, 
-                                             plot_lower, 
-                                             plot_upper, 
-                                             color='orange', alpha=0.2, label="Intervalle de Confiance (95%)")
-                        
-                        ax_pred.set_title(f"Projection du prix {ticker} (Modèle ARIMA {model_order})")
-                        ax_pred.legend(loc="upper left")
-                        ax_pred.grid(True, linestyle='--', alpha=0.3)
-                        
-                        st.pyplot(fig_pred)
+                        st.image(charts.forecast_chart(
+                            price_series.iloc[-180:],
+                            pred_df,
+                            f"Projection du prix {ticker} (Modèle ARIMA {model_order})"
+                        ))
 
         except Exception as e:
             st.error(f"An error occured : {e}")
@@ -250,45 +400,41 @@ with col_left:
         # 2. Returns
         returns = compute_returns(prices)
 
-        # 3. Portfolio returns
-        port_ret = compute_portfolio_returns(returns, weights)
-
-        # 4. Portfolio value (base 100)
-        port_val = compute_portfolio_value(port_ret)
-
-        fig, ax = plt.subplots(figsize=(12, 6))
-
-        # Assets
-        for asset in selected_assets:
-            ax.plot(
-                prices.index,
-                prices[asset] / prices[asset].iloc[0] * 100,
-                alpha=0.5,
-                label=asset
-            )
-
-        # Portfolio
-        ax.plot(
-            port_val.index,
-            port_val,
-            color="black",
-            linewidth=2.5,
-            label="Portfolio"
+        if weight_mode == "Optimized":
+            weights = optimize_weights(returns, objective, shrinkage, long_only=long_only)
+            st.write("Optimized weights:", {asset: round(w, 4) for asset, w in weights.items()})
+
+        # 3. Portfolio value (base 100), rebalanced to the weights with drift and costs
+        rebalanced = rebalance_portfolio(
+            prices,
+            weights,
+            schedule=rebalancing,
+            threshold=rebalancing_threshold,
+            cost=cost_bps / 10_000
         )
-
-        ax.set_title("Multi-Asset Portfolio vs Individual Assets (Base 100)")
-        ax.set_ylabel("Value")
-        ax.legend()
-        ax.grid(True, linestyle="--", alpha=0.3)
-
-        st.pyplot(fig)
+        port_ret = rebalanced["returns"]
+        port_val = rebalanced["value"]
+
+        # Assets and portfolio (base 100)
+        price_frame = prices.to_frame()
+        performance = price_frame / price_frame.iloc[0] * 100
+        performance["Portfolio"] = port_val
+        st.image(charts.line_chart(
+            performance,
+            "Multi-Asset Portfolio vs Individual Assets (Base 100)",
+            ylabel="Value",
+            styles={
+                **{asset: {"alpha": 0.5} for asset in selected_assets},
+                "Portfolio": {"color": "black", "linewidth": 2.5}
+            }
+        ))
 
         st.subheader("📐 Portfolio Metrics")
 
         col1, col2, col3 = st.columns(3)
 
         with col1:
-            st.metric("Annual Return", f"{portfolio_return(port_ret):.2%}")
+            st.metric("Annual Return", f"{portfolio_return(port_val):.2%}")
 
         with col2:
             st.metric("Volatility", f"{portfolio_volatility(port_ret):.2%}")
@@ -296,15 +442,101 @@ with col_left:
         with col3:
             st.metric("Nb Assets", len(selected_assets))
 
-        st.subheader("🔗 Correlation Matrix")
-        corr = correlation_matrix(returns)
-        st.dataframe(corr)
-# Automated refresh every 5min
-if auto_refresh:
-    time.sleep(300)
-    st.rerun
+        col1, col2, col3 = st.columns(3)
+
+        with col1:
+            st.metric("Rebalances", len(rebalanced["turnover"]) - 1)
 
+        with col2:
+            st.metric("Turnover (total)", f"{rebalanced['turnover'].sum():.2%}")
 
+        with col3:
+            st.metric("Costs", f"{rebalanced['costs'].sum():.2f}")
 
+        st.subheader("🔗 Correlation Matrix")
+        corr = correlation_matrix(returns)
+        st.dataframe(corr)
 
+        if len(selected_assets) > 1 and len(returns) > config.CORRELATION_WINDOW:
+            st.subheader("🔄 Rolling Correlations")
+            cube = rolling_covariance(returns, window=config.CORRELATION_WINDOW)
+            st.line_chart(cube.average().rename(f"Average pairwise correlation ({config.CORRELATION_WINDOW} days)"))
 
+            corr_date = st.select_slider(
+                "Correlation date",
+                options=list(cube.dates.date),
+                value=cube.dates[-1].date(),
+                key="quant_b_corr_date"
+            )
+            st.dataframe(cube.at(corr_date).round(2))
+
+        if len(selected_assets) > 1:
+            st.subheader("📈 Efficient Frontier")
+            if weight_mode != "Optimized":
+                shrinkage, long_only = "ledoit_wolf", True
+            frontier = efficient_frontier(returns, shrinkage=shrinkage, long_only=long_only)
+            moments = estimate_moments(returns, shrinkage)
+            w_current = np.array([weights.get(asset, 0.0) for asset in moments["assets"]])
+
+            import matplotlib.pyplot as plt
+            fig_frontier, ax_frontier = plt.subplots(figsize=(10, 5))
+            ax_frontier.plot(frontier["Volatility"], frontier["Return"], color="steelblue", linewidth=2, label="Efficient frontier")
+            ax_frontier.scatter(
+                np.sqrt(np.diag(moments["cov"])),
+                moments["mean"],
+                color="gray",
+                alpha=0.7,
+                label="Assets"
+            )
+            ax_frontier.scatter(
+                np.sqrt(w_current @ moments["cov"] @ w_current),
+                w_current @ moments["mean"],
+                color="red",
+                s=80,
+                label="Portfolio"
+            )
+            ax_frontier.set_xlabel("Volatility (annualized)")
+            ax_frontier.set_ylabel("Expected Return (annualized)")
+            ax_frontier.legend()
+            ax_frontier.grid(True, linestyle="--", alpha=0.3)
+            st.pyplot(fig_frontier)
+            plt.close(fig_frontier)
+
+        if enable_simulation:
+            st.subheader("🎲 Monte Carlo Simulation")
+            with st.spinner("Simulation in progress..."):
+                simulation = simulate_portfolio(
+                    returns,
+                    weights,
+                    n_paths=simulation_paths,
+                    horizon=simulation_horizon,
+                    method=simulation_method
+                )
+
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("VaR 95%", f"{simulation['VaR']:.2%}")
+            with col2:
+                st.metric("CVaR 95%", f"{simulation['CVaR']:.2%}")
+            with col3:
+                st.metric("Median Max Drawdown", f"{simulation['drawdown_quantiles'][0.5]:.2%}")
+
+            fan = simulation["fan"]
+            import matplotlib.pyplot as plt
+            fig_fan, ax_fan = plt.subplots(figsize=(12, 5))
+            ax_fan.fill_between(fan.index, fan[0.05], fan[0.95], color="steelblue", alpha=0.2, label="5% - 95%")
+            ax_fan.fill_between(fan.index, fan[0.25], fan[0.75], color="steelblue", alpha=0.4, label="25% - 75%")
+            ax_fan.plot(fan.index, fan[0.5], color="black", linewidth=2, label="Median")
+            ax_fan.set_title(f"Simulated Portfolio Value ({simulation_paths:,} paths, base 100)")
+            ax_fan.set_xlabel("Days")
+            ax_fan.legend(loc="upper left")
+            ax_fan.grid(True, linestyle="--", alpha=0.3)
+            st.pyplot(fig_fan)
+            plt.close(fig_fan)
+
+    # Timing panel
+    if instrumentation.ENABLED and fetch_data:
+        with st.expander("⏱️ Timings"):
+            st.dataframe(recorder.summary().round(3))
+            if recorder.counters:
+                st.dataframe(pd.Series(recorder.counters, name="Value").sort_index())
@@ -0,0 +1,361 @@
+#benchmarks/run_benchmarks.py
+import sys
+import os
+import gc
+import atexit
+import json
+import time
+import platform
+import argparse
+import datetime
+import tempfile
+import itertools
+import subprocess
+import tracemalloc
+
+# Fully offline: empty local store, csv provider without fixtures (no yfinance call).
+# Always a dedicated store removed on exit, the benchmarks never write in a real QUANT_DATA_DIR
+_data_dir = tempfile.TemporaryDirectory(prefix="quant_bench_")
+atexit.register(_data_dir.cleanup)
+os.environ["QUANT_DATA_DIR"] = _data_dir.name
+os.environ["QUANT_PRICE_PROVIDER"] = "csv"
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import numpy as np
+import pandas as pd
+from benchmarks.synthetic import synthetic_prices
+from quant_app.strategies.buy_and_hold import buy_and_hold
+from quant_app.strategies.momentum import momentum, momentum_signal
+from quant_app.strategies.mean_reversion import mean_reversion
+from quant_app.strategies.regime_switching import regime_switching
+from quant_app.strategies import kernels
+from quant_app.backtesting.execution import ExecutionModel, execute
+from quant_app.backtesting.metrics import compute_metrics, compute_metrics_batch
+from quant_app.data.bars import Bars
+from quant_app.data.panel import PricePanel
+from quant_app.models.forecasting import forecast_arima
+from quant_b_app import portfolio_optimizer
+from quant_b_app.portfolio_strategy import compute_returns, compute_portfolio_returns
+from quant_b_app.portfolio_rebalancing import rebalance_portfolio
+from quant_b_app.portfolio_simulation import simulate_portfolio
+from quant_b_app.portfolio_metrics import rolling_covariance
+
+HISTORY_PATH = os.path.join(os.path.dirname(__file__), 'history.json')
+
+# Scale -> (rows, tickers) of the synthetic price panels, each scale includes the smaller ones
+SCALES = {
+    "small": [(1_000, 1), (10_000, 1), (100_000, 1), (1_000, 10), (2_520, 100)],
+    "medium": [(1_000_000, 1), (2_520, 1_000)],
+    "large": [(10_000_000, 1), (2_520, 5_000)]
+}
+
+# Module -> import time budget (seconds, fresh interpreter): what a cron job or a pool worker pays before any work
+IMPORT_BUDGETS = {
+    "quant_app.data.market_data": 1.0,
+    "quant_app.backtesting.batch": 1.0,
+    "quant_app.models.forecasting": 1.0,
+    "quant_app.visualization.charts": 1.0,
+    "quant_app.core.scheduler": 1.0,
+    "quant_b_app.portfolio_optimizer": 1.0,
+    "scripts.daily_report": 1.0
+}
+# Heavy dependencies loaded on first use only, importing the compute packages must not load them
+LAZY_MODULES = ("streamlit", "pmdarima", "matplotlib", "yfinance", "scipy")
+
+_forecast_keys = itertools.count()
+
+
+def _equal_weights(prices):
+    return {ticker: 1 / prices.shape[1] for ticker in prices.columns}
+
+
+def _metrics_case(prices):
+    curves = buy_and_hold(prices)
+    if curves.shape[1] == 1:
+        return lambda: compute_metrics(curves, risk_free_rate=0.0)
+    return lambda: compute_metrics_batch(curves, risk_free_rate=0.0)
+
+
+def _portfolio_returns_case(prices):
+    returns, weights = compute_returns(prices), _equal_weights(prices)
+    return lambda: compute_portfolio_returns(returns, weights)
+
+
+def _simulation_case(prices):
+    returns, weights = compute_returns(prices), _equal_weights(prices)
+    return lambda: simulate_portfolio(returns, weights, n_paths=20_000, seed=0)
+
+
+def _rolling_covariance_case(prices):
+    returns = compute_returns(prices)
+    return lambda: rolling_covariance(returns)
+
+
+def _optimizer_case(prices, frontier=False):
+    # Cold run: the covariance estimates are cached per return matrix
+    portfolio_optimizer._moments_cache.clear()
+    returns = compute_returns(prices)
+    if frontier:
+        return lambda: portfolio_optimizer.efficient_frontier(returns)
+    return lambda: portfolio_optimizer.optimize_weights(returns, "max_sharpe")
+
+
+def _execution_case(prices):
+    signal = momentum_signal(prices)
+    model = ExecutionModel(commission=0.001, slippage=0.0005)
+    return lambda: execute(prices, signal, model)
+
+
+def _kernel_case(prices, dtype):
+    # Curves written in place into a preallocated output, with a workspace already sized by a first run:
+    # the peak memory measured is what each further call allocates
+    values = kernels.panel_values(prices, dtype)
+    out, workspace = np.empty_like(values), kernels.Workspace()
+    kernels.strategy_curves("Regime Switching", values, out=out, workspace=workspace)
+    return lambda: kernels.strategy_curves("Regime Switching", values, out=out, workspace=workspace)
+
+
+def _resample_case(prices):
+    bars = Bars.from_frame(prices.iloc[:, :1].set_axis(["Close"], axis=1))
+    return lambda: bars.resample("1h")
+
+
+def _forecast_case(prices):
+    # A new cache key per run: the Auto-ARIMA search is measured, not the model cache
+    key = f"bench-{next(_forecast_keys)}"
+    return lambda: forecast_arima(prices.iloc[:, 0], ticker=key)
+
+
+# Benchmark name -> (applies to (rows, tickers), setup(prices) returning the timed call)
+CASES = {
+    "buy_and_hold": (lambda rows, tickers: True, lambda prices: lambda: buy_and_hold(prices)),
+    "momentum": (lambda rows, tickers: True, lambda prices: lambda: momentum(prices)),
+    "mean_reversion": (lambda rows, tickers: True, lambda prices: lambda: mean_reversion(prices)),
+    "regime_switching": (lambda rows, tickers: True, lambda prices: lambda: regime_switching(prices)),
+    "execute": (lambda rows, tickers: True, _execution_case),
+    "regime_switching_kernel": (lambda rows, tickers: True, lambda prices: _kernel_case(prices, np.float64)),
+    "regime_switching_kernel_f32": (lambda rows, tickers: tickers > 1, lambda prices: _kernel_case(prices, np.float32)),
+    "compute_metrics": (lambda rows, tickers: tickers == 1, _metrics_case),
+    "compute_metrics_batch": (lambda rows, tickers: tickers > 1, _metrics_case),
+    "compute_returns": (lambda rows, tickers: tickers > 1, lambda prices: lambda: compute_returns(prices)),
+    "panel_returns": (
+        lambda rows, tickers: tickers > 1,
+        lambda prices: lambda: compute_returns(PricePanel.from_frame(prices))
+    ),
+    "compute_portfolio_returns": (lambda rows, tickers: tickers > 1, _portfolio_returns_case),
+    "rebalance_portfolio": (
+        lambda rows, tickers: tickers > 1,
+        lambda prices: lambda: rebalance_portfolio(prices, _equal_weights(prices), schedule="monthly", cost=0.001)
+    ),
+    "simulate_portfolio": (lambda rows, tickers: 1 < tickers <= 1_000, _simulation_case),
+    "rolling_covariance": (lambda rows, tickers: 1 < tickers <= 100, _rolling_covariance_case),
+    "optimize_weights": (lambda rows, tickers: 1 < tickers <= 1_000, _optimizer_case),
+    "efficient_frontier": (lambda rows, tickers: 1 < tickers <= 1_000, lambda prices: _optimizer_case(prices, frontier=True)),
+    "resample_bars": (lambda rows, tickers: tickers == 1, _resample_case),
+    "forecast_arima": (lambda rows, tickers: tickers == 1 and rows <= 1_000, _forecast_case)
+}
+
+
+def measure(setup, prices, repeat):
+    """
+    Best and median wall time over repeat runs, then peak traced memory (MB) of one more run.
+    Each run gets a fresh setup, so the caches of a previous run are not measured.
+    The garbage collector is paused during the timed calls, like timeit.
+    """
+    timings = []
+    for _ in range(repeat):
+        call = setup(prices)
+        gc.collect()
+        gc.disable()
+        try:
+            t0 = time.perf_counter()
+            call()
+            timings.append(time.perf_counter() - t0)
+        finally:
+            gc.enable()
+
+    call = setup(prices)
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        call()
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+    return min(timings), float(np.median(timings)), peak / 1024 ** 2
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(__file__), check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_history(path, history):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(history, f, indent=1)
+    os.replace(tmp_path, path)
+
+
+def run_benchmarks(scale="small", names=None, repeat=3, seed=0, output=HISTORY_PATH):
+    """
+    Run the benchmarks of every scale up to scale and append the run to the JSON history.
+    """
+    sizes = []
+    for name in SCALES:
+        sizes += SCALES[name]
+        if name == scale:
+            break
+    names = names or list(CASES)
+
+    print(f"⏱️ Benchmarks ({scale}, seed {seed}, {repeat} runs) : {datetime.datetime.now()}")
+    results = []
+    for rows, tickers in sizes:
+        cases = [name for name in names if CASES[name][0](rows, tickers)]
+        if not cases:
+            continue
+        prices = synthetic_prices(rows, tickers, seed=seed)
+        for name in cases:
+            best, median, peak = measure(CASES[name][1], prices, repeat)
+            results.append({"name": name, "rows": rows, "tickers": tickers, "best_s": best, "median_s": median, "peak_mb": peak})
+            print(f"🔹 {name:<26} {rows:>10,} x {tickers:<6,} best {best:>9.4f} s  median {median:>9.4f} s  peak {peak:>9.1f} MB")
+        del prices
+
+    run = {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "scale": scale,
+        "seed": seed,
+        "repeat": repeat,
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "results": results
+    }
+    history = load_history(output)
+    history.append(run)
+    save_history(output, history)
+    print(f"✅ {len(results)} benchmarks wrote in {output} (run {len(history) - 1})")
+    return run
+
+
+def compare_runs(baseline, candidate, threshold=0.25, min_time=0.005, min_memory=1.0):
+    """
+    Regressions of candidate against baseline, matched on (name, rows, tickers):
+    best time or peak memory more than threshold above the baseline. Changes below min_time seconds
+    or min_memory MB are noise. Returns one row per common benchmark.
+    """
+    base = {(r["name"], r["rows"], r["tickers"]): r for r in baseline["results"]}
+    rows = []
+    for result in candidate["results"]:
+        key = (result["name"], result["rows"], result["tickers"])
+        if key not in base:
+            continue
+        before = base[key]
+        time_ratio = result["best_s"] / before["best_s"] if before["best_s"] > 0 else np.nan
+        memory_ratio = result["peak_mb"] / before["peak_mb"] if before["peak_mb"] > 0 else np.nan
+        slower = result["best_s"] > before["best_s"] * (1 + threshold) and result["best_s"] - before["best_s"] > min_time
+        heavier = result["peak_mb"] > before["peak_mb"] * (1 + threshold) and result["peak_mb"] - before["peak_mb"] > min_memory
+        rows.append({
+            "name": key[0], "rows": key[1], "tickers": key[2],
+            "time_ratio": time_ratio, "memory_ratio": memory_ratio,
+            "regression": slower or heavier
+        })
+    return rows
+
+
+def compare_history(baseline=-2, candidate=-1, threshold=0.25, path=HISTORY_PATH):
+    history = load_history(path)
+    if len(history) < 2:
+        raise ValueError(f"At least two runs are needed in {path} to compare")
+
+    rows = compare_runs(history[baseline], history[candidate], threshold)
+    print(f"📊 Run {history[candidate]['timestamp']} ({history[candidate]['commit']}) vs "
+          f"{history[baseline]['timestamp']} ({history[baseline]['commit']}), threshold {threshold:.0%}")
+    for row in rows:
+        flag = "❌" if row["regression"] else "✅"
+        print(f"{flag} {row['name']:<26} {row['rows']:>10,} x {row['tickers']:<6,} "
+              f"time x{row['time_ratio']:.2f}  memory x{row['memory_ratio']:.2f}")
+
+    regressions = [row for row in rows if row["regression"]]
+    print(f"{'⚠️' if regressions else '✅'} {len(regressions)} regression(s) on {len(rows)} benchmarks")
+    return regressions
+
+
+def measure_import(module, repeat=3):
+    """
+    Best import time of module in fresh interpreters (startup excluded) and the LAZY_MODULES it loaded.
+    """
+    code = (
+        "import sys, time, json; t0 = time.perf_counter(); import " + module + "; "
+        "print(json.dumps([time.perf_counter() - t0, [m for m in " + repr(LAZY_MODULES) + " if m in sys.modules]]))"
+    )
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    timings, loaded = [], []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=root, check=True).stdout
+        seconds, loaded = json.loads(output.strip().splitlines()[-1])
+        timings.append(seconds)
+    return min(timings), loaded
+
+
+def check_imports(budgets=IMPORT_BUDGETS, repeat=3):
+    """
+    Compare the import time of each module with its budget. Returns the modules over budget
+    or loading a heavy dependency eagerly.
+    """
+    print(f"📦 Import times ({repeat} fresh interpreters each) : {datetime.datetime.now()}")
+    failures = []
+    for module, budget in budgets.items():
+        seconds, loaded = measure_import(module, repeat)
+        failed = seconds > budget or bool(loaded)
+        if failed:
+            failures.append(module)
+        eager = f"  eager: {', '.join(loaded)}" if loaded else ""
+        print(f"{'❌' if failed else '✅'} {module:<34} {seconds:>7.3f} s  budget {budget:.1f} s{eager}")
+    print(f"{'⚠️' if failures else '✅'} {len(failures)} module(s) over budget on {len(budgets)}")
+    return failures
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmarks of the strategies, metrics, portfolio and forecasting hot paths")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run the benchmarks and append them to the history")
+    run.add_argument("--scale", choices=list(SCALES), default="small", help="largest synthetic panels to run")
+    run.add_argument("--only", nargs="+", choices=list(CASES), help="benchmarks to run (default: all)")
+    run.add_argument("--repeat", type=int, default=3, help="timed runs per benchmark")
+    run.add_argument("--seed", type=int, default=0, help="seed of the synthetic prices")
+    run.add_argument("--output", default=HISTORY_PATH, help="JSON history file")
+
+    compare = commands.add_parser("compare", help="flag regressions between two runs of the history")
+    compare.add_argument("--baseline", type=int, default=-2, help="index of the baseline run (default: the previous one)")
+    compare.add_argument("--candidate", type=int, default=-1, help="index of the compared run (default: the last one)")
+    compare.add_argument("--threshold", type=float, default=0.25, help="relative slowdown flagged as a regression")
+    compare.add_argument("--history", default=HISTORY_PATH, help="JSON history file")
+
+    imports = commands.add_parser("imports", help="check the import time budgets of the compute modules")
+    imports.add_argument("--repeat", type=int, default=3, help="fresh interpreters per module")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.command == "run":
+        run_benchmarks(args.scale, args.only, args.repeat, args.seed, args.output)
+    elif args.command == "imports":
+        sys.exit(1 if check_imports(repeat=args.repeat) else 0)
+    else:
+        regressions = compare_history(args.baseline, args.candidate, args.threshold, args.history)
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,62 @@
+#benchmarks/synthetic.py
+import numpy as np
+import pandas as pd
+
+# Regime -> (annual drift, annual volatility)
+REGIMES = {
+    "bull": (0.12, 0.15),
+    "bear": (-0.20, 0.35)
+}
+# Longest business-day index pandas can represent from 1990, longer series use a minute index
+MAX_DAILY_ROWS = 60_000
+
+
+def regime_path(n_rows, rng, mean_duration=(500, 120)):
+    """
+    Markov chain of market regimes (0 = bull, 1 = bear) with geometric durations, one state per row.
+    """
+    durations = []
+    total, state = 0, 0
+    while total < n_rows:
+        duration = int(rng.geometric(1 / mean_duration[state]))
+        durations.append((state, duration))
+        total += duration
+        state = 1 - state
+
+    states, lengths = zip(*durations)
+    return np.repeat(np.array(states, dtype=np.int8), lengths)[:n_rows]
+
+
+def synthetic_prices(n_rows, n_tickers=1, seed=0, start="1990-01-01", regimes=True, market_beta=0.6,
+                     periods_per_year=252) -> pd.DataFrame:
+    """
+    Seeded geometric Brownian motion prices (dates x tickers), the same seed gives the same prices.
+    With regimes, drift and volatility follow a bull/bear Markov chain shared by all tickers,
+    and each ticker loads market_beta on a common market shock (correlated universe).
+    The index is business days, or minutes for series too long for a daily calendar.
+    """
+    rng = np.random.default_rng(seed)
+    if regimes:
+        states = regime_path(n_rows, rng)
+    else:
+        states = np.zeros(n_rows, dtype=np.int8)
+    drift = np.array([REGIMES["bull"][0], REGIMES["bear"][0]])[states][:, None] / periods_per_year
+    vol = np.array([REGIMES["bull"][1], REGIMES["bear"][1]])[states][:, None] / np.sqrt(periods_per_year)
+
+    # 1. Correlated shocks: market factor + idiosyncratic part
+    shocks = rng.standard_normal((n_rows, n_tickers))
+    shocks *= np.sqrt(1 - market_beta ** 2)
+    shocks += market_beta * rng.standard_normal((n_rows, 1))
+
+    # 2. Log returns then prices, computed in place
+    shocks *= vol
+    shocks += drift - vol ** 2 / 2
+    shocks[0] = 0.0
+    np.cumsum(shocks, axis=0, out=shocks)
+    np.exp(shocks, out=shocks)
+    shocks *= 100
+
+    freq = "B" if n_rows <= MAX_DAILY_ROWS else "min"
+    index = pd.date_range(start, periods=n_rows, freq=freq, name="Date")
+    columns = [f"SYN{i:04d}" for i in range(n_tickers)]
+    return pd.DataFrame(shocks, index=index, columns=columns, copy=False)
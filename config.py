@@ -1,4 +1,5 @@
 #config.py
+import os
 import datetime
 
 # General Configuration
@@ -6,10 +7,24 @@ APP_TITLE = "Quantitative Strategy Analyzer"
 DEFAULT_TICKER = "AAPL"
 DEFAULT_START_DATE = datetime.date(2020, 1, 1)
 DEFAULT_END_DATE = datetime.date.today()
+DEFAULT_INTERVAL = "1d"  # bar interval of the single asset analysis ("1m", "5m", "15m", "30m", "1h", "1d")
 
 # Portfolio Configuration
 PORTFOLIO_TICKERS = ["AAPL", "MSFT", "GOOGL", "AMZN", "META"]
 
+# Daily Report Configuration
+REPORT_TICKERS = PORTFOLIO_TICKERS
+REPORT_WORKERS = 8
+REPORT_BATCH_SIZE = 50  # tickers downloaded in one provider call
+
+# Background Refresh Configuration
+WATCHED_TICKERS = list(dict.fromkeys([DEFAULT_TICKER] + PORTFOLIO_TICKERS))
+REFRESH_INTERVAL = 300  # seconds between two refreshes of a watched ticker
+REFRESH_WORKERS = 4
+REFRESH_FORECAST_DAYS = 30  # 0 disables the background ARIMA forecasts
+WATCH_EXPIRY_INTERVALS = 3  # refresh intervals after which a ticker no session reads anymore is dropped
+LIVE_PANEL_POLL = 30  # seconds between two reads of the latest snapshots by a session
+
 # Applications's default parameters
 # 1. Momentum
 MOMENTUM_WINDOW_FAST = 20
@@ -24,4 +39,43 @@ REGIME_TREND_WINDOW = 200
 
 # Analysis Parameters
 TRADING_DAYS = 252 
-RISK_FREE_RATE = 0.4
+SESSION_MINUTES = 390  # minutes of a trading session (9:30 - 16:00), annualization of the intraday bars
+RISK_FREE_RATE = 0.04
+RISK_FREE_TICKER = "^TNX"
+RISK_FREE_HISTORY_START = "1990-01-01"
+RISK_FREE_TTL = 12 * 3600  # seconds between two refreshes of the risk free rate curve
+INDICATOR_CACHE_MAX_BYTES = 256 * 1024 ** 2  # memory bound of the indicators shared by the strategies
+CORRELATION_WINDOW = 63  # days of the rolling correlations of the portfolio view
+
+# Charts
+CHART_MAX_POINTS = 2000  # points drawn per series, about the horizontal resolution of a screen
+CHART_DPI = 100
+CHART_CACHE_MAX_BYTES = 64 * 1024 ** 2  # rendered PNG charts kept in memory
+
+# Data Storage
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.environ.get("QUANT_DATA_DIR", os.path.join(BASE_DIR, "data_store"))
+PRICE_STORE_DIR = os.path.join(DATA_DIR, "prices")
+# "yahoo" downloads missing ranges, "csv" reads local fixtures (offline and reproducible backtests)
+PRICE_PROVIDER = os.environ.get("QUANT_PRICE_PROVIDER", "yahoo")
+PRICE_FIXTURE_DIR = os.environ.get("QUANT_PRICE_FIXTURES", os.path.join(DATA_DIR, "fixtures"))
+PRICE_CACHE_TTL = 300  # seconds a price frame returned by get_price is reused from memory
+
+# Forecasting
+MODEL_CACHE_DIR = os.path.join(DATA_DIR, "models")
+MODEL_CACHE_MAX_BYTES = 256 * 1024 ** 2  # fitted models kept on disk, least recently used evicted first
+ARIMA_RESEARCH_DAYS = 7  # full Auto-ARIMA order search at least this often
+ARIMA_DEGRADATION_RATIO = 1.5  # re-search when recent residuals exceed this ratio of the fit error
+
+# Result Cache
+# Equity curves and metrics keyed by a hash of the prices, strategy code and parameters (Parquet, LRU by size)
+RESULT_CACHE_DIR = os.path.join(DATA_DIR, "results")
+RESULT_CACHE_MAX_BYTES = 512 * 1024 ** 2
+
+# Online Strategies
+# Incremental strategy states per ticker (JSON), advanced by the background refresh and the daily report
+ONLINE_STATE_DIR = os.path.join(DATA_DIR, "online")
+
+# Instrumentation
+# "1" records the wall time, calls and cache hits of the hot paths (timing panel, report logs), off by default
+INSTRUMENTATION = os.environ.get("QUANT_INSTRUMENTATION", "0") == "1"
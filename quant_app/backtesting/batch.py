@@ -0,0 +1,129 @@
+# backtesting/batch.py
+import numpy as np
+import pandas as pd
+import config
+from quant_app.core.indicators import IndicatorCache
+from quant_app.core.result_cache import ResultCache
+from quant_app.data.panel import PricePanel
+from quant_app.backtesting.metrics import compute_metrics_batch, _resolve_risk_free_rate
+from quant_app.strategies.buy_and_hold import buy_and_hold
+from quant_app.strategies.momentum import momentum
+from quant_app.strategies.mean_reversion import mean_reversion
+from quant_app.strategies.regime_switching import regime_switching
+from quant_app.strategies import kernels
+
+# Max number of prices per chunk (~32 MB of float64), each strategy allocates a few frames of this size
+MAX_CHUNK_VALUES = 4_000_000
+
+# Strategy name -> (function, default parameters)
+STRATEGIES = {
+    "Buy & Hold": (buy_and_hold, {}),
+    "Momentum": (momentum, {
+        "window_fast": config.MOMENTUM_WINDOW_FAST,
+        "window_slow": config.MOMENTUM_WINDOW_SLOW
+    }),
+    "Mean Reversion": (mean_reversion, {
+        "window": config.MEAN_REVERSION_WINDOW,
+        "threshold": config.MEAN_REVERSION_THRESHOLD
+    }),
+    "Regime Switching": (regime_switching, {
+        "trend_window": config.REGIME_TREND_WINDOW,
+        "mom_window": config.MOMENTUM_WINDOW_FAST,
+        "mr_window": config.MEAN_REVERSION_WINDOW,
+        "mr_threshold": config.MEAN_REVERSION_THRESHOLD
+    }),
+}
+
+
+def _backtest_chunk(chunk, strategies, chunk_params, risk_free_rate, execution, values=None, workspace=None):
+    """
+    Metrics of the strategies on a chunk of tickers, rows grouped by ticker in the order of the chunk.
+    With values (the chunk as an assets x bars array), the low-memory kernels compute the curves
+    in a scratch array of the workspace instead of the DataFrame strategies.
+    """
+    # Indicators shared by the strategies of the chunk, dropped with it
+    cache = IndicatorCache()
+    chunk_tables = {}
+    for name in strategies:
+        if values is None:
+            function = STRATEGIES[name][0]
+            cum_pnl = function(chunk, cache=cache, execution=execution, **chunk_params[name])
+            chunk_tables[name] = compute_metrics_batch(cum_pnl, risk_free_rate=risk_free_rate)
+        else:
+            curves = kernels.strategy_curves(name, values, chunk_params[name], execution,
+                                             out=workspace.array("curves", values.shape), workspace=workspace)
+            chunk_tables[name] = compute_metrics_batch(curves, index=chunk.index, risk_free_rate=risk_free_rate,
+                                                       names=chunk.columns)
+
+    table = pd.concat(chunk_tables, names=["Strategy", "Ticker"]).swaplevel()
+    rows = pd.MultiIndex.from_product([chunk.columns, strategies], names=["Ticker", "Strategy"])
+    return table.reindex(rows)
+
+
+def batch_backtest(prices: pd.DataFrame, strategies=None, params=None, chunk_size=None, risk_free_rate=None,
+                   execution=None, result_cache: ResultCache = None, low_memory=False, dtype=np.float64) -> pd.DataFrame:
+    """
+    Run the strategies over a price panel (dates x tickers) and compute the metrics of every ticker.
+    The strategies work column-wise on the whole panel, processed in chunks of tickers to bound the memory.
+
+    Args:
+        prices (pd.DataFrame): DataFrame with dates as index and one column per ticker, or a PricePanel
+            (its filled prices, read without copy)
+        strategies (list): names from STRATEGIES, all of them by default
+        params (dict): strategy name -> parameters overriding the defaults
+        chunk_size (int): number of tickers per chunk, derived from MAX_CHUNK_VALUES by default
+        risk_free_rate: constant, rate series or None (stored curve), resolved once for the whole panel
+        execution (ExecutionModel): commissions and slippage paid on the trades, frictionless by default
+        result_cache (ResultCache): metrics of the chunks already backtested are read back from it
+            (keyed by the chunk prices, strategies and parameters), nothing is persisted by default
+        low_memory (bool): run the array kernels (strategies.kernels) on blocks of tickers, in reused
+            scratch arrays, instead of the DataFrame strategies: the memory used is a small multiple
+            of the price panel, the metrics are the same
+        dtype: dtype of the price array of the low-memory mode, np.float32 halves it
+            (no copy when prices already has this dtype)
+
+    Returns:
+        pd.DataFrame: one row per (Ticker, Strategy), one numeric column per metric
+    """
+    if isinstance(prices, PricePanel):
+        # View of the panel array, which is already the (assets x bars) layout of the kernels
+        prices = prices.to_frame()
+    if prices.empty:
+        raise ValueError("Prices DataFrame is empty")
+
+    strategies = list(STRATEGIES) if strategies is None else list(strategies)
+    params = params or {}
+    unknown = [name for name in strategies if name not in STRATEGIES]
+    if unknown:
+        raise ValueError(f"Unknown strategies: {unknown}")
+
+    risk_free_rate = _resolve_risk_free_rate(risk_free_rate, prices.index)
+    if chunk_size is None:
+        chunk_size = kernels.block_rows(len(prices)) if low_memory else max(1, MAX_CHUNK_VALUES // len(prices))
+    panel = kernels.panel_values(prices, dtype) if low_memory else None
+    workspace = kernels.Workspace() if low_memory else None
+
+    # Full parameters of each strategy, part of the result cache keys
+    chunk_params = {name: {**STRATEGIES[name][1], **params.get(name, {})} for name in strategies}
+
+    tables = []
+    for start in range(0, prices.shape[1], chunk_size):
+        chunk = prices.iloc[:, start:start + chunk_size]
+        values = None if panel is None else panel[start:start + chunk_size]
+
+        def run_chunk():
+            return _backtest_chunk(chunk, strategies, chunk_params, risk_free_rate, execution, values, workspace)
+
+        if result_cache is None:
+            tables.append(run_chunk())
+        else:
+            functions = [STRATEGIES[name][0] for name in strategies] + [compute_metrics_batch]
+            key_params = {"params": chunk_params, "risk_free_rate": risk_free_rate, "execution": execution}
+            if low_memory:
+                functions.append(kernels.strategy_curves)
+                key_params["dtype"] = np.dtype(dtype).str
+            tables.append(result_cache.get_or_compute(
+                functions, [chunk], key_params, lambda: {"metrics": run_chunk()}
+            )["metrics"])
+
+    return pd.concat(tables)
@@ -0,0 +1,189 @@
+# backtesting/execution.py
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+from quant_app.core import indicators
+from quant_app.core.instrumentation import timed
+
+SLIPPAGE_MODELS = ("fixed", "volatility")
+
+# One row per trade (run of non-zero position of an asset). exit = -1 while the trade is still open.
+# Prices are the fill prices (slippage included), size the position at entry (fraction of the equity)
+# and cost the commissions and slippage of all the fills of the trade (fraction of the equity).
+LEDGER_DTYPE = np.dtype([
+    ("asset", np.int32),
+    ("entry", np.int32),
+    ("exit", np.int32),
+    ("entry_price", np.float64),
+    ("exit_price", np.float64),
+    ("size", np.float64),
+    ("cost", np.float64)
+])
+
+
+@dataclass(frozen=True)
+class ExecutionModel:
+    """
+    Trading frictions applied to the position changes, filled at the close of the signal bar.
+    - commission: fraction of the traded notional (0.001 = 10 bps)
+    - commission_per_share: currency per share traded, i.e. commission_per_share / price of the notional
+    - slippage: "fixed" model: fraction of the price paid on each fill,
+      "volatility" model: multiple of the rolling volatility of the returns (slippage_window bars)
+    - size: position per unit of signal, as a fraction of the equity
+    """
+    commission: float = 0.0
+    commission_per_share: float = 0.0
+    slippage: float = 0.0
+    slippage_model: str = "fixed"
+    slippage_window: int = 20
+    size: float = 1.0
+
+    def __post_init__(self):
+        if self.slippage_model not in SLIPPAGE_MODELS:
+            raise ValueError(f"Unknown slippage model '{self.slippage_model}', expected one of {SLIPPAGE_MODELS}")
+        if min(self.commission, self.commission_per_share, self.slippage) < 0:
+            raise ValueError("Commissions and slippage must be positive")
+        if self.slippage_window < 2:
+            raise ValueError("The slippage window needs at least 2 bars")
+
+
+def apply_signal(prices: pd.DataFrame, signal: pd.DataFrame, cache: indicators.IndicatorCache = None,
+                 execution: ExecutionModel = None) -> pd.DataFrame:
+    """
+    Cumulative PnL of a position signal (dates x assets) decided at each close and held over the next bar.
+    Without execution model, frictionless one-line return calculation; with one, see execute.
+    """
+    if execution is None:
+        strategy_returns = signal.shift(1) * indicators.daily_returns(prices, cache)
+        return (1 + strategy_returns).cumprod()
+    return execute(prices, signal, execution, cache)[0]
+
+
+def _slippage(prices, model, cache):
+    """
+    Slippage of a fill on each bar, as a fraction of the price: a constant or an (assets x bars) array.
+    """
+    if model.slippage_model == "fixed" or model.slippage == 0:
+        return model.slippage
+    returns = indicators.daily_returns(prices, cache)
+    volatility = indicators.rolling_std(returns, model.slippage_window, cache).to_numpy(dtype=float).T
+    return np.nan_to_num(volatility * model.slippage, nan=0.0)
+
+
+def _ledger(positions, fill_assets, fill_bars, fill_delta, fill_prices, fill_costs):
+    """
+    Trades from the fills (position changes, sorted by asset then bar like np.nonzero returns them).
+    A fill from a flat position opens a trade, a fill back to a flat position closes it: between two
+    entries of an asset there is only the fills of one trade, so the trade costs are sums of consecutive fills.
+    A fill through zero (e.g. long to short) is split into an exit and an entry at the same price,
+    its costs shared in proportion of the two legs.
+    """
+    n_assets, n_bars = positions.shape
+    after = positions[fill_assets, fill_bars]
+    before = after - fill_delta
+    reversal = before * after < 0
+    if reversal.any():
+        legs = np.repeat(np.arange(len(after)), np.where(reversal, 2, 1))
+        is_exit_leg = reversal[legs] & np.r_[True, legs[1:] != legs[:-1]]
+        is_entry_leg = reversal[legs] & ~is_exit_leg
+        fill_assets, fill_bars, fill_prices = fill_assets[legs], fill_bars[legs], fill_prices[legs]
+        before, after, fill_delta, fill_costs = before[legs], after[legs], fill_delta[legs], fill_costs[legs]
+        leg_delta = np.where(is_exit_leg, -before, np.where(is_entry_leg, after, fill_delta))
+        fill_costs = fill_costs * np.abs(leg_delta) / np.abs(fill_delta)
+        after = np.where(is_exit_leg, 0.0, after)
+        fill_delta = leg_delta
+    is_entry = after == fill_delta
+    is_exit = after == 0
+    entries = np.flatnonzero(is_entry)
+    exits = np.flatnonzero(is_exit)
+
+    ledger = np.empty(len(entries), dtype=LEDGER_DTYPE)
+    ledger["asset"] = fill_assets[entries]
+    ledger["entry"] = fill_bars[entries]
+    ledger["entry_price"] = fill_prices[entries]
+    ledger["size"] = after[entries]
+    ledger["cost"] = np.add.reduceat(fill_costs, entries) if len(entries) else 0.0
+
+    # The k-th exit of an asset closes its k-th entry, the last entry may still be open
+    entry_assets = ledger["asset"]
+    rank = np.arange(len(entries)) - np.searchsorted(entry_assets, entry_assets)
+    closed = rank < np.bincount(fill_assets[exits], minlength=n_assets)[entry_assets]
+    ledger["exit"] = -1
+    ledger["exit"][closed] = fill_bars[exits]
+    ledger["exit_price"] = np.nan
+    ledger["exit_price"][closed] = fill_prices[exits]
+    return ledger
+
+
+@timed("backtest.execute")
+def execute(prices: pd.DataFrame, signal: pd.DataFrame, model: ExecutionModel = None,
+            cache: indicators.IndicatorCache = None):
+    """
+    Simulate the execution of a position signal (dates x assets, 0/1 or any position per unit of equity).
+    Position changes are filled at the close of the signal bar, paying commissions and slippage,
+    and the position is held over the next bar. Everything is computed on (assets x bars) arrays,
+    the costs only on the fills.
+
+    Returns:
+        (pd.DataFrame, np.ndarray): cumulative PnL net of costs (like the strategies) and the trade ledger (LEDGER_DTYPE)
+    """
+    model = model or ExecutionModel()
+    if prices.empty:
+        raise ValueError("Prices DataFrame is empty")
+
+    # 1. Positions and fills (position changes)
+    positions = signal.to_numpy(dtype=float).T
+    missing = np.isnan(positions)
+    if model.size != 1 or missing.any():
+        positions = np.where(missing, 0.0, positions * model.size)
+    delta = np.empty(positions.shape)
+    delta[:, 0] = positions[:, 0]
+    np.subtract(positions[:, 1:], positions[:, :-1], out=delta[:, 1:])
+    fill_assets, fill_bars = np.nonzero(delta)
+    fill_delta = delta[fill_assets, fill_bars]
+    del delta
+
+    # 2. Fill prices (slippage against the trade) and costs, as a fraction of the equity
+    values = prices.to_numpy(dtype=float).T
+    fill_values = values[fill_assets, fill_bars]
+    slippage = _slippage(prices, model, cache)
+    if np.ndim(slippage):
+        slippage = slippage[fill_assets, fill_bars]
+    fill_prices = fill_values * (1 + np.sign(fill_delta) * slippage)
+    cost_rate = model.commission + slippage
+    if model.commission_per_share:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cost_rate = cost_rate + np.nan_to_num(model.commission_per_share / fill_values, nan=0.0, posinf=0.0)
+    fill_costs = np.abs(fill_delta) * cost_rate
+
+    # 3. Equity: returns of the position held over each bar, minus the costs of the bar's fills
+    returns = np.zeros(values.shape)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        np.divide(values[:, 1:], values[:, :-1], out=returns[:, 1:])
+    returns[:, 1:] -= 1
+    np.copyto(returns, 0.0, where=np.isnan(returns))
+    returns[:, 1:] *= positions[:, :-1]
+    returns[fill_assets, fill_bars] -= fill_costs
+    returns += 1
+    np.multiply.accumulate(returns, axis=1, out=returns)
+
+    cum_pnl = pd.DataFrame(returns.T, index=prices.index, columns=prices.columns, copy=False)
+    return cum_pnl, _ledger(positions, fill_assets, fill_bars, fill_delta, fill_prices, fill_costs)
+
+
+def ledger_frame(ledger: np.ndarray, index, columns) -> pd.DataFrame:
+    """
+    Presentation step: ledger with asset names and dates, and the return of each closed trade (fill prices).
+    """
+    exits = ledger["exit"]
+    closed = exits >= 0
+    return pd.DataFrame({
+        "Asset": np.asarray(columns)[ledger["asset"]],
+        "Entry": np.asarray(index)[ledger["entry"]],
+        "Exit": pd.DatetimeIndex(np.where(closed, np.asarray(index)[np.maximum(exits, 0)], np.datetime64("NaT"))),
+        "Entry Price": ledger["entry_price"],
+        "Exit Price": ledger["exit_price"],
+        "Size": ledger["size"],
+        "Cost": ledger["cost"],
+        "Return": ledger["size"] * (ledger["exit_price"] / ledger["entry_price"] - 1)
+    })
@@ -1,62 +1,157 @@
 #backtesting/metrics.py
 import numpy as np
+import pandas as pd
 import config
-from quant_app.data.economic_data import get_risk_free_rate
+from quant_app.core.instrumentation import timed
+from quant_app.data import bars
+from quant_app.data.economic_data import align_risk_free_rate
 
-def compute_metrics(cum_returns_df, risk_free_rate=None):
+METRIC_NAMES = ["Total Return", "CAGR", "Volatility", "Sharpe Ratio", "Max Drawdown"]
+
+# Display format of each metric, used by format_metrics
+METRIC_FORMATS = {
+    "Total Return": "{:.2%}",
+    "CAGR": "{:.2%}",
+    "Volatility": "{:.2%}",
+    "Sharpe Ratio": "{:.2f}",
+    "Max Drawdown": "{:.2%}"
+}
+
+
+@timed("metrics.compute_metrics")
+def compute_metrics(cum_returns_df, risk_free_rate=None, periods_per_year=None):
     """
-    Compute perfomance metrics:
+    Compute perfomance metrics of the first column of cum_returns_df:
     - Total Returns
     - Compound Annual Growth Rate (CAGR)
     - Volatility
     - Sharpe Ratio
     - Max Drawdown
+    Returns a dict of floats (NaN when there is not enough data), see format_metrics to display it.
+    """
+    return compute_metrics_batch(cum_returns_df.iloc[:, :1], risk_free_rate=risk_free_rate,
+                                 periods_per_year=periods_per_year).iloc[0].to_dict()
+
+
+@timed("metrics.compute_metrics_batch")
+def compute_metrics_batch(curves, index=None, risk_free_rate=None, names=None, periods_per_year=None):
+    """
+    Compute the performance metrics of many equity curves (base 1.0) in one vectorized pass.
+
+    Args:
+        curves: DataFrame (dates x curves) or 2-D array (curves x dates)
+        index: dates of an array input (a DataFrame uses its own index)
+        risk_free_rate: constant rate, rate series (time-varying) or None to read the stored curve
+        names: row labels of an array input (a DataFrame uses its columns)
+        periods_per_year: bars per year used to annualize, None to infer it from the bar spacing of the index
+
+    Returns:
+        pd.DataFrame: one row per curve, one numeric column per metric
     """
-    
+    if isinstance(curves, pd.DataFrame):
+        index = curves.index
+        names = curves.columns
+        values = curves.fillna(1.0).to_numpy(dtype=float).T
+    else:
+        values = np.nan_to_num(np.atleast_2d(np.asarray(curves, dtype=float)), nan=1.0)
+        if index is None:
+            raise ValueError("An index of dates is needed to annualize array curves")
+
     # Security checks
-    series = cum_returns_df.iloc[:, 0].fillna(1.0)
-    if series.empty or len(series) < 2:
-        return {k: "N/A" for k in ["Total Return", "CAGR", "Volatility", "Sharpe Ratio", "Max Drawdown"]}
+    if values.shape[1] < 2:
+        return pd.DataFrame(np.nan, index=names, columns=METRIC_NAMES)
 
     # Risk free rate recuperation
+    rf_rate = _resolve_risk_free_rate(risk_free_rate, index)
+
+    years = _years(index)
+    if periods_per_year is None:
+        periods_per_year = bars.periods_per_year(index)
+    return pd.DataFrame(_metrics_arrays(values, years, rf_rate, periods_per_year), index=names, columns=METRIC_NAMES)
+
+
+def _years(index):
+    """
+    Length of the backtest in years (intraday bars included).
+    """
+    return (index[-1] - index[0]) / pd.Timedelta(days=365.25)
+
+
+def _resolve_risk_free_rate(risk_free_rate, index):
+    """
+    Average annual risk free rate over the backtest dates.
+    risk_free_rate is a constant, a rate series (aligned on the dates) or None (stored curve, no download:
+    the scheduler loop and the daily report refresh it).
+    The mean excess return of a time-varying rate only depends on its average, so the Sharpe Ratio uses it.
+    """
     if risk_free_rate is None:
-        rf_rate = get_risk_free_rate() 
-    else:
-        rf_rate = risk_free_rate
+        risk_free_rate = align_risk_free_rate(index)
+    if np.ndim(risk_free_rate) == 0:
+        return float(risk_free_rate)
+    if isinstance(risk_free_rate, pd.Series):
+        dates = risk_free_rate.index.union(index)
+        aligned = risk_free_rate.reindex(dates).ffill().reindex(index)
+        risk_free_rate = aligned.fillna(risk_free_rate.dropna().iloc[0] if risk_free_rate.notna().any() else config.RISK_FREE_RATE)
+    return float(np.mean(risk_free_rate))
+
+
+def format_metrics(metrics):
+    """
+    Presentation step: format numeric metrics (dict or DataFrame) as strings, "N/A" for missing values.
+    """
+    def _format(name, value):
+        if pd.isna(value):
+            return "N/A"
+        return METRIC_FORMATS.get(name, "{:.4g}").format(value)
+
+    if isinstance(metrics, pd.DataFrame):
+        return pd.DataFrame({name: [_format(name, v) for v in metrics[name]] for name in metrics.columns}, index=metrics.index)
+    return {name: _format(name, value) for name, value in metrics.items()}
+
+
+def _metrics_arrays(curves, years, risk_free_rate, periods_per_year=config.TRADING_DAYS, rets=None):
+    """
+    Vectorized version of the computations of compute_metrics.
+    curves is an array of equity curves (base 1.0) with the time on the last axis.
+    rets (optional) are the period returns behind the curves, when the caller already has them.
+    Returns a dict of arrays with the shape of curves without its last axis.
+    """
+    curves = np.asarray(curves, dtype=float)
+    n = curves.shape[-1]
 
     # 1. Total Return
-    total_return = series.iloc[-1] - 1
-    
+    total_return = curves[..., -1] - 1
+
     # 2. CAGR
-    start_date = series.index[0]
-    end_date = series.index[-1]
-    days = (end_date - start_date).days
-    years = days / 365.25
-    if years > 0.1: 
-        cagr = (series.iloc[-1] / series.iloc[0]) ** (1 / years) - 1
+    if years > 0.1:
+        cagr = (curves[..., -1] / curves[..., 0]) ** (1 / years) - 1
     else:
-        cagr = 0
+        cagr = np.zeros(curves.shape[:-1])
+
+    # 3. Vol (first return is 0, like pct_change().fillna(0))
+    if rets is None:
+        rets = np.zeros(curves.shape)
+        np.divide(curves[..., 1:], curves[..., :-1], out=rets[..., 1:])
+        rets[..., 1:] -= 1
+    mean = rets.sum(axis=-1) / n
+    sum_sq = np.einsum("...i,...i->...", rets, rets)
+    variance = np.maximum(sum_sq - n * mean ** 2, 0) / (n - 1)
+    volatility = np.sqrt(variance * periods_per_year)
+    annualized_return = mean * periods_per_year
 
-    # 3. Vol
-    daily_rets = series.pct_change().fillna(0)
-    volatility = daily_rets.std() * np.sqrt(config.TRADING_DAYS)
-    annualized_return = daily_rets.mean() * config.TRADING_DAYS
-    
     # 4. Sharpe Ratio
-    if volatility > 0:
-        sharpe = (annualized_return - rf_rate) / volatility
-    else:
-        sharpe = 0
-        
+    sharpe = np.zeros(volatility.shape)
+    np.divide(annualized_return - risk_free_rate, volatility, out=sharpe, where=volatility > 0)
+
     # 5. Max Drawdown
-    running_max = series.cummax()
-    drawdown = (series - running_max) / running_max
-    max_drawdown = drawdown.min()
-    
+    running_max = np.maximum.accumulate(curves, axis=-1)
+    np.divide(curves, running_max, out=running_max)
+    max_drawdown = running_max.min(axis=-1) - 1
+
     return {
-        "Total Return": f"{total_return:.2%}",
-        "CAGR": f"{cagr:.2%}",
-        "Volatility": f"{volatility:.2%}",
-        "Sharpe Ratio": f"{sharpe:.2f}",
-        "Max Drawdown": f"{max_drawdown:.2%}"
-    }
\ No newline at end of file
+        "Total Return": total_return,
+        "CAGR": cagr,
+        "Volatility": volatility,
+        "Sharpe Ratio": sharpe,
+        "Max Drawdown": max_drawdown
+    }
@@ -0,0 +1,135 @@
+# backtesting/search.py
+import math
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from quant_app.backtesting.metrics import compute_metrics, _resolve_risk_free_rate
+from quant_app.core.indicators import IndicatorCache
+from quant_app.strategies.regime_switching import regime_switching, REGIMES
+
+# Parameter name -> candidate values of the regime switching strategy
+REGIME_SWITCHING_SPACE = {
+    "trend_window": list(range(100, 301, 10)),
+    "mom_window": list(range(5, 51)),
+    "mr_window": list(range(10, 51)),
+    "mr_threshold": [round(x, 1) for x in np.arange(1.0, 4.01, 0.1)],
+    "regime": list(REGIMES)
+}
+
+# Prices and indicator cache of a worker process, set once by _init_worker
+_worker_prices = None
+_worker_cache = None
+
+
+def _init_worker(prices):
+    global _worker_prices, _worker_cache
+    _worker_prices = prices
+    _worker_cache = IndicatorCache()
+
+
+def _evaluate(params, n_bars, risk_free_rate):
+    """
+    Score one candidate on the last n_bars of the history.
+    The strategy runs with a warm-up of its longest window before the scored bars,
+    and the equity curve is rebased to 1.0 at the first scored bar.
+    """
+    prices = _worker_prices
+    warmup = max(params["trend_window"], params["mom_window"], params["mr_window"])
+    start = max(0, len(prices) - n_bars)
+    window = prices.iloc[max(0, start - warmup):]
+
+    cum_pnl = regime_switching(window, cache=_worker_cache, **params).fillna(1.0)
+    scored = cum_pnl.iloc[-(len(prices) - start):]
+    scored = scored / scored.iloc[0]
+    return compute_metrics(scored, risk_free_rate=risk_free_rate)
+
+
+def _sample_candidates(space, n_candidates, rng):
+    """
+    Distinct random parameter sets (at most the size of the space).
+    """
+    size = math.prod(len(values) for values in space.values())
+    n_candidates = min(n_candidates, size)
+
+    candidates = []
+    seen = set()
+    while len(candidates) < n_candidates:
+        params = {name: values[rng.integers(len(values))] for name, values in space.items()}
+        key = tuple(params.values())
+        if key not in seen:
+            seen.add(key)
+            candidates.append({name: (value.item() if hasattr(value, "item") else value) for name, value in params.items()})
+    return candidates
+
+
+def successive_halving(prices: pd.DataFrame, space=None, n_candidates=81, eta=3, min_bars=252,
+                       metric="Sharpe Ratio", seed=0, max_workers=None, risk_free_rate=None, top_k=10) -> pd.DataFrame:
+    """
+    Adaptive hyperparameter search of the regime switching strategy (successive halving).
+    Random candidates are scored on a short recent history, the best 1/eta of them move on to a
+    history eta times longer, until the survivors are scored on the full history.
+    Candidates are evaluated in a process pool, each worker receives the prices once.
+
+    Args:
+        prices (pd.DataFrame): one column of prices, e.g. read offline from the local price store
+        space (dict): parameter name -> candidate values, REGIME_SWITCHING_SPACE by default
+        n_candidates (int): number of random candidates of the first rung
+        eta (int): reduction factor between two rungs
+        min_bars (int): history length of the first rung
+        metric (str): metric to maximize
+        seed (int): seed of the candidate sampling, the search is reproducible
+        max_workers (int): size of the process pool, 1 to evaluate in the current process
+        risk_free_rate: constant, rate series or None (stored curve, no download)
+        top_k (int): number of configurations returned
+
+    Returns:
+        pd.DataFrame: best configurations of the last rung, their parameters and metrics
+    """
+    if prices.empty:
+        raise ValueError("Prices DataFrame is empty")
+    if eta < 2:
+        raise ValueError("eta must be at least 2")
+
+    space = space or REGIME_SWITCHING_SPACE
+    prices = prices.iloc[:, :1]
+    rng = np.random.default_rng(seed)
+    risk_free_rate = _resolve_risk_free_rate(risk_free_rate, prices.index)
+
+    # Rungs: history lengths growing by eta up to the full history
+    n_rungs = 1
+    while min_bars * eta ** n_rungs < len(prices) and n_candidates // eta ** n_rungs >= 1:
+        n_rungs += 1
+    budgets = [min(len(prices), min_bars * eta ** i) for i in range(n_rungs - 1)] + [len(prices)]
+
+    candidates = _sample_candidates(space, n_candidates, rng)
+    survivors = list(range(len(candidates)))
+
+    executor = None
+    if max_workers == 1:
+        _init_worker(prices)
+    else:
+        executor = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(prices,))
+
+    def run(tasks):
+        if executor is None:
+            return [_evaluate(*task) for task in tasks]
+        return list(executor.map(_evaluate, *zip(*tasks)))
+
+    try:
+        for rung, n_bars in enumerate(budgets):
+            results = run([(candidates[i], n_bars, risk_free_rate) for i in survivors])
+            scores = [result[metric] for result in results]
+
+            # NaN scores rank last, ties keep the sampling order (reproducible)
+            order = sorted(range(len(survivors)), key=lambda k: (-np.nan_to_num(scores[k], nan=-np.inf), k))
+            if rung < len(budgets) - 1:
+                n_keep = max(1, len(survivors) // eta)
+                survivors = [survivors[k] for k in order[:n_keep]]
+            else:
+                rows = []
+                for k in order[:top_k]:
+                    rows.append({**candidates[survivors[k]], **results[k], "History (bars)": n_bars})
+                return pd.DataFrame(rows)
+    finally:
+        if executor is not None:
+            executor.shutdown()
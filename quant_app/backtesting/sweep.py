@@ -0,0 +1,183 @@
+# backtesting/sweep.py
+import numpy as np
+import pandas as pd
+from quant_app.backtesting.metrics import _metrics_arrays, _resolve_risk_free_rate, _years
+from quant_app.data.bars import periods_per_year
+
+# Max number of float64 values per batch (~8 MB, stays cache friendly), the grid is processed in chunks of rows
+MAX_BATCH_VALUES = 1_000_000
+
+
+def _price_array(prices):
+    """
+    First column of a prices DataFrame (or a Series) as a float array, with its index.
+    """
+    series = prices.iloc[:, 0] if isinstance(prices, pd.DataFrame) else prices
+    if series.empty:
+        raise ValueError("Prices DataFrame is empty")
+    return series.to_numpy(dtype=float), series.index
+
+
+def _gaps(values):
+    """
+    Values with the missing ones set to 0 (so they do not spread through the cumulative sums),
+    and the cumulative count of missing values with a leading 0 (None without any), as in strategies.kernels.
+    """
+    missing = np.isnan(values)
+    if not missing.any():
+        return values, None
+    return np.where(missing, 0.0, values), np.concatenate(([0], np.cumsum(missing)))
+
+
+def _mask_gaps(result, gaps, w):
+    """
+    NaN on the windows holding a missing value (pandas rolling with min_periods=window).
+    """
+    if gaps is not None:
+        result[w - 1:][gaps[w:] - gaps[:-w] > 0] = np.nan
+
+
+def rolling_means(values, windows):
+    """
+    Rolling means of values for several windows from one cumulative sum.
+    Returns an array (len(windows), len(values)), NaN until each window is full and on the windows
+    holding a missing value.
+    """
+    n = len(values)
+    values, gaps = _gaps(values)
+    csum = np.concatenate(([0.0], np.cumsum(values)))
+    means = np.full((len(windows), n), np.nan)
+    for i, w in enumerate(windows):
+        if w <= n:
+            means[i, w - 1:] = (csum[w:] - csum[:-w]) / w
+            _mask_gaps(means[i], gaps, w)
+    return means
+
+
+def rolling_stds(values, windows):
+    """
+    Rolling standard deviations (ddof=1, like pandas) for several windows from cumulative sums.
+    Values are centered first to limit the cancellation error of the sum of squares.
+    """
+    n = len(values)
+    centered = values - np.nanmean(values)
+    centered, gaps = _gaps(centered)
+    csum = np.concatenate(([0.0], np.cumsum(centered)))
+    csum_sq = np.concatenate(([0.0], np.cumsum(centered ** 2)))
+    stds = np.full((len(windows), n), np.nan)
+    for i, w in enumerate(windows):
+        if 1 < w <= n:
+            s1 = csum[w:] - csum[:-w]
+            s2 = csum_sq[w:] - csum_sq[:-w]
+            var = np.maximum((s2 - s1 ** 2 / w) / (w - 1), 0.0)
+            stds[i, w - 1:] = np.sqrt(var)
+            _mask_gaps(stds[i], gaps, w)
+    return stds
+
+
+def _forward_fill(state):
+    """
+    Forward fill NaN along the last axis, then replace the leading NaN by 0 (ffill().fillna(0)).
+    """
+    n = state.shape[-1]
+    positions = np.where(np.isnan(state), 0, np.arange(n))
+    np.maximum.accumulate(positions, axis=-1, out=positions)
+    filled = np.take_along_axis(state, positions, axis=-1)
+    return np.nan_to_num(filled, nan=0.0)
+
+
+def _grid_metrics(signals, daily_returns, years, risk_free_rate, bars_per_year):
+    """
+    Apply the signals on the next bar, compound the strategy returns and compute their metrics.
+    """
+    strategy_returns = np.zeros(signals.shape)
+    np.multiply(signals[..., :-1], daily_returns[1:], out=strategy_returns[..., 1:])
+    curves = strategy_returns + 1
+    np.multiply.accumulate(curves, axis=-1, out=curves)
+    return _metrics_arrays(curves, years, risk_free_rate, bars_per_year, rets=strategy_returns)
+
+
+def _daily_returns(values):
+    daily_returns = np.zeros(len(values))
+    daily_returns[1:] = values[1:] / values[:-1] - 1
+    return np.nan_to_num(daily_returns, nan=0.0)
+
+
+def _surfaces(results, row_labels, col_labels, row_name, col_name):
+    surfaces = {}
+    for name, values in results.items():
+        surface = pd.DataFrame(values, index=pd.Index(row_labels, name=row_name), columns=pd.Index(col_labels, name=col_name))
+        surfaces[name] = surface
+    return surfaces
+
+
+def momentum_sweep(prices, fast_windows=range(5, 51), slow_windows=range(20, 201), risk_free_rate=None) -> dict:
+    """
+    Evaluate the momentum strategy for every (window_fast, window_slow) pair in batched NumPy passes.
+    Returns a dict metric name -> DataFrame (fast windows x slow windows), ready to draw as a heatmap.
+    """
+    values, index = _price_array(prices)
+    fast_windows = list(fast_windows)
+    slow_windows = list(slow_windows)
+
+    risk_free_rate = _resolve_risk_free_rate(risk_free_rate, index)
+
+    # 1. Indicators, one rolling mean per distinct window
+    ma_fast = rolling_means(values, fast_windows)
+    ma_slow = rolling_means(values, slow_windows)
+    daily_returns = _daily_returns(values)
+    years = _years(index)
+    bars_per_year = periods_per_year(index)
+
+    # 2. Grid, processed by chunks of fast windows to bound the memory
+    n = len(values)
+    chunk = max(1, MAX_BATCH_VALUES // (len(slow_windows) * n))
+    results = {}
+    for start in range(0, len(fast_windows), chunk):
+        # Signal: 1 if rolling mean fast > rolling mean slow, else 0 (NaN comparisons are False)
+        with np.errstate(invalid="ignore"):
+            signals = ma_fast[start:start + chunk, None, :] > ma_slow[None, :, :]
+        for name, metric in _grid_metrics(signals, daily_returns, years, risk_free_rate, bars_per_year).items():
+            results.setdefault(name, []).append(metric)
+
+    results = {name: np.concatenate(parts, axis=0) for name, parts in results.items()}
+    return _surfaces(results, fast_windows, slow_windows, "window_fast", "window_slow")
+
+
+def mean_reversion_sweep(prices, windows=range(10, 51), thresholds=np.arange(1.0, 4.01, 0.1), risk_free_rate=None) -> dict:
+    """
+    Evaluate the mean reversion strategy for every (window, threshold) pair in batched NumPy passes.
+    Returns a dict metric name -> DataFrame (windows x thresholds), ready to draw as a heatmap.
+    """
+    values, index = _price_array(prices)
+    windows = list(windows)
+    thresholds = np.round(np.asarray(thresholds, dtype=float), 10)
+
+    risk_free_rate = _resolve_risk_free_rate(risk_free_rate, index)
+
+    # 1. Indicators, one z-score per distinct window
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z_scores = (values - rolling_means(values, windows)) / rolling_stds(values, windows)
+    daily_returns = _daily_returns(values)
+    years = _years(index)
+    bars_per_year = periods_per_year(index)
+
+    # 2. Grid, processed by chunks of windows to bound the memory
+    n = len(values)
+    chunk = max(1, MAX_BATCH_VALUES // (len(thresholds) * n))
+    results = {}
+    for start in range(0, len(windows), chunk):
+        z = z_scores[start:start + chunk, None, :]
+
+        # Signal, buy when very low, sell when it's back at rolling mean
+        state = np.full((z.shape[0], len(thresholds), n), np.nan)
+        with np.errstate(invalid="ignore"):
+            state[z < -thresholds[None, :, None]] = 1.0
+            state[np.broadcast_to(z >= 0, state.shape)] = 0.0
+        signals = _forward_fill(state)
+
+        for name, metric in _grid_metrics(signals, daily_returns, years, risk_free_rate, bars_per_year).items():
+            results.setdefault(name, []).append(metric)
+
+    results = {name: np.concatenate(parts, axis=0) for name, parts in results.items()}
+    return _surfaces(results, windows, thresholds, "window", "threshold")
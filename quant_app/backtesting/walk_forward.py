@@ -0,0 +1,182 @@
+# backtesting/walk_forward.py
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from quant_app.backtesting.batch import STRATEGIES
+from quant_app.backtesting.metrics import compute_metrics, compute_metrics_batch, _resolve_risk_free_rate
+from quant_app.backtesting.sweep import momentum_sweep, mean_reversion_sweep
+from quant_app.core.indicators import IndicatorCache
+
+# Strategy name -> parameter grid explored on each training window (coarse version of the app sliders)
+DEFAULT_GRIDS = {
+    "Buy & Hold": {},
+    "Momentum": {
+        "window_fast": list(range(5, 51, 5)),
+        "window_slow": list(range(20, 201, 20))
+    },
+    "Mean Reversion": {
+        "window": list(range(10, 51, 5)),
+        "threshold": [1.0, 1.5, 2.0, 2.5, 3.0, 3.5, 4.0]
+    },
+    "Regime Switching": {
+        "trend_window": [100, 150, 200, 250, 300],
+        "mom_window": [10, 20, 30],
+        "mr_window": [10, 20, 30],
+        "mr_threshold": [1.5, 2.0, 2.5]
+    }
+}
+
+# Strategies whose grid is scored by a vectorized sweep: name -> (sweep, row parameter, column parameter)
+SWEEPS = {
+    "Momentum": (momentum_sweep, "window_fast", "window_slow"),
+    "Mean Reversion": (mean_reversion_sweep, "window", "threshold")
+}
+
+# Read-only prices of a worker process, attached once by _init_worker
+_worker = {}
+
+
+def make_folds(n_bars, train_bars, test_bars, expanding=False):
+    """
+    Positions (train_start, test_start, test_end) of the walk-forward folds.
+    Rolling folds keep a train window of train_bars, expanding folds always start at 0.
+    Test windows follow each other without overlap.
+    """
+    folds = []
+    test_start = train_bars
+    while test_start < n_bars:
+        train_start = 0 if expanding else test_start - train_bars
+        folds.append((train_start, test_start, min(test_start + test_bars, n_bars)))
+        test_start += test_bars
+    return folds
+
+
+def _init_worker(shm_name, shape, dtype, index, columns):
+    """
+    Attach the shared price buffer (no copy) and wrap it in a read-only DataFrame.
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    values = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    values.flags.writeable = False
+    _worker["shm"] = shm
+    _worker["prices"] = pd.DataFrame(values, index=index, columns=columns, copy=False)
+    _worker["cache"] = IndicatorCache()
+
+
+def _run_fold(strategy, grid, fold, metric, risk_free_rate):
+    """
+    Choose the parameters on the train window, then run them up to the end of the test window.
+    The test run starts at the train window, so the indicators are warmed up with past data only.
+    Returns the chosen parameters, their train score and the daily returns of the test window.
+    """
+    prices, cache = _worker["prices"], _worker["cache"]
+    function, default_params = STRATEGIES[strategy]
+    train_start, test_start, test_end = fold
+
+    # 1. Train: score every candidate of the grid
+    train = prices.iloc[train_start:test_start]
+    if strategy in SWEEPS and set(grid) == set(SWEEPS[strategy][1:]):
+        # Whole grid in one batched NumPy pass
+        sweep, row_param, col_param = SWEEPS[strategy]
+        surface = sweep(train, grid[row_param], grid[col_param], risk_free_rate=risk_free_rate)[metric]
+        scores = np.nan_to_num(surface.to_numpy(), nan=-np.inf)
+        row, col = np.unravel_index(scores.argmax(), scores.shape)
+        best_params = {row_param: surface.index[row].item(), col_param: surface.columns[col].item()}
+        train_score = float(surface.iat[row, col])
+    else:
+        # One strategy run per candidate, metrics in one vectorized pass
+        candidates = [dict(zip(grid, values)) for values in itertools.product(*grid.values())] or [{}]
+        curves = pd.DataFrame({
+            i: function(train, cache=cache, **{**default_params, **params}).iloc[:, 0]
+            for i, params in enumerate(candidates)
+        })
+        scores = compute_metrics_batch(curves, risk_free_rate=risk_free_rate)[metric]
+        best = int(scores.fillna(-np.inf).to_numpy().argmax())
+        best_params, train_score = candidates[best], float(scores.iloc[best])
+
+    # 2. Test: out-of-sample returns of the chosen parameters
+    history = prices.iloc[train_start:test_end]
+    cum_pnl = function(history, cache=cache, **{**default_params, **best_params}).iloc[:, 0].fillna(1.0)
+    test_returns = cum_pnl.pct_change().iloc[test_start - train_start:].fillna(0).to_numpy()
+
+    return best_params, train_score, test_returns
+
+
+def walk_forward(prices: pd.DataFrame, strategy: str = "Momentum", grid=None, train_bars=756, test_bars=126,
+                 expanding=False, metric="Sharpe Ratio", max_workers=None, risk_free_rate=None):
+    """
+    Walk-forward (rolling out-of-sample) backtest of one strategy.
+    On each fold the parameters maximizing the metric on the train window are scored on the next
+    test window, and the out-of-sample returns of the test windows are stitched into one equity curve.
+    Folds run in parallel processes sharing one read-only copy of the prices.
+
+    Args:
+        prices (pd.DataFrame): DataFrame with dates as index and one column with stock prices
+        strategy (str): name from batch.STRATEGIES
+        grid (dict): parameter name -> candidate values, DEFAULT_GRIDS[strategy] by default
+        train_bars (int): length of the (rolling) train window
+        test_bars (int): length of each test window
+        expanding (bool): train on all the history before each test window
+        metric (str): metric maximized on the train windows
+        max_workers (int): size of the process pool, 1 to run the folds in the current process
+        risk_free_rate: constant, rate series or None (stored curve, no download)
+
+    Returns:
+        (pd.DataFrame, pd.DataFrame): out-of-sample cumulative PnL, and one row per fold
+        (dates, chosen parameters, train score and out-of-sample metrics)
+    """
+    if prices.empty:
+        raise ValueError("Prices DataFrame is empty")
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy '{strategy}'")
+
+    prices = prices.iloc[:, :1]
+    grid = DEFAULT_GRIDS.get(strategy, {}) if grid is None else grid
+    folds = make_folds(len(prices), train_bars, test_bars, expanding)
+    if not folds:
+        raise ValueError(f"Not enough history: {len(prices)} bars for a train window of {train_bars}")
+    risk_free_rate = _resolve_risk_free_rate(risk_free_rate, prices.index)
+
+    # Shared read-only price buffer, copied once and attached by every worker
+    values = np.ascontiguousarray(prices.to_numpy(dtype=float))
+    shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+    try:
+        np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf)[:] = values
+        initargs = (shm.name, values.shape, values.dtype, prices.index, prices.columns)
+        tasks = [(strategy, grid, fold, metric, risk_free_rate) for fold in folds]
+
+        if max_workers == 1:
+            _init_worker(*initargs)
+            try:
+                results = [_run_fold(*task) for task in tasks]
+            finally:
+                # Drop the views on the buffer before closing it
+                _worker.clear()
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=initargs) as executor:
+                results = list(executor.map(_run_fold, *zip(*tasks)))
+    finally:
+        shm.close()
+        shm.unlink()
+
+    # Stitch the out-of-sample returns
+    oos_index = prices.index[folds[0][1]:folds[-1][2]]
+    oos_returns = pd.Series(np.concatenate([r[2] for r in results]), index=oos_index)
+    oos_curve = (1 + oos_returns).cumprod().to_frame(name=prices.columns[0])
+
+    rows = []
+    for i, ((train_start, test_start, test_end), (params, train_score, test_returns)) in enumerate(zip(folds, results)):
+        fold_curve = (1 + pd.Series(test_returns, index=prices.index[test_start:test_end])).cumprod().to_frame()
+        rows.append({
+            "Fold": i,
+            "Train Start": prices.index[train_start],
+            "Test Start": prices.index[test_start],
+            "Test End": prices.index[test_end - 1],
+            "Params": params,
+            f"Train {metric}": train_score,
+            **compute_metrics(fold_curve, risk_free_rate=risk_free_rate)
+        })
+
+    return oos_curve, pd.DataFrame(rows).set_index("Fold")
@@ -0,0 +1,48 @@
+# core/cache.py
+import copy
+import functools
+import threading
+import time
+from collections import OrderedDict
+
+
+def ttl_cache(ttl: float = None, max_entries: int = 128):
+    """
+    Memoize a function on its arguments (hashable) for ttl seconds (forever with None), in process memory.
+    Headless replacement of st.cache_data: callers get a copy of the cached value, like with Streamlit,
+    so they can modify it. At most max_entries results are kept, least recently used evicted first.
+    The wrapper exposes clear(), hits and misses.
+    """
+    def decorator(func):
+        entries = OrderedDict()  # key -> (expiry, value)
+        lock = threading.Lock()
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            now = time.monotonic()
+            with lock:
+                entry = entries.get(key)
+                if entry is not None and (entry[0] is None or entry[0] > now):
+                    wrapper.hits += 1
+                    entries.move_to_end(key)
+                    return copy.deepcopy(entry[1])
+                wrapper.misses += 1
+
+            value = func(*args, **kwargs)
+            with lock:
+                entries[key] = (None if ttl is None else now + ttl, value)
+                entries.move_to_end(key)
+                while len(entries) > max_entries:
+                    entries.popitem(last=False)
+            return copy.deepcopy(value)
+
+        def clear():
+            with lock:
+                entries.clear()
+
+        wrapper.hits = 0
+        wrapper.misses = 0
+        wrapper.clear = clear
+        return wrapper
+    return decorator
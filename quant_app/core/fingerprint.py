@@ -0,0 +1,44 @@
+# core/fingerprint.py
+import hashlib
+import weakref
+import numpy as np
+import pandas as pd
+
+# id(object) -> (weak reference, fingerprint), so a DataFrame is hashed once while it lives
+_memo = {}
+
+
+def _hash_pandas(data) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    values = np.ascontiguousarray(data.to_numpy())
+    digest.update(str((values.shape, values.dtype.str)).encode())
+    digest.update(values.tobytes() if values.dtype != object else repr(values.tolist()).encode())
+
+    index = data.index
+    if isinstance(index, pd.DatetimeIndex):
+        digest.update(np.ascontiguousarray(index.asi8).tobytes())
+    else:
+        digest.update(repr(index.tolist()).encode())
+
+    names = list(data.columns) if isinstance(data, pd.DataFrame) else [data.name]
+    digest.update(repr(names).encode())
+    return digest.hexdigest()
+
+
+def fingerprint(data) -> str:
+    """
+    Content hash of a DataFrame or Series (values, index and column names).
+    The result is memoized per object, price data is treated as read-only once loaded.
+    """
+    key = id(data)
+    entry = _memo.get(key)
+    if entry is not None and entry[0]() is data:
+        return entry[1]
+
+    fp = _hash_pandas(data)
+    try:
+        ref = weakref.ref(data, lambda _, key=key: _memo.pop(key, None))
+        _memo[key] = (ref, fp)
+    except TypeError:
+        pass
+    return fp
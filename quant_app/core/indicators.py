@@ -0,0 +1,75 @@
+# core/indicators.py
+from collections import OrderedDict
+import pandas as pd
+import config
+from quant_app.core.fingerprint import fingerprint
+from quant_app.core.instrumentation import count
+
+
+class IndicatorCache:
+    """
+    Memoized indicators (rolling mean, std, z-score, returns) shared by the strategies of one analysis run.
+    Entries are keyed by (price data fingerprint, indicator, window) and evicted
+    least recently used first once max_bytes is reached.
+    Cached frames are shared: callers must not modify them in place.
+    """
+
+    def __init__(self, max_bytes: int = config.INDICATOR_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+
+    def get_or_compute(self, prices, name, window, compute):
+        key = (fingerprint(prices), name, window)
+        if key in self._entries:
+            self.hits += 1
+            count("indicators.cache_hit")
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+
+        self.misses += 1
+        count("indicators.cache_miss")
+        value = compute()
+        size = int(value.memory_usage(index=False).sum()) if isinstance(value, pd.DataFrame) else value.nbytes
+        if size <= self.max_bytes:
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+        return value
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+
+def _cached(cache, prices, name, window, compute):
+    if cache is None:
+        return compute()
+    return cache.get_or_compute(prices, name, window, compute)
+
+
+def rolling_mean(prices, window: int, cache: IndicatorCache = None):
+    return _cached(cache, prices, "rolling_mean", window, lambda: prices.rolling(window=window).mean())
+
+
+def rolling_std(prices, window: int, cache: IndicatorCache = None):
+    return _cached(cache, prices, "rolling_std", window, lambda: prices.rolling(window=window).std())
+
+
+def z_score(prices, window: int, cache: IndicatorCache = None):
+    """
+    Distance to the rolling mean in rolling standard deviations.
+    """
+    return _cached(cache, prices, "z_score", window,
+                   lambda: (prices - rolling_mean(prices, window, cache)) / rolling_std(prices, window, cache))
+
+
+def daily_returns(prices, cache: IndicatorCache = None):
+    """
+    Daily returns, 0 on the first day.
+    """
+    return _cached(cache, prices, "daily_returns", None, lambda: prices.pct_change().fillna(0))
@@ -0,0 +1,134 @@
+# core/instrumentation.py
+import contextvars
+import functools
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+import pandas as pd
+import config
+
+# Read once at import: when off, timed() returns the functions unchanged and span()/count() return at once
+ENABLED = config.INSTRUMENTATION
+
+_recorder = contextvars.ContextVar("quant_recorder", default=None)
+_parent = contextvars.ContextVar("quant_span", default=None)
+_NULL_SPAN = nullcontext()
+
+
+class Recorder:
+    """
+    Spans (name, parent, wall time) and counters (cache hits, bytes fetched...) of one analysis run.
+    Shared by the threads of the run, see recording().
+    """
+
+    def __init__(self):
+        self.spans = []
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def add_span(self, name, parent, duration, attrs):
+        with self._lock:
+            self.spans.append({"span": name, "parent": parent, "seconds": duration, **attrs})
+
+    def add(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def summary(self) -> pd.DataFrame:
+        """
+        One row per span name: calls, total, mean and max wall time, slowest first.
+        """
+        if not self.spans:
+            return pd.DataFrame(columns=["Calls", "Total (s)", "Mean (ms)", "Max (ms)"])
+        spans = pd.DataFrame(self.spans).groupby("span")["seconds"]
+        summary = pd.DataFrame({
+            "Calls": spans.count(),
+            "Total (s)": spans.sum(),
+            "Mean (ms)": spans.mean() * 1000,
+            "Max (ms)": spans.max() * 1000
+        })
+        return summary.sort_values("Total (s)", ascending=False)
+
+    def records(self) -> list:
+        """
+        Summary and counters as flat dicts, for structured logs.
+        """
+        rows = [{
+            "event": "span", "span": name, "calls": int(row["Calls"]), "total_s": float(row["Total (s)"]),
+            "mean_ms": float(row["Mean (ms)"]), "max_ms": float(row["Max (ms)"])
+        } for name, row in self.summary().iterrows()]
+        rows += [{"event": "counter", "counter": name, "value": value} for name, value in sorted(self.counters.items())]
+        return rows
+
+
+class _Span:
+    __slots__ = ("recorder", "name", "attrs", "start", "token")
+
+    def __init__(self, recorder, name, attrs):
+        self.recorder = recorder
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self):
+        self.token = _parent.set(self.name)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        duration = time.perf_counter() - self.start
+        _parent.reset(self.token)
+        self.recorder.add_span(self.name, _parent.get(), duration, self.attrs)
+        return False
+
+
+def span(name: str, **attrs):
+    """
+    Context manager timing a block into the current recorder (no-op when off or outside recording()).
+    """
+    if not ENABLED:
+        return _NULL_SPAN
+    recorder = _recorder.get()
+    if recorder is None:
+        return _NULL_SPAN
+    return _Span(recorder, name, attrs)
+
+
+def timed(name: str = None):
+    """
+    Decorator timing each call of the function as a span. When off, the function is returned unchanged.
+    """
+    def decorator(func):
+        if not ENABLED:
+            return func
+        label = name or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(name: str, value=1):
+    """
+    Add value to a counter of the current recorder (no-op when off or outside recording()).
+    """
+    if ENABLED:
+        recorder = _recorder.get()
+        if recorder is not None:
+            recorder.add(name, value)
+
+
+@contextmanager
+def recording():
+    """
+    Collect the spans and counters of the enclosed code (and of the threads started with
+    contextvars.copy_context() inside it) into a new Recorder.
+    """
+    recorder = Recorder()
+    token = _recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _recorder.reset(token)
@@ -0,0 +1,202 @@
+# core/result_cache.py
+import dataclasses
+import functools
+import glob
+import hashlib
+import inspect
+import os
+import shutil
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import config
+from quant_app.core.fingerprint import fingerprint
+from quant_app.core.instrumentation import count, span
+
+# Bumped when the stored layout changes, so old entries are never read back
+FORMAT_VERSION = 1
+
+# Sources hashed in every key (see code_token): the quant_app package and config.py
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@functools.lru_cache(maxsize=None)
+def code_token() -> str:
+    """
+    Hash of the sources of the quant_app package and of config.py, part of every result key.
+    The functions listed in a key call indicators, kernels, grids and constants defined elsewhere,
+    so any code or configuration change gives new keys (each result is recomputed once after it).
+    """
+    paths = sorted(glob.glob(os.path.join(PACKAGE_DIR, "**", "*.py"), recursive=True))
+    digest = hashlib.blake2b(digest_size=16)
+    for path in paths + [os.path.abspath(config.__file__)]:
+        digest.update(os.path.relpath(path, PACKAGE_DIR).encode())
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def function_token(function) -> str:
+    """
+    Identity of a function in a result key: qualified name, __version__ attribute (bumped by hand when
+    a dependency changes the results) and a hash of its source, so an edited function gets new keys.
+    """
+    function = inspect.unwrap(function)
+    try:
+        source = inspect.getsource(function)
+    except (OSError, TypeError):
+        source = getattr(getattr(function, "__code__", None), "co_code", b"").hex()
+    digest = hashlib.blake2b(source.encode(), digest_size=8).hexdigest()
+    version = getattr(function, "__version__", None)
+    return f"{function.__module__}.{function.__qualname__}:{version}:{digest}"
+
+
+def _token(value) -> str:
+    """
+    Deterministic text of a key component: content hash for pandas and numpy data,
+    function_token for functions, sorted items for dicts, repr for the rest (numbers, strings, dataclasses).
+    """
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return f"pd:{fingerprint(value)}"
+    if isinstance(value, np.ndarray):
+        digest = hashlib.blake2b(str((value.shape, value.dtype.str)).encode(), digest_size=16)
+        digest.update(np.ascontiguousarray(value).tobytes())
+        return f"np:{digest.hexdigest()}"
+    if isinstance(value, dict):
+        return "{" + ",".join(f"{_token(k)}:{_token(v)}" for k, v in sorted(value.items(), key=lambda item: repr(item[0]))) + "}"
+    if isinstance(value, (list, tuple)):
+        return "[" + ",".join(_token(v) for v in value) + "]"
+    if inspect.isfunction(value) or inspect.ismethod(value):
+        return function_token(value)
+    if dataclasses.is_dataclass(value):
+        return repr(value)
+    if isinstance(value, np.generic):
+        value = value.item()
+    return repr(value)
+
+
+def result_key(functions, data=(), params=None) -> str:
+    """
+    Content address of a result: hash of the input data (DataFrames, Series, arrays),
+    of the functions producing it (see function_token), of their parameters and of the code
+    and configuration they depend on (see code_token).
+    """
+    material = _token([FORMAT_VERSION, code_token(), list(functions), list(data), params or {}])
+    return hashlib.blake2b(material.encode(), digest_size=20).hexdigest()
+
+
+class ResultCache:
+    """
+    Persistent cache of computed results (equity curves, metric tables, ledgers), shared by the app,
+    the daily report and the batch jobs, across sessions and processes.
+    An entry is a dict of DataFrames stored as one Parquet file per frame in a directory named by
+    its result_key. Entries are evicted least recently used first (directory mtime, touched on each
+    hit) when the stored size goes over max_bytes.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = config.RESULT_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._sizes = None  # key -> bytes on disk, least recently used first, loaded at the first write
+        self._lock = threading.Lock()
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def _load_sizes(self):
+        entries = []
+        if os.path.isdir(self.directory):
+            for entry in os.scandir(self.directory):
+                if entry.is_dir() and not entry.name.endswith(".tmp"):
+                    size = sum(f.stat().st_size for f in os.scandir(entry.path))
+                    entries.append((entry.stat().st_mtime, entry.name, size))
+        return OrderedDict((name, size) for _, name, size in sorted(entries))
+
+    def get(self, key: str):
+        """
+        Frames of an entry (name -> DataFrame), None when it is not stored.
+        """
+        path = self.path_for(key)
+        try:
+            names = sorted(name for name in os.listdir(path) if name.endswith(".parquet"))
+            frames = {name[:-len(".parquet")]: pd.read_parquet(os.path.join(path, name)) for name in names}
+            os.utime(path)
+        except (FileNotFoundError, NotADirectoryError):
+            # Missing, or evicted by another process while reading
+            count("result_cache.miss")
+            return None
+
+        count("result_cache.hit")
+        with self._lock:
+            if self._sizes is not None and key in self._sizes:
+                self._sizes.move_to_end(key)
+        return frames
+
+    def put(self, key: str, frames: dict):
+        """
+        Store the frames of an entry (string column names, any index), then evict down to max_bytes.
+        """
+        for name, frame in frames.items():
+            if not isinstance(frame, pd.DataFrame):
+                raise ValueError(f"Result '{name}' is a {type(frame).__name__}, only DataFrames are stored")
+
+        # Written aside then renamed, so a concurrent reader never sees a partial entry
+        path = self.path_for(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        os.makedirs(tmp_path, exist_ok=True)
+        for name, frame in frames.items():
+            frame.to_parquet(os.path.join(tmp_path, f"{name}.parquet"))
+        size = sum(f.stat().st_size for f in os.scandir(tmp_path))
+        try:
+            os.replace(tmp_path, path)
+        except OSError:
+            # Same key already written by another worker: same content
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+        with self._lock:
+            if self._sizes is None:
+                self._sizes = self._load_sizes()
+            self._sizes[key] = size
+            self._sizes.move_to_end(key)
+            self._evict()
+
+    def _evict(self):
+        total = sum(self._sizes.values())
+        while total > self.max_bytes and len(self._sizes) > 1:
+            key, size = self._sizes.popitem(last=False)
+            shutil.rmtree(self.path_for(key), ignore_errors=True)
+            count("result_cache.evicted")
+            total -= size
+
+    def get_or_compute(self, functions, data, params, compute) -> dict:
+        """
+        Frames keyed by result_key(functions, data, params): read back when already computed,
+        otherwise compute() (returning a dict of DataFrames) is run and its result stored.
+        """
+        key = result_key(functions, data, params)
+        frames = self.get(key)
+        if frames is None:
+            frames = compute()
+            with span("result_cache.write"):
+                self.put(key, frames)
+        return frames
+
+    def clear(self):
+        with self._lock:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self._sizes = OrderedDict()
+
+
+_default_cache = None
+
+
+def get_default_cache() -> ResultCache:
+    """
+    Cache configured from config.py (directory and size bound), built once per process.
+    """
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ResultCache(config.RESULT_CACHE_DIR, config.RESULT_CACHE_MAX_BYTES)
+    return _default_cache
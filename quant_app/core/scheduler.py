@@ -0,0 +1,217 @@
+# core/scheduler.py
+import datetime
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from types import MappingProxyType
+import pandas as pd
+import config
+from quant_app.backtesting.batch import STRATEGIES
+from quant_app.backtesting.metrics import compute_metrics_batch
+from quant_app.core.indicators import IndicatorCache
+from quant_app.data.economic_data import align_risk_free_rate, get_risk_free_curve
+from quant_app.data.price_store import get_default_store
+from quant_app.models.forecasting import forecast_arima
+from quant_app.strategies.online import advance_states
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """
+    Immutable result of one refresh of a ticker, shared by every session.
+    The frames are backed by read-only arrays: readers copy them before any modification.
+    """
+    ticker: str
+    refreshed_at: datetime.datetime
+    prices: pd.DataFrame = None
+    curves: pd.DataFrame = None
+    metrics: pd.DataFrame = None
+    forecast: pd.DataFrame = None
+    model_order: tuple = None
+    positions: pd.DataFrame = None
+    error: str = None
+
+
+def _freeze(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Copy of a numeric frame on a read-only array, in-place writes raise instead of altering a shared snapshot.
+    """
+    values = df.to_numpy(dtype=float, copy=True)
+    values.flags.writeable = False
+    return pd.DataFrame(values, index=df.index.copy(), columns=df.columns.copy(), copy=False)
+
+
+def compute_snapshot(ticker: str, forecast_days=config.REFRESH_FORECAST_DAYS) -> Snapshot:
+    """
+    Refresh one ticker: prices since config.DEFAULT_START_DATE, the strategies with their default
+    parameters, their metrics, the positions of the online strategies (saved states advanced over
+    the new prices only) and (forecast_days > 0) the ARIMA forecast.
+    Errors are kept in the snapshot, a failing ticker does not stop the others.
+    """
+    refreshed_at = datetime.datetime.now()
+    try:
+        # 1. Prices, only the missing dates are downloaded
+        df = get_default_store().get(ticker, str(config.DEFAULT_START_DATE), None)
+        df = df[["Close"]].rename(columns={"Close": ticker}).dropna()
+        if df.empty:
+            raise ValueError("No data")
+
+        # 2. Strategies (shared indicators) and metrics
+        cache = IndicatorCache()
+        curves = pd.DataFrame({
+            name: function(df, cache=cache, **params).iloc[:, 0]
+            for name, (function, params) in STRATEGIES.items()
+        })
+        metrics = compute_metrics_batch(curves, risk_free_rate=align_risk_free_rate(df.index))
+        positions = advance_states(ticker, df, {name: params for name, (_, params) in STRATEGIES.items()})
+
+        # 3. Forecast
+        forecast, model_order = None, None
+        if forecast_days:
+            forecast, model_order = forecast_arima(df[ticker], n_days=forecast_days, ticker=ticker)
+            forecast = _freeze(forecast)
+
+        return Snapshot(ticker, refreshed_at, _freeze(df), _freeze(curves), _freeze(metrics), forecast, model_order,
+                        _freeze(positions))
+    except Exception as e:
+        return Snapshot(ticker, refreshed_at, error=str(e))
+
+
+class RefreshScheduler:
+    """
+    Background refresh of the watched tickers, outside of any user session.
+    Every interval seconds a daemon thread recomputes the snapshot of each watched ticker and
+    publishes it by swapping a read-only mapping: sessions only read the latest snapshot,
+    so the load is one computation per ticker per interval whatever the number of sessions.
+    The tickers given at creation are always refreshed; the ones added by watch() are dropped
+    (with their snapshot) when no session requested them for expiry intervals.
+    """
+
+    def __init__(self, tickers=(), interval=config.REFRESH_INTERVAL, max_workers=config.REFRESH_WORKERS,
+                 compute=compute_snapshot, expiry=config.WATCH_EXPIRY_INTERVALS):
+        self.interval = interval
+        self.max_workers = max_workers
+        self.compute = compute
+        self.expiry = expiry
+        self._watched = dict.fromkeys(tickers)  # ticker -> time.monotonic() of the last watch(), None if pinned
+        self._refreshed = {}  # ticker -> time.monotonic() of the last refresh
+        self._snapshots = MappingProxyType({})
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name="refresh-scheduler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def watch(self, tickers):
+        """
+        Add tickers to the refresh list, or keep them in it: sessions call it on each read.
+        New tickers are computed without waiting for the next interval.
+        """
+        if isinstance(tickers, str):
+            tickers = [tickers]
+        now = time.monotonic()
+        with self._lock:
+            new = [ticker for ticker in tickers if ticker not in self._watched]
+            for ticker in tickers:
+                if ticker in new or self._watched[ticker] is not None:
+                    self._watched[ticker] = now
+        if new:
+            self._wake.set()
+
+    def unwatch(self, tickers):
+        """
+        Remove tickers from the refresh list, with their snapshot.
+        """
+        if isinstance(tickers, str):
+            tickers = [tickers]
+        with self._lock:
+            self._drop(tickers)
+
+    def _drop(self, tickers):
+        for ticker in tickers:
+            self._watched.pop(ticker, None)
+            self._refreshed.pop(ticker, None)
+        self._snapshots = MappingProxyType({t: s for t, s in self._snapshots.items() if t not in tickers})
+
+    def _expire(self, now):
+        """
+        Drop the watched tickers no session requested for expiry intervals, and the snapshots of
+        unwatched tickers (refreshed by hand, or unwatched during their refresh) as old (called under the lock).
+        """
+        limit = self.expiry * self.interval
+        expired = [ticker for ticker, requested in self._watched.items() if requested is not None and now - requested > limit]
+        expired += [ticker for ticker, refreshed in self._refreshed.items() if ticker not in self._watched and now - refreshed > limit]
+        if expired:
+            self._drop(expired)
+
+    @property
+    def watched(self) -> list:
+        with self._lock:
+            return list(self._watched)
+
+    def latest(self, ticker: str) -> Snapshot:
+        """
+        Latest published snapshot of the ticker (None before its first refresh). Lock-free read.
+        """
+        return self._snapshots.get(ticker)
+
+    def snapshots(self):
+        return self._snapshots
+
+    def refresh(self, tickers=None):
+        """
+        Recompute and publish the snapshots of the tickers (all the watched ones by default), in the calling thread.
+        """
+        tickers = self.watched if tickers is None else list(tickers)
+        if not tickers:
+            return
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = list(executor.map(self.compute, tickers))
+
+        now = time.monotonic()
+        with self._lock:
+            snapshots = dict(self._snapshots)
+            for ticker, snapshot in zip(tickers, results):
+                snapshots[ticker] = snapshot
+                self._refreshed[ticker] = now
+            self._snapshots = MappingProxyType(snapshots)
+
+    def _due(self):
+        """
+        Tickers whose snapshot is older than the interval, and the delay before the next one is due.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            ages = {ticker: now - self._refreshed.get(ticker, -float("inf")) for ticker in self._watched}
+        due = [ticker for ticker, age in ages.items() if age >= self.interval]
+        pending = [self.interval - age for age in ages.values() if age < self.interval]
+        return due, min(pending, default=self.interval)
+
+    def _run(self):
+        while not self._stopped.is_set():
+            # Cleared before looking at the due tickers, a watch() in between is not lost
+            self._wake.clear()
+            due, delay = self._due()
+            if due:
+                # The risk free curve is refreshed at most once per config.RISK_FREE_TTL
+                try:
+                    get_risk_free_curve()
+                except Exception as e:
+                    print(f"Risk free rate refresh failed: {e}")
+                self.refresh(due)
+            else:
+                self._wake.wait(delay)
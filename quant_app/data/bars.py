@@ -0,0 +1,184 @@
+# data/bars.py
+import numpy as np
+import pandas as pd
+import config
+from quant_app.data.price_store import get_default_store
+
+# Bar interval -> length in seconds
+INTERVALS = {
+    "1m": 60,
+    "5m": 300,
+    "15m": 900,
+    "30m": 1800,
+    "1h": 3600,
+    "1d": 86400
+}
+BAR_FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+
+# How each field of the bars of a bucket is combined when resampling
+AGGREGATIONS = {
+    "Open": "first",
+    "High": "max",
+    "Low": "min",
+    "Close": "last",
+    "Adj Close": "last",
+    "Volume": "sum"
+}
+
+
+def periods_per_year(index_or_interval) -> float:
+    """
+    Number of bars in a year, from an interval name or a DatetimeIndex (median spacing):
+    - daily bars: config.TRADING_DAYS (weekly, monthly... bars a fraction of it)
+    - intraday bars: config.TRADING_DAYS sessions of config.SESSION_MINUTES minutes
+    Any other index (RangeIndex, integer positions) has no spacing to read: daily bars are assumed.
+    """
+    if isinstance(index_or_interval, str):
+        if index_or_interval not in INTERVALS:
+            raise ValueError(f"Unknown interval '{index_or_interval}', expected one of {list(INTERVALS)}")
+        step = INTERVALS[index_or_interval]
+    elif isinstance(index_or_interval, pd.DatetimeIndex):
+        if len(index_or_interval) < 2:
+            return config.TRADING_DAYS
+        step = np.median(np.diff(index_or_interval.to_numpy())) / np.timedelta64(1, "s")
+    else:
+        return config.TRADING_DAYS
+
+    if step <= 0:
+        return config.TRADING_DAYS
+    if step < INTERVALS["1d"]:
+        return config.TRADING_DAYS * config.SESSION_MINUTES * 60 / step
+    # Calendar days between two bars, in trading days (5 out of 7)
+    return config.TRADING_DAYS / max(1, round(step / INTERVALS["1d"] * 5 / 7))
+
+
+class Bars:
+    """
+    Price bars of one ticker in compact arrays: int64 epoch seconds and a float32 (bars x fields) block.
+    A year of 1-minute bars (about 100k rows) takes 2.8 MB with the 5 OHLCV fields.
+    Slices (between) are views, nothing is copied.
+    """
+
+    __slots__ = ("timestamps", "values", "fields")
+
+    def __init__(self, timestamps, values, fields=BAR_FIELDS):
+        self.timestamps = np.asarray(timestamps, dtype=np.int64)
+        self.values = np.asarray(values, dtype=np.float32).reshape(len(self.timestamps), len(fields))
+        self.fields = list(fields)
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    @property
+    def nbytes(self) -> int:
+        return self.timestamps.nbytes + self.values.nbytes
+
+    def field(self, name: str) -> np.ndarray:
+        """
+        Column of a field (view on the float32 block).
+        """
+        if name not in self.fields:
+            raise ValueError(f"No field '{name}' in the bars ({self.fields})")
+        return self.values[:, self.fields.index(name)]
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame):
+        """
+        Bars from a DataFrame indexed by datetime (naive, local exchange time), keeping the BAR_FIELDS it has.
+        """
+        fields = [field for field in BAR_FIELDS if field in df.columns]
+        if not fields:
+            raise ValueError(f"No bar field in the columns {list(df.columns)}")
+        timestamps = pd.DatetimeIndex(df.index).as_unit("s").asi8
+        return cls(timestamps, df[fields].to_numpy(dtype=np.float32), fields)
+
+    def to_frame(self, fields=None, dtype=np.float64) -> pd.DataFrame:
+        """
+        DataFrame of the fields (all by default) indexed by datetime, in dtype (float64 for the analysis).
+        """
+        fields = fields or self.fields
+        columns = [self.fields.index(field) for field in fields]
+        index = pd.DatetimeIndex(self.timestamps.astype("datetime64[s]"), name="Date")
+        return pd.DataFrame(self.values[:, columns].astype(dtype), index=index, columns=fields)
+
+    def between(self, start=None, end=None):
+        """
+        Bars of [start, end), as views of the arrays.
+        """
+        lo = 0 if start is None else np.searchsorted(self.timestamps, int(pd.Timestamp(start).timestamp()))
+        hi = len(self) if end is None else np.searchsorted(self.timestamps, int(pd.Timestamp(end).timestamp()))
+        return Bars(self.timestamps[lo:hi], self.values[lo:hi], self.fields)
+
+    def resample(self, interval: str):
+        """
+        Bars of a coarser interval: each bucket of interval seconds (aligned on the epoch, so days start
+        at midnight) keeps the first Open, the max High, the min Low, the last Close and the summed Volume.
+        One pass with np.*.reduceat, the timestamps must be sorted.
+        """
+        if interval not in INTERVALS:
+            raise ValueError(f"Unknown interval '{interval}', expected one of {list(INTERVALS)}")
+        if len(self) == 0:
+            return self
+
+        step = INTERVALS[interval]
+        buckets = self.timestamps - self.timestamps % step
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        ends = np.r_[starts[1:], len(self)] - 1
+
+        values = np.empty((len(starts), len(self.fields)), dtype=np.float32)
+        for i, field in enumerate(self.fields):
+            column = self.values[:, i]
+            how = AGGREGATIONS.get(field, "last")
+            if how == "first":
+                values[:, i] = column[starts]
+            elif how == "last":
+                values[:, i] = column[ends]
+            elif how == "max":
+                values[:, i] = np.maximum.reduceat(column, starts)
+            elif how == "min":
+                values[:, i] = np.minimum.reduceat(column, starts)
+            else:
+                # Summed in float64, float32 loses the units of large volumes
+                values[:, i] = np.add.reduceat(column, starts, dtype=np.float64)
+        return Bars(buckets[starts], values, self.fields)
+
+
+def _normalize_bars(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Keep the bar fields, with a naive sorted DatetimeIndex (exchange local time) and no duplicate bars.
+    """
+    if df is None or df.empty:
+        return pd.DataFrame(columns=["Close"], index=pd.DatetimeIndex([], name="Date"), dtype=float)
+
+    index = pd.DatetimeIndex(pd.to_datetime(df.index))
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    df = df[[field for field in BAR_FIELDS if field in df.columns]].astype(float)
+    df.index = index.rename("Date")
+    df = df[~df.index.duplicated(keep="last")].sort_index()
+    return df.dropna(how="all")
+
+
+def get_bars(ticker: str, start=None, end=None, interval="1m") -> Bars:
+    """
+    Bars of a ticker over [start, end) at the interval, from the configured provider.
+    When the provider has nothing at this interval, a finer interval it has is fetched and resampled.
+    Intraday bars are not kept in the price store (providers only serve a few weeks of them): start is
+    moved to the earliest date the provider serves (PriceProvider.bars_start), the bars begin later.
+    """
+    if interval not in INTERVALS:
+        raise ValueError(f"Unknown interval '{interval}', expected one of {list(INTERVALS)}")
+
+    provider = get_default_store().provider
+    start, end = pd.Timestamp(start or config.DEFAULT_START_DATE), pd.Timestamp(end or pd.Timestamp.today() + pd.Timedelta(days=1))
+    # Finer intervals dividing this one, the coarsest first (fewer bars to fetch)
+    finer = [name for name, step in INTERVALS.items() if step < INTERVALS[interval] and INTERVALS[interval] % step == 0]
+    for source in [interval] + finer[::-1]:
+        source_start = max(start, provider.bars_start(source) or start)
+        if source_start >= end:
+            continue
+        df = _normalize_bars(provider.fetch_bars(ticker, source_start, end, source))
+        if not df.empty:
+            bars = Bars.from_frame(df)
+            return bars if source == interval else bars.resample(interval)
+    return Bars.from_frame(_normalize_bars(None))
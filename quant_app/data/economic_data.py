@@ -1,15 +1,81 @@
-import yfinance as yf
+import os
+import time
+import pandas as pd
 import config
+from quant_app.core.instrumentation import timed
+from quant_app.data.price_store import get_default_store
 
-def get_risk_free_rate(ticker="^TNX"):
+
+def _refresh_marker(ticker):
+    return get_default_store().path_for(ticker) + ".refreshed"
+
+
+def _is_stale(ticker):
+    marker = _refresh_marker(ticker)
+    return not os.path.exists(marker) or time.time() - os.path.getmtime(marker) > config.RISK_FREE_TTL
+
+
+def get_risk_free_curve(start=None, end=None, ticker=config.RISK_FREE_TICKER, offline=False) -> pd.Series:
     """
-    Fetch the risk free rate from Yahoo finance (Treasury Yield).
-    If an error occurs we take the config.py risk free rate.
+    Daily risk free rate (decimal, Treasury Yield) between start and end, from the local price store.
+    The stored history is refreshed from the provider at most once every config.RISK_FREE_TTL seconds;
+    offline=True never refreshes and only reads the disk.
+    """
+    store = get_default_store()
+
+    if not offline and _is_stale(ticker):
+        try:
+            stored_rows = len(store.read(ticker, config.RISK_FREE_HISTORY_START, None))
+            df = store.get(ticker, config.RISK_FREE_HISTORY_START, None)
+            # A failed download comes back empty without raising (yfinance): the refresh only counts
+            # when the store gained rows or already reaches the last business day, otherwise it is retried
+            last_business_day = pd.Timestamp.today().normalize() - pd.offsets.BDay(1)
+            if len(df) > stored_rows or (not df.empty and df.index[-1] >= last_business_day):
+                marker = _refresh_marker(ticker)
+                os.makedirs(os.path.dirname(marker), exist_ok=True)
+                with open(marker, "w"):
+                    pass
+        except Exception:
+            pass
+
+    df = store.read(ticker, start or config.RISK_FREE_HISTORY_START, end)
+    return (df["Close"] / 100.0).rename(ticker)
+
+
+@timed("data.get_risk_free_rate")
+def get_risk_free_rate(ticker=config.RISK_FREE_TICKER, offline=False):
+    """
+    Latest risk free rate (Treasury Yield).
+    If no rate is available we take the config.py risk free rate.
     """
     try:
-        df = yf.download(ticker, period="5d", progress=False)['Close']
-        if df.empty:
+        curve = get_risk_free_curve(ticker=ticker, offline=offline).dropna()
+        if curve.empty:
             return config.RISK_FREE_RATE
-        return float(df.iloc[-1]) / 100.0
-    except:
-        return config.RISK_FREE_RATE
\ No newline at end of file
+        return float(curve.iloc[-1])
+    except Exception:
+        return config.RISK_FREE_RATE
+
+
+def align_risk_free_rate(index, ticker=config.RISK_FREE_TICKER, offline=True) -> pd.Series:
+    """
+    Risk free rate aligned on the dates of a backtest (last known rate of each date).
+    Reads the disk only by default, so metrics never wait on the network (offline=False refreshes
+    the stored curve first, at most once per config.RISK_FREE_TTL).
+    Dates before the first known rate use that first rate, and the config.py risk free rate is only
+    used when no rate is known at all.
+    """
+    index = pd.DatetimeIndex(index)
+    if len(index) == 0:
+        return pd.Series(dtype=float, index=index)
+
+    try:
+        curve = get_risk_free_curve(end=index[-1] + pd.Timedelta(days=1), ticker=ticker, offline=offline).dropna()
+    except Exception:
+        curve = pd.Series(dtype=float)
+
+    if curve.empty:
+        return pd.Series(config.RISK_FREE_RATE, index=index)
+
+    aligned = curve.reindex(curve.index.union(index)).ffill().reindex(index)
+    return aligned.fillna(float(curve.iloc[0]))
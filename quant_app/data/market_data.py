@@ -1,23 +1,33 @@
-import yfinance as yf
 import pandas as pd
-import streamlit as st
+import config
+from quant_app.core.cache import ttl_cache
+from quant_app.core.instrumentation import count, timed
+from quant_app.data.bars import get_bars
+from quant_app.data.price_store import get_default_store
 
-@st.cache_data(ttl=300)
-def get_price(ticker: str, start_date: str = None, end_date: str = None) -> pd.DataFrame:
+@timed("data.get_price")
+@ttl_cache(ttl=config.PRICE_CACHE_TTL)
+def get_price(ticker: str, start_date: str = None, end_date: str = None, interval: str = "1d") -> pd.DataFrame:
     """
-    Fetch the closing price data from Yahoo finance for a ticker.
+    Fetch the closing price data for a ticker, one row per bar of the interval ("1d", "1h", "1m"...).
+    Daily history already fetched is read from the local price store, only missing dates are downloaded.
+    Intraday bars are fetched as compact float32 bars (see data/bars.py).
     """
-    
-    df = yf.download(ticker, start=start_date, end=end_date, auto_adjust=False, progress=False)
+    # Only runs on a cache miss
+    count("data.get_price.cache_miss")
+    if interval != "1d":
+        bars = get_bars(ticker, start_date, end_date, interval)
+        if len(bars) == 0:
+            print(f"No {interval} bars found for the ticker '{ticker}' between {start_date} and {end_date}.")
+            return pd.DataFrame()
+        return bars.to_frame(["Close"]).rename(columns={"Close": ticker})
+
+    df = get_default_store().get(ticker, start_date, end_date)
 
     if df.empty:
         print(f"No data found for the ticker '{ticker}' between {start_date} and {end_date}.")
         return pd.DataFrame()
 
-    close_data = df['Close']
-    if isinstance(close_data, pd.Series):
-        df_close = close_data.to_frame(name=ticker)
-    else:
-        df_close = close_data.copy()
+    df_close = df[["Close"]].rename(columns={"Close": ticker})
 
-    return df_close
\ No newline at end of file
+    return df_close
@@ -0,0 +1,170 @@
+# data/panel.py
+import numpy as np
+import pandas as pd
+
+# How the missing prices of an asset are filled, after its first price (before it, the asset is not listed yet):
+# - "none": left missing
+# - "ffill": last known price (no return during the gap)
+# - "interpolate": linear between the surrounding prices (the gap return spread over the gap),
+#   the last known price after the last one
+FILL_POLICIES = ("none", "ffill", "interpolate")
+
+
+class PricePanel:
+    """
+    Prices of several assets on one shared trading calendar, in one contiguous (assets x dates) array
+    (the layout of a single-dtype DataFrame, and of strategies.kernels), with a mask of the prices
+    actually observed. Missing prices are filled per asset with an explicit policy (FILL_POLICIES).
+    Date slices (between), contiguous ticker subsets (select), the DataFrame (to_frame) and the
+    returns (returns, returns_frame) are views: nothing is copied or realigned.
+    """
+
+    __slots__ = ("values", "valid", "dates", "assets", "fills", "_returns")
+
+    def __init__(self, values, dates, assets, valid=None, fills=None):
+        self.values = np.asarray(values)
+        self.dates = pd.DatetimeIndex(dates)
+        self.assets = pd.Index(assets)
+        if self.values.shape != (len(self.assets), len(self.dates)):
+            raise ValueError(f"Values of shape {self.values.shape} do not match {len(self.assets)} assets x {len(self.dates)} dates")
+        self.valid = ~np.isnan(self.values) if valid is None else np.asarray(valid, dtype=bool)
+        self.fills = dict(fills) if fills is not None else {asset: "none" for asset in self.assets}
+        self._returns = None
+
+    def __len__(self):
+        return len(self.dates)
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes + self.valid.nbytes
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, fill="ffill", dtype=np.float64):
+        """
+        Panel of a DataFrame (dates x tickers), copied once into the contiguous array.
+        """
+        values = np.array(df.to_numpy(dtype=dtype).T, order="C")
+        return cls(values, df.index, df.columns).fill(fill)
+
+    @classmethod
+    def from_series(cls, series: dict, fill="ffill", dtype=np.float64):
+        """
+        Panel of one price series per ticker ({ticker: pd.Series}), on the union of their dates.
+        Each series is written once at its positions in the calendar (no DataFrame alignment).
+        """
+        if not series:
+            raise ValueError("No price series")
+        stamps = [pd.DatetimeIndex(s.index).as_unit("ns").asi8 for s in series.values()]
+        dates = pd.DatetimeIndex(np.unique(np.concatenate(stamps)).astype("datetime64[ns]"), name="Date")
+
+        values = np.full((len(series), len(dates)), np.nan, dtype=dtype)
+        for row, (s, positions) in enumerate(zip(series.values(), stamps)):
+            values[row, dates.asi8.searchsorted(positions)] = s.to_numpy(dtype=dtype)
+        # Calendar in the time unit of the series
+        unit = pd.DatetimeIndex(next(iter(series.values())).index).unit
+        return cls(values, dates.as_unit(unit), list(series)).fill(fill)
+
+    def fill(self, policy="ffill"):
+        """
+        Fill the missing prices in place, with one policy for all the assets or {ticker: policy}
+        (the tickers missing from the dict keep theirs). The valid mask keeps the observed prices.
+        A view (between, select) first copies its prices (copy on write): the panel it views is unchanged.
+        With "none" the missing prices stay NaN, and so do the returns around them.
+        Returns the panel.
+        """
+        policies = policy if isinstance(policy, dict) else {asset: policy for asset in self.assets}
+        unknown = set(policies.values()) - set(FILL_POLICIES)
+        if unknown:
+            raise ValueError(f"Unknown fill policies {sorted(unknown)}, expected one of {FILL_POLICIES}")
+        if not self.values.flags.owndata:
+            self.values = self.values.copy()
+
+        n_dates = len(self.dates)
+        positions = np.arange(n_dates)
+        for asset, name in policies.items():
+            row = self.assets.get_loc(asset)
+            self.fills[asset] = name
+            valid = self.valid[row]
+            # Values filled by a previous policy are cleared first
+            prices = self.values[row]
+            prices[~valid] = np.nan
+            if name == "none" or valid.all() or not valid.any():
+                continue
+            # Index of the last observed price of each date (-1 before the first one)
+            last = np.where(valid, positions, -1)
+            np.maximum.accumulate(last, out=last)
+            listed = last >= 0
+            if name == "ffill":
+                prices[listed] = prices[last[listed]]
+            else:
+                observed = np.flatnonzero(valid)
+                prices[listed] = np.interp(positions[listed], observed, prices[observed])
+        self._returns = None
+        return self
+
+    def _view(self, rows, columns):
+        panel = PricePanel(self.values[rows, columns], self.dates[columns], self.assets[rows],
+                           self.valid[rows, columns], {asset: self.fills[asset] for asset in self.assets[rows]})
+        if self._returns is not None:
+            panel._returns = self._returns[rows, columns]
+        return panel
+
+    def between(self, start=None, end=None):
+        """
+        Panel of the dates in [start, end), as views of the arrays. Its returns are the returns of the
+        full calendar: the first one is relative to the date before start.
+        """
+        lo = 0 if start is None else self.dates.searchsorted(pd.Timestamp(start))
+        hi = len(self.dates) if end is None else self.dates.searchsorted(pd.Timestamp(end))
+        return self._view(slice(None), slice(lo, hi))
+
+    def select(self, tickers):
+        """
+        Panel of some tickers, in their order. Views when their rows are evenly spaced
+        (a contiguous block, or a stride), otherwise copies.
+        """
+        rows = self.assets.get_indexer(list(tickers))
+        if (rows < 0).any():
+            raise ValueError(f"Unknown tickers: {[t for t, r in zip(tickers, rows) if r < 0]}")
+        steps = np.diff(rows)
+        if len(rows) == 1 or (len(set(steps)) == 1 and steps[0] != 0):
+            stop = rows[-1] + steps[0] if len(rows) > 1 else rows[0] + 1
+            rows = slice(rows[0], stop if stop >= 0 else None, steps[0] if len(rows) > 1 else 1)
+        return self._view(rows, slice(None))
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Filled prices as a DataFrame (dates x tickers) viewing the array.
+        """
+        return pd.DataFrame(self.values.T, index=self.dates, columns=self.assets, copy=False)
+
+    def returns(self) -> np.ndarray:
+        """
+        Simple returns of the filled prices (assets x dates), NaN on the first date and where a price
+        is missing. Computed once per panel, shared by its views.
+        """
+        if self._returns is None:
+            returns = np.full(self.values.shape, np.nan, dtype=self.values.dtype)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                np.divide(self.values[:, 1:], self.values[:, :-1], out=returns[:, 1:])
+            returns[:, 1:] -= 1
+            self._returns = returns
+        return self._returns
+
+    def returns_frame(self, complete=True) -> pd.DataFrame:
+        """
+        Returns as a DataFrame (dates x tickers) viewing the array. With complete=True it starts at
+        the first date where every asset has a return (the latest listing), instead of dropping each
+        date with a missing value: after ffill or interpolate there is none left, while the assets
+        filled with "none" keep NaN returns around their missing prices (empty when no date is complete).
+        """
+        returns = self.returns()
+        start = 0
+        if complete:
+            full = ~np.isnan(returns).any(axis=0)
+            start = int(np.argmax(full)) if full.any() else len(self.dates)
+        return pd.DataFrame(returns[:, start:].T, index=self.dates[start:], columns=self.assets, copy=False)
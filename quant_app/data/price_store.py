@@ -0,0 +1,205 @@
+# data/price_store.py
+import os
+import json
+import threading
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import config
+from quant_app.core.instrumentation import count, span
+from quant_app.data.providers import PRICE_FIELDS, get_provider, _empty_frame, _normalize
+
+COVERAGE_KEY = b"quant_app.coverage"
+
+# An empty answer for a range longer than this is treated as a failed download
+# (yfinance returns an empty frame on errors), so the range stays marked as missing.
+MAX_EMPTY_GAP_DAYS = 5
+
+
+class PriceStore:
+    """
+    Persistent on-disk price store, one Parquet file per ticker.
+    Each file remembers the date range already fetched from the provider,
+    so only the missing ranges are downloaded and the rest is served from disk.
+    """
+
+    def __init__(self, directory: str, provider):
+        self.directory = directory
+        self.provider = provider
+        # One lock per ticker, so concurrent callers only wait on the tickers they share
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def _ticker_locks(self, tickers):
+        """
+        Locks of the tickers, in a fixed order so two callers never wait on each other crosswise.
+        """
+        with self._locks_guard:
+            return [self._locks.setdefault(ticker, threading.Lock()) for ticker in sorted(set(tickers))]
+
+    def path_for(self, ticker: str) -> str:
+        safe_name = ticker.replace("/", "_")
+        return os.path.join(self.directory, f"{safe_name}.parquet")
+
+    def _read(self, ticker):
+        path = self.path_for(ticker)
+        if not os.path.exists(path):
+            return _empty_frame(), None
+
+        table = pq.read_table(path)
+        metadata = table.schema.metadata or {}
+        coverage = None
+        if COVERAGE_KEY in metadata:
+            start, end = json.loads(metadata[COVERAGE_KEY])
+            coverage = (pd.Timestamp(start), pd.Timestamp(end))
+        return table.to_pandas(), coverage
+
+    def _write(self, ticker, df, coverage):
+        os.makedirs(self.directory, exist_ok=True)
+        table = pa.Table.from_pandas(df[PRICE_FIELDS])
+        metadata = dict(table.schema.metadata or {})
+        metadata[COVERAGE_KEY] = json.dumps([str(coverage[0].date()), str(coverage[1].date())]).encode()
+        table = table.replace_schema_metadata(metadata)
+
+        # Atomic replace so a concurrent reader never sees a half-written file
+        path = self.path_for(ticker)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _resolve_range(start, end):
+        """
+        Normalize the requested range to [start, end) timestamps, with yfinance defaults.
+        """
+        today = pd.Timestamp.today().normalize()
+        end = pd.Timestamp(end).normalize() if end is not None else today + pd.Timedelta(days=1)
+        start = pd.Timestamp(start).normalize() if start is not None else end - pd.DateOffset(months=1)
+        return start, end
+
+    @staticmethod
+    def _missing_ranges(coverage, start, end):
+        """
+        Ranges to download so the covered interval includes [start, end).
+        They start or stop at the coverage edge, even when [start, end) does not overlap it,
+        so the coverage stays a single interval with no unfetched gap inside.
+        """
+        if coverage is None:
+            return [(start, end)] if start < end else []
+
+        missing = []
+        if start < coverage[0]:
+            missing.append((start, coverage[0]))
+        if end > coverage[1]:
+            missing.append((coverage[1], end))
+        return missing
+
+    @staticmethod
+    def _extend_coverage(coverage, range_start, range_end, fetched):
+        """
+        Grow the covered interval with a fetched range.
+        Today's bar may still move, so coverage never goes past today.
+        """
+        if fetched.empty and (range_end - range_start).days > MAX_EMPTY_GAP_DAYS:
+            return coverage
+
+        range_end = min(range_end, pd.Timestamp.today().normalize())
+        if range_end <= range_start:
+            return coverage
+        if coverage is None:
+            return (range_start, range_end)
+        return (min(coverage[0], range_start), max(coverage[1], range_end))
+
+    def _update(self, ticker, stored, coverage, fetched_ranges):
+        """
+        Merge fetched frames into the stored one and persist the result.
+        """
+        new_coverage = coverage
+        frames = [stored] if not stored.empty else []
+        for (range_start, range_end), fetched in fetched_ranges:
+            fetched = _normalize(fetched)
+            if not fetched.empty:
+                frames.append(fetched)
+            new_coverage = self._extend_coverage(new_coverage, range_start, range_end, fetched)
+
+        if not frames:
+            return stored
+        merged = pd.concat(frames)
+        merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+
+        if new_coverage is not None and new_coverage != coverage:
+            self._write(ticker, merged, new_coverage)
+        return merged
+
+    def read(self, ticker: str, start=None, end=None) -> pd.DataFrame:
+        """
+        Return what is stored for a ticker over [start, end), without any download.
+        """
+        start, end = self._resolve_range(start, end)
+        lock, = self._ticker_locks([ticker])
+        with lock:
+            df, _ = self._read(ticker)
+        return df[(df.index >= start) & (df.index < end)]
+
+    def get(self, ticker: str, start=None, end=None) -> pd.DataFrame:
+        """
+        Return the stored fields of a ticker over [start, end), downloading only what is missing.
+        """
+        return self.get_many([ticker], start, end)[ticker]
+
+    def get_many(self, tickers: list, start=None, end=None) -> dict:
+        """
+        Same as get for several tickers. Tickers missing the same range are fetched in one provider call.
+        """
+        start, end = self._resolve_range(start, end)
+        tickers = list(dict.fromkeys(tickers))
+
+        locks = self._ticker_locks(tickers)
+        for lock in locks:
+            lock.acquire()
+        try:
+            # 1. Read what is on disk and list the missing ranges
+            stored = {}
+            to_fetch = {}
+            for ticker in tickers:
+                df, coverage = self._read(ticker)
+                stored[ticker] = (df, coverage)
+                for missing in self._missing_ranges(coverage, start, end):
+                    to_fetch.setdefault(missing, []).append(ticker)
+
+            # 2. Download the missing ranges, batched by range
+            fetched = {ticker: [] for ticker in tickers}
+            for (range_start, range_end), range_tickers in to_fetch.items():
+                with span("data.provider_fetch"):
+                    frames = self.provider.fetch_many(range_tickers, range_start, range_end)
+                count("data.provider_calls")
+                count("data.bytes_fetched", sum(int(frame.memory_usage().sum()) for frame in frames.values() if frame is not None))
+                for ticker in range_tickers:
+                    fetched[ticker].append(((range_start, range_end), frames.get(ticker)))
+
+            # 3. Merge, persist and slice
+            result = {}
+            for ticker in tickers:
+                df, coverage = stored[ticker]
+                if fetched[ticker]:
+                    df = self._update(ticker, df, coverage, fetched[ticker])
+                result[ticker] = df[(df.index >= start) & (df.index < end)]
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+        return result
+
+
+_default_store = None
+
+
+def get_default_store() -> PriceStore:
+    """
+    Store configured from config.py (directory and provider), built once per process.
+    """
+    global _default_store
+    if _default_store is None:
+        provider = get_provider(config.PRICE_PROVIDER, config.PRICE_FIXTURE_DIR)
+        _default_store = PriceStore(config.PRICE_STORE_DIR, provider)
+    return _default_store
@@ -0,0 +1,172 @@
+# data/providers.py
+import os
+import threading
+import pandas as pd
+
+PRICE_FIELDS = ["Close", "Adj Close"]
+
+
+class PriceProvider:
+    """
+    Source of daily price history used by the price store.
+    A provider returns a DataFrame indexed by date with the PRICE_FIELDS columns,
+    covering [start, end) (end excluded, like yfinance).
+    """
+
+    def fetch(self, ticker: str, start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+        raise NotImplementedError
+
+    def fetch_many(self, tickers: list, start: pd.Timestamp, end: pd.Timestamp) -> dict:
+        """
+        Fetch several tickers over the same range. Providers able to batch requests override it.
+        """
+        return {ticker: self.fetch(ticker, start, end) for ticker in tickers}
+
+    def fetch_bars(self, ticker: str, start: pd.Timestamp, end: pd.Timestamp, interval: str) -> pd.DataFrame:
+        """
+        Bars of [start, end) at an interval ("1m", "1h"... see data/bars.py), indexed by datetime
+        with the Open/High/Low/Close/Volume columns available. Empty if the provider has none.
+        """
+        raise NotImplementedError
+
+    def bars_start(self, interval: str):
+        """
+        Earliest date the provider serves bars of the interval from, None without limit.
+        """
+        return None
+
+
+def _empty_frame() -> pd.DataFrame:
+    return pd.DataFrame(columns=PRICE_FIELDS, index=pd.DatetimeIndex([], name="Date"), dtype=float)
+
+
+def _normalize(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Keep the stored fields, with a naive sorted DatetimeIndex and no duplicate dates.
+    """
+    if df is None or df.empty:
+        return _empty_frame()
+
+    df = df.copy()
+    if "Adj Close" not in df.columns and "Close" in df.columns:
+        df["Adj Close"] = df["Close"]
+    df = df[PRICE_FIELDS].astype(float)
+
+    index = pd.DatetimeIndex(pd.to_datetime(df.index))
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    df.index = index.normalize().rename("Date")
+
+    df = df[~df.index.duplicated(keep="last")].sort_index()
+    return df.dropna(how="all")
+
+
+class YahooProvider(PriceProvider):
+    """
+    Download prices from Yahoo finance.
+    yf.download keeps module-level state and is not thread-safe, so calls are serialized
+    (one call already downloads a batch of tickers in parallel).
+    """
+
+    _download_lock = threading.Lock()
+    # Days of intraday history served by Yahoo (older requests come back empty), a small margin kept
+    BARS_HISTORY_DAYS = {"1m": 29, "5m": 59, "15m": 59, "30m": 59, "1h": 59}
+
+    def fetch(self, ticker, start, end):
+        return self.fetch_many([ticker], start, end)[ticker]
+
+    def fetch_many(self, tickers, start, end):
+        import yfinance as yf
+
+        with self._download_lock:
+            data = yf.download(
+                tickers,
+                start=start.strftime("%Y-%m-%d"),
+                end=end.strftime("%Y-%m-%d"),
+                group_by="ticker",
+                auto_adjust=False,
+                progress=False
+            )
+
+        frames = {}
+        for ticker in tickers:
+            if data is None or data.empty:
+                frames[ticker] = _empty_frame()
+            elif isinstance(data.columns, pd.MultiIndex):
+                if ticker in data.columns.get_level_values(0):
+                    frames[ticker] = _normalize(data[ticker])
+                else:
+                    frames[ticker] = _empty_frame()
+            else:
+                frames[ticker] = _normalize(data)
+        return frames
+
+    def bars_start(self, interval):
+        # Yahoo serves the 1m bars of the last 30 days and the other intraday bars of the last 60 days
+        days = self.BARS_HISTORY_DAYS.get(interval)
+        return None if days is None else pd.Timestamp.today().normalize() - pd.Timedelta(days=days)
+
+    def fetch_bars(self, ticker, start, end, interval):
+        import yfinance as yf
+
+        with self._download_lock:
+            data = yf.download(
+                ticker,
+                start=start.strftime("%Y-%m-%d"),
+                end=end.strftime("%Y-%m-%d"),
+                interval=interval,
+                auto_adjust=False,
+                progress=False
+            )
+        if data is None or data.empty:
+            return pd.DataFrame()
+        if isinstance(data.columns, pd.MultiIndex):
+            data = data.xs(ticker, axis=1, level=-1) if ticker in data.columns.get_level_values(-1) else data.droplevel(-1, axis=1)
+        return data
+
+
+class CSVProvider(PriceProvider):
+    """
+    Read prices from local CSV fixtures, one <TICKER>.csv file per ticker.
+    Files need a Date column and a Close column (Adj Close is optional).
+    Used to run backtests offline and reproducibly.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def path_for(self, ticker: str) -> str:
+        return os.path.join(self.directory, f"{ticker}.csv")
+
+    def fetch(self, ticker, start, end):
+        path = self.path_for(ticker)
+        if not os.path.exists(path):
+            return _empty_frame()
+
+        df = pd.read_csv(path, index_col="Date", parse_dates=True)
+        df = _normalize(df)
+        return df[(df.index >= start) & (df.index < end)]
+
+    def fetch_bars(self, ticker, start, end, interval):
+        """
+        Bars from a <TICKER>_<interval>.csv fixture (e.g. AAPL_1m.csv) with a Date column (date and time).
+        """
+        path = os.path.join(self.directory, f"{ticker}_{interval}.csv")
+        if not os.path.exists(path):
+            return pd.DataFrame()
+
+        df = pd.read_csv(path, index_col="Date", parse_dates=True)
+        return df[(df.index >= start) & (df.index < end)]
+
+
+def get_provider(name: str, fixture_dir: str = None) -> PriceProvider:
+    """
+    Build a provider from its config name ("yahoo" or "csv").
+    """
+    if name == "yahoo":
+        return YahooProvider()
+    if name == "csv":
+        if not fixture_dir:
+            raise ValueError("The csv provider needs a fixture directory")
+        return CSVProvider(fixture_dir)
+    raise ValueError(f"Unknown price provider '{name}'")
@@ -1,39 +1,192 @@
+import os
+import time
+import pickle
+import numpy as np
 import pandas as pd
-import pmdarima as pm
 from datetime import timedelta
+import config
+from quant_app.core.fingerprint import fingerprint
+from quant_app.core.instrumentation import count, timed
+from quant_app.data.bars import INTERVALS
 
-def forecast_arima(price_series, n_days=30):
+# Residuals of the first observations are inflated by the differencing, they are left out of the fit quality
+RESID_WARMUP = 10
+# Minimum number of recent residuals used to detect a degraded fit
+MIN_RECENT_RESID = 20
+
+
+def _search_model(price_series):
+    """
+    Full Auto-ARIMA order search (stepwise).
+    pmdarima is imported here, it takes seconds to load and most runs only reuse cached models.
+    """
+    import pmdarima as pm
+
+    return pm.auto_arima(price_series,
+                         start_p=1, start_q=1,
+                         max_p=5, max_q=5,
+                         d=None,
+                         seasonal=False,
+                         stepwise=True,
+                         suppress_warnings=True,
+                         error_action="ignore",
+                         trace=False)
+
+
+def _rmse(residuals):
+    return float(np.sqrt(np.mean(np.square(residuals)))) if len(residuals) else 0.0
+
+
+def model_key(ticker, price_series) -> str:
+    """
+    Cache key of the model of a ticker: the same ticker fitted on another history (start date)
+    or another bar interval (e.g. the app and the scheduler) gets its own entry.
+    """
+    index = pd.DatetimeIndex(price_series.index)
+    step = int(np.median(np.diff(index.to_numpy())) / np.timedelta64(1, "s")) if len(index) > 1 else 0
+    interval = next((name for name, seconds in INTERVALS.items() if seconds == step), f"{step}s")
+    return f"{ticker}_{index[0]:%Y%m%d}_{interval}"
+
+
+def _cache_path(key):
+    safe_name = str(key).replace("/", "_")
+    return os.path.join(config.MODEL_CACHE_DIR, f"{safe_name}.pkl")
+
+
+def _load_entry(key):
+    path = _cache_path(key)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as f:
+            entry = pickle.load(f)
+        # Recently used models are evicted last
+        os.utime(path)
+        return entry
+    except Exception:
+        return None
+
+
+def _save_entry(key, entry):
+    path = _cache_path(key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(entry, f)
+    os.replace(tmp_path, path)
+    _evict_models(keep=path)
+
+
+def _evict_models(keep):
+    """
+    Remove the least recently used models (file mtime, touched on each load) while config.MODEL_CACHE_DIR
+    is over config.MODEL_CACHE_MAX_BYTES: each history start picked in the app leaves its own model.
+    The model just saved is kept.
+    """
+    models = []
+    for file in os.scandir(config.MODEL_CACHE_DIR):
+        if file.name.endswith(".pkl"):
+            try:
+                stat = file.stat()
+            except FileNotFoundError:
+                continue
+            models.append((stat.st_mtime, file.path, stat.st_size))
+
+    total = sum(size for _, _, size in models)
+    for _, path, size in sorted(models):
+        if total <= config.MODEL_CACHE_MAX_BYTES:
+            break
+        if path == keep:
+            continue
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        count("forecast.model_evicted")
+        total -= size
+
+
+def _new_entry(model, price_series):
+    return {
+        "model": model,
+        "fingerprint": fingerprint(price_series),
+        "n_obs": len(price_series),
+        "searched_at": time.time(),
+        "baseline_rmse": _rmse(model.resid()[RESID_WARMUP:])
+    }
+
+
+def get_arima_model(price_series, key=None):
+    """
+    Return a fitted Auto-ARIMA model for the price series, reusing the cached one when possible:
+    - same data as the cached fit: the cached model is used as is
+    - only new observations appended: the cached model is updated with them (no order search)
+    - full order search otherwise, when the last search is older than config.ARIMA_RESEARCH_DAYS,
+      or when the recent residuals degrade past config.ARIMA_DEGRADATION_RATIO times the fit error
+    Models are persisted per key (see model_key) in config.MODEL_CACHE_DIR. Without key, no cache is used.
+    """
+    if key is None:
+        return _search_model(price_series)
+
+    entry = _load_entry(key)
+    if entry is not None:
+        # 1. Same data, nothing to do
+        if entry["fingerprint"] == fingerprint(price_series):
+            count("forecast.model_cache_hit")
+            return entry["model"]
+
+        # 2. New observations appended to the cached data
+        n_obs = entry["n_obs"]
+        search_age = time.time() - entry["searched_at"]
+        is_appended = len(price_series) > n_obs and entry["fingerprint"] == fingerprint(price_series.iloc[:n_obs])
+        if is_appended and search_age < config.ARIMA_RESEARCH_DAYS * 86400:
+            model = entry["model"]
+            new_obs = price_series.iloc[n_obs:]
+            model.update(new_obs.values)
+
+            recent = max(len(new_obs), MIN_RECENT_RESID)
+            recent_rmse = _rmse(model.resid()[-recent:])
+            if recent_rmse <= config.ARIMA_DEGRADATION_RATIO * entry["baseline_rmse"]:
+                entry.update(model=model, fingerprint=fingerprint(price_series), n_obs=len(price_series))
+                _save_entry(key, entry)
+                count("forecast.model_update")
+                return model
+
+    # 3. Full search
+    count("forecast.model_search")
+    model = _search_model(price_series)
+    _save_entry(key, _new_entry(model, price_series))
+    return model
+
+
+@timed("forecast.forecast_arima")
+def forecast_arima(price_series, n_days=30, ticker=None):
     """
     Train an Auto-ARIMA model on the price series and forecast the future n_days
+    The fitted model is cached per ticker (default: the series name), history start and bar interval,
+    see get_arima_model
     """
-    
+
     # 1. Configuration and training of the Auto-ARIMA
-    model = pm.auto_arima(price_series, 
-                          start_p=1, start_q=1,
-                          max_p=5, max_q=5, 
-                          d=None,           
-                          seasonal=False,   
-                          stepwise=True,
-                          suppress_warnings=True, 
-                          error_action="ignore",
-                          trace=False)
+    ticker = ticker or price_series.name
+    model = get_arima_model(price_series, key=model_key(ticker, price_series) if ticker is not None else None)
 
     # 2. Forecasting with a confidence interval
     forecast, conf_int = model.predict(n_periods=n_days, return_conf_int=True, alpha=0.05)
-    
+
     # 3. Generation of the future dates for the index
     last_date = price_series.index[-1]
     future_dates = pd.date_range(start=last_date + timedelta(days=1), periods=n_days)
-    
+
     # 4. Results
     forecast_values = forecast.values if hasattr(forecast, 'values') else forecast
     forecast_df = pd.DataFrame({
-        "Forecast": forecast_values,       
+        "Forecast": forecast_values,
         "Lower_CI": conf_int[:, 0],
         "Upper_CI": conf_int[:, 1]
     }, index=future_dates)
-    
-    # We keep the order to show it
-    model_desc = str(model.order) 
-    
-    return forecast_df, model_desc
\ No newline at end of file
+
+    # We keep the order (p, d, q) to show it
+    model_order = tuple(int(v) for v in model.order)
+
+    return forecast_df, model_order
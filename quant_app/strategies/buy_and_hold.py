@@ -1,12 +1,28 @@
 # strategies/buy_and_hold.py
 import pandas as pd
+from quant_app.core import indicators
+from quant_app.core.instrumentation import timed
+from quant_app.backtesting.execution import ExecutionModel, execute
 
-def buy_and_hold(prices: pd.DataFrame) -> pd.DataFrame:
+
+def buy_and_hold_signal(prices: pd.DataFrame) -> pd.DataFrame:
+    """
+    Position of the Buy & Hold strategy: long on every date, from the first one.
+    """
+    if prices.empty:
+        raise ValueError("Prices DataFrame is empty")
+    return pd.DataFrame(1.0, index=prices.index, columns=prices.columns)
+
+
+@timed("strategy.buy_and_hold")
+def buy_and_hold(prices: pd.DataFrame, cache: indicators.IndicatorCache = None, execution: ExecutionModel = None) -> pd.DataFrame:
     """
     Simulate a Buy & Hold strategy for a single stock.
 
     Args:
         prices (pd.DataFrame): DataFrame with dates as index and one column with stock prices
+        cache (IndicatorCache): optional indicator cache shared with the other strategies
+        execution (ExecutionModel): optional commissions and slippage, paid on the initial purchase
 
     Returns:
         pd.DataFrame: DataFrame with cumulative PnL of the Buy & Hold strategy
@@ -14,8 +30,11 @@ def buy_and_hold(prices: pd.DataFrame) -> pd.DataFrame:
     if prices.empty:
         raise ValueError("Prices DataFrame is empty")
 
+    if execution is not None:
+        return execute(prices, buy_and_hold_signal(prices), execution, cache)[0]
+
     # Compute daily returns
-    daily_returns = prices.pct_change().fillna(0)
+    daily_returns = indicators.daily_returns(prices, cache)
 
     # Compute cumulative PnL (1 unit invested at start)
     cum_pnl = (1 + daily_returns).cumprod()
@@ -0,0 +1,352 @@
+# strategies/kernels.py
+import numpy as np
+from quant_app.backtesting.execution import ExecutionModel
+
+# Max number of values of a block of assets (~8 MB of float64), the scratch arrays of the kernels have this size
+MAX_BLOCK_VALUES = 1_000_000
+
+
+class Workspace:
+    """
+    Scratch arrays of the kernels, allocated on first use and reused by the next calls when they fit
+    (same name and dtype, size up to the largest one seen), so running the strategies block after
+    block allocates nothing once the first block is done.
+    """
+
+    __slots__ = ("_buffers",)
+
+    def __init__(self):
+        self._buffers = {}
+
+    def array(self, name: str, shape, dtype=np.float64) -> np.ndarray:
+        """
+        Uninitialized C-contiguous array of the shape, backed by the buffer of the name.
+        """
+        size = int(np.prod(shape))
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.dtype != dtype or buffer.size < size:
+            buffer = np.empty(size, dtype=dtype)
+            self._buffers[name] = buffer
+        return buffer[:size].reshape(shape)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(buffer.nbytes for buffer in self._buffers.values())
+
+    def clear(self):
+        self._buffers.clear()
+
+
+def panel_values(prices, dtype=np.float64) -> np.ndarray:
+    """
+    Prices DataFrame (dates x tickers) as a C-contiguous (assets x bars) array of dtype.
+    A single-dtype DataFrame is stored this way already: no copy when the dtype matches,
+    so a float32 panel stays at half the size of the float64 one.
+    """
+    return np.ascontiguousarray(prices.to_numpy(dtype=dtype).T)
+
+
+def block_rows(n_bars: int) -> int:
+    """
+    Number of assets processed together, so a scratch array holds about MAX_BLOCK_VALUES values.
+    """
+    return max(1, MAX_BLOCK_VALUES // max(n_bars, 1))
+
+
+def _prepare(prices, ws, squares):
+    """
+    Cumulative sums behind the rolling indicators of a block: sums of the values centered on their row
+    mean (limits the cancellation error of the sums of squares), of their squares when squares is True,
+    and of the missing values (None without any), each with a leading 0 column.
+    """
+    k, n = prices.shape
+    missing = np.isnan(prices, out=ws.array("missing", (k, n), bool))
+    has_gaps = missing.any()
+
+    centered = ws.array("centered", (k, n))
+    np.copyto(centered, prices)
+    if has_gaps:
+        centered[missing] = 0.0
+    valid = n - missing.sum(axis=1) if has_gaps else np.full(k, n)
+    center = centered.sum(axis=1) / np.maximum(valid, 1)
+    centered -= center[:, None]
+    if has_gaps:
+        centered[missing] = 0.0
+
+    csum = ws.array("csum", (k, n + 1))
+    csum[:, 0] = 0.0
+    np.cumsum(centered, axis=1, out=csum[:, 1:])
+
+    csum_sq = None
+    if squares:
+        csum_sq = ws.array("csum_sq", (k, n + 1))
+        csum_sq[:, 0] = 0.0
+        np.square(centered, out=centered)
+        np.cumsum(centered, axis=1, out=csum_sq[:, 1:])
+
+    gaps = None
+    if has_gaps:
+        gaps = ws.array("gaps", (k, n + 1), np.int32)
+        gaps[:, 0] = 0
+        np.cumsum(missing, axis=1, out=gaps[:, 1:])
+
+    # Bars equal to the previous one: a window of them is flat
+    same = ws.array("same", (k, n), bool)
+    same[:, 0] = False
+    np.equal(prices[:, 1:], prices[:, :-1], out=same[:, 1:])
+    repeats = ws.array("repeats", (k, n + 1), np.int32)
+    repeats[:, 0] = 0
+    np.cumsum(same, axis=1, out=repeats[:, 1:])
+    return {"prices": prices, "center": center, "csum": csum, "csum_sq": csum_sq, "gaps": gaps, "repeats": repeats}
+
+
+def _flat_windows(sums, window, ws):
+    """
+    Windows of identical values. pandas returns their exact value as the rolling mean and 0 as
+    the rolling std, the sums are only exact up to rounding, so the kernels patch them the same way.
+    """
+    repeats = sums["repeats"]
+    n = repeats.shape[1] - 1
+    flat = ws.array("flat", (repeats.shape[0], n - window + 1), np.int32)
+    np.subtract(repeats[:, window:], repeats[:, 1:n - window + 2], out=flat)
+    return flat == window - 1
+
+
+def _mask_gaps(result, sums, window):
+    """
+    NaN on the windows holding a missing value (pandas rolling with min_periods=window).
+    """
+    gaps = sums["gaps"]
+    if gaps is not None:
+        window_gaps = gaps[:, window:] - gaps[:, :-window]
+        result[:, window - 1:][window_gaps > 0] = np.nan
+
+
+def _rolling_mean(sums, window, out, ws):
+    n = out.shape[1]
+    out.fill(np.nan)
+    if window > n:
+        return out
+    csum = sums["csum"]
+    view = out[:, window - 1:]
+    np.subtract(csum[:, window:], csum[:, :-window], out=view)
+    view /= window
+    view += sums["center"][:, None]
+    flat = _flat_windows(sums, window, ws)
+    view[flat] = sums["prices"][:, window - 1:][flat]
+    _mask_gaps(out, sums, window)
+    return out
+
+
+def _rolling_std(sums, window, out, ws):
+    """
+    Rolling standard deviation (ddof=1, like pandas).
+    """
+    k, n = out.shape
+    out.fill(np.nan)
+    if window < 2 or window > n:
+        return out
+    csum, csum_sq = sums["csum"], sums["csum_sq"]
+    view = out[:, window - 1:]
+    np.subtract(csum[:, window:], csum[:, :-window], out=view)
+    np.square(view, out=view)
+    view /= window
+    sum_sq = ws.array("sum_sq", view.shape)
+    np.subtract(csum_sq[:, window:], csum_sq[:, :-window], out=sum_sq)
+    np.subtract(sum_sq, view, out=view)
+    np.maximum(view, 0.0, out=view)
+    view[_flat_windows(sums, window, ws)] = 0.0
+    view /= window - 1
+    np.sqrt(view, out=view)
+    _mask_gaps(out, sums, window)
+    return out
+
+
+def _hold_positions(prices, mean, std, threshold, out, ws):
+    """
+    Mean reversion positions: 1 from a z-score below -threshold until it is back at 0, held in between
+    (ffill of the entry and exit decisions, 0 before the first one). A flat window (std 0) decides nothing.
+    """
+    k, n = prices.shape
+    z_score = ws.array("z_score", (k, n))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        np.subtract(prices, mean, out=z_score)
+        np.divide(z_score, std, out=z_score)
+    z_score[std == 0] = np.nan
+
+    # Decisions (NaN where there is none), then index of the last decision of each bar
+    decisions = ws.array("decisions", (k, n + 1))
+    decisions[:, 0] = 0.0
+    state = decisions[:, 1:]
+    state.fill(np.nan)
+    state[z_score < -threshold] = 1.0
+    state[z_score >= 0] = 0.0
+    last = ws.array("last", (k, n), np.int64)
+    last[:] = np.arange(1, n + 1)
+    last[np.isnan(state)] = 0
+    np.maximum.accumulate(last, axis=1, out=last)
+    last += (np.arange(k) * (n + 1))[:, None]
+    np.take(decisions.reshape(-1), last, out=out)
+    return out
+
+
+def _buy_and_hold_positions(prices, sums, ws, out):
+    out.fill(1.0)
+    return out
+
+
+def _momentum_positions(prices, sums, ws, out, window_fast=20, window_slow=50):
+    k, n = prices.shape
+    fast = _rolling_mean(sums, window_fast, ws.array("mean_fast", (k, n)), ws)
+    slow = _rolling_mean(sums, window_slow, ws.array("mean_slow", (k, n)), ws)
+    np.greater(fast, slow, out=out)
+    return out
+
+
+def _mean_reversion_positions(prices, sums, ws, out, window=20, threshold=2.0):
+    k, n = prices.shape
+    mean = _rolling_mean(sums, window, ws.array("mean", (k, n)), ws)
+    std = _rolling_std(sums, window, ws.array("std", (k, n)), ws)
+    return _hold_positions(prices, mean, std, threshold, out, ws)
+
+
+def _regime_switching_positions(prices, sums, ws, out, trend_window=200, mom_window=20, mr_window=20,
+                                mr_threshold=2.0, regime="price"):
+    k, n = prices.shape
+    # Mean reversion positions first, the regime and momentum arrays then reuse its scratch arrays
+    mean = _rolling_mean(sums, mr_window, ws.array("mean", (k, n)), ws)
+    std = _rolling_std(sums, mr_window, ws.array("std", (k, n)), ws)
+    _hold_positions(prices, mean, std, mr_threshold, out, ws)
+
+    regime_ma = _rolling_mean(sums, trend_window, ws.array("mean_slow", (k, n)), ws)
+    bull = ws.array("bull", (k, n), bool)
+    if regime == "price":
+        np.greater(prices, regime_ma, out=bull)
+    else:
+        bull[:, 0] = False
+        np.greater(regime_ma[:, 1:], regime_ma[:, :-1], out=bull[:, 1:])
+    mom_ma = _rolling_mean(sums, mom_window, ws.array("mean_fast", (k, n)), ws)
+    momentum = ws.array("momentum", (k, n), bool)
+    np.greater(prices, mom_ma, out=momentum)
+    np.copyto(out, momentum, where=bull)
+    return out
+
+
+# Strategy name (as in backtesting.batch.STRATEGIES) -> (positions kernel, uses the rolling std,
+# first bar of the frictionless curve: NaN for the strategies whose signal is shifted by apply_signal)
+KERNELS = {
+    "Buy & Hold": (_buy_and_hold_positions, False, 1.0),
+    "Momentum": (_momentum_positions, False, np.nan),
+    "Mean Reversion": (_mean_reversion_positions, True, np.nan),
+    "Regime Switching": (_regime_switching_positions, True, np.nan)
+}
+
+
+def _returns(prices, out):
+    """
+    Bar returns, 0 on the first bar and after a missing price (pct_change().fillna(0)).
+    """
+    out[:, 0] = 0.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        np.divide(prices[:, 1:], prices[:, :-1], out=out[:, 1:])
+    out[:, 1:] -= 1
+    np.copyto(out, 0.0, where=np.isnan(out))
+    return out
+
+
+def _fill_costs(prices, returns, positions, model, ws):
+    """
+    Commissions and slippage of the position changes (see execution.execute), as a fraction of the equity.
+    """
+    k, n = prices.shape
+    delta = ws.array("delta", (k, n))
+    delta[:, 0] = positions[:, 0]
+    np.subtract(positions[:, 1:], positions[:, :-1], out=delta[:, 1:])
+    np.abs(delta, out=delta)
+
+    cost_rate = ws.array("cost_rate", (k, n))
+    cost_rate.fill(model.commission)
+    if model.slippage_model == "volatility" and model.slippage:
+        sums = _prepare(returns, ws, squares=True)
+        volatility = _rolling_std(sums, model.slippage_window, ws.array("std", (k, n)), ws)
+        np.copyto(volatility, 0.0, where=np.isnan(volatility))
+        volatility *= model.slippage
+        cost_rate += volatility
+    else:
+        cost_rate += model.slippage
+    if model.commission_per_share:
+        per_share = ws.array("per_share", (k, n))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            np.divide(model.commission_per_share, prices, out=per_share)
+        np.copyto(per_share, 0.0, where=~np.isfinite(per_share))
+        cost_rate += per_share
+    delta *= cost_rate
+    return delta
+
+
+def _block_curves(name, prices, params, execution, ws, out):
+    positions_kernel, uses_std, first_bar = KERNELS[name]
+    k, n = prices.shape
+
+    # 1. Positions
+    sums = _prepare(prices, ws, uses_std)
+    positions = positions_kernel(prices, sums, ws, ws.array("positions", (k, n)), **params)
+
+    # 2. Equity: returns of the position held over each bar, net of the costs of the bar's fills
+    returns = _returns(prices, ws.array("returns", (k, n)))
+    costs = None
+    if execution is not None:
+        if execution.size != 1:
+            positions *= execution.size
+        costs = _fill_costs(prices, returns, positions, execution, ws)
+    returns[:, 1:] *= positions[:, :-1]
+    if costs is not None:
+        returns -= costs
+    returns += 1
+    np.multiply.accumulate(returns, axis=1, out=returns)
+    if execution is None:
+        returns[:, 0] = first_bar
+    np.copyto(out, returns)
+    return out
+
+
+def strategy_curves(name: str, values: np.ndarray, params: dict = None, execution: ExecutionModel = None,
+                    out: np.ndarray = None, workspace: Workspace = None) -> np.ndarray:
+    """
+    Low-memory version of the strategies: cumulative PnL of a strategy of KERNELS on a raw
+    (assets x bars) price array (see panel_values), same values as the DataFrame strategies.
+    The assets are processed in blocks of block_rows in float64 scratch arrays of the workspace,
+    so the memory used is the input, the output and a few blocks, whatever the size of the panel.
+
+    Args:
+        name (str): strategy name, as in backtesting.batch.STRATEGIES
+        values (np.ndarray): prices (assets x bars), float64 or float32
+        params (dict): parameters of the strategy, its defaults otherwise
+        execution (ExecutionModel): commissions and slippage paid on the position changes, frictionless by default
+        out (np.ndarray): array (assets x bars) the curves are written to (float32 allowed),
+            allocated in the dtype of values when None. May be values itself (overwritten in place).
+        workspace (Workspace): scratch arrays reused across calls, a new one by default
+
+    Returns:
+        np.ndarray: out
+    """
+    if name not in KERNELS:
+        raise ValueError(f"Unknown strategy '{name}', expected one of {list(KERNELS)}")
+    values = np.asarray(values)
+    if values.ndim != 2 or values.size == 0:
+        raise ValueError("Prices array is empty")
+    if out is None:
+        out = np.empty(values.shape, dtype=values.dtype)
+    if out.shape != values.shape:
+        raise ValueError(f"Output shape {out.shape} does not match the prices {values.shape}")
+    params = params or {}
+    workspace = workspace or Workspace()
+
+    n_assets, n_bars = values.shape
+    step = block_rows(n_bars)
+    for start in range(0, n_assets, step):
+        rows = slice(start, min(start + step, n_assets))
+        prices = workspace.array("prices", (rows.stop - start, n_bars))
+        np.copyto(prices, values[rows])
+        _block_curves(name, prices, params, execution, workspace, out[rows])
+    return out
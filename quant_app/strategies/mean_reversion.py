@@ -1,35 +1,39 @@
 # strategies/mean_reversion.py
 import pandas as pd
 import numpy as np
+from quant_app.core import indicators
+from quant_app.core.instrumentation import timed
+from quant_app.backtesting.execution import ExecutionModel, apply_signal
 
-def mean_reversion(prices: pd.DataFrame, window: int = 20, threshold: float = 2.0) -> pd.DataFrame:
+
+def mean_reversion_signal(prices: pd.DataFrame, window: int = 20, threshold: float = 2.0, cache: indicators.IndicatorCache = None) -> pd.DataFrame:
     """
-    Mean Reversion strategy:
-    - Buy when the price is very low (-threshold times the rolling std)
-    - Sell when the price is back at the rolling mean
-    - Returns cumulative PnL
+    Position of the mean reversion strategy: 1 from a z-score below -threshold until it is back at 0, else 0
     """
     if prices.empty:
         raise ValueError("Prices DataFrame is empty")
 
     # Indicators
-    rolling_mean = prices.rolling(window=window).mean()
-    rolling_std = prices.rolling(window=window).std()
-    z_score = (prices - rolling_mean) / rolling_std
+    z_score = indicators.z_score(prices, window, cache)
 
     # Signal, buy when very low, sell when it's back at rolling mean
     signal = pd.DataFrame(np.nan, index=prices.index, columns=prices.columns)
     signal[z_score < -threshold] = 1.0
     signal[z_score >= 0] = 0.0
-    signal = signal.ffill().fillna(0)
-
-    # Compute daily returns
-    daily_returns = prices.pct_change().fillna(0)
+    return signal.ffill().fillna(0)
 
-    # Apply signal on next day
-    strategy_returns = signal.shift(1) * daily_returns
 
-    # Cumulative PnL
-    cum_pnl = (1 + strategy_returns).cumprod()
+@timed("strategy.mean_reversion")
+def mean_reversion(prices: pd.DataFrame, window: int = 20, threshold: float = 2.0, cache: indicators.IndicatorCache = None,
+                   execution: ExecutionModel = None) -> pd.DataFrame:
+    """
+    Mean Reversion strategy:
+    - Buy when the price is very low (-threshold times the rolling std)
+    - Sell when the price is back at the rolling mean
+    - Returns cumulative PnL, net of the commissions and slippage of execution (ExecutionModel) when one is given
+    Indicators are shared through cache (IndicatorCache) when one is given
+    """
+    signal = mean_reversion_signal(prices, window, threshold, cache)
 
-    return cum_pnl
\ No newline at end of file
+    # Apply signal on next day
+    return apply_signal(prices, signal, cache, execution)
@@ -1,30 +1,35 @@
 # strategies/momentum.py
 import pandas as pd
+from quant_app.core import indicators
+from quant_app.core.instrumentation import timed
+from quant_app.backtesting.execution import ExecutionModel, apply_signal
 
-def momentum(prices: pd.DataFrame, window_fast: int = 20, window_slow: int = 50) -> pd.DataFrame:
+
+def momentum_signal(prices: pd.DataFrame, window_fast: int = 20, window_slow: int = 50, cache: indicators.IndicatorCache = None) -> pd.DataFrame:
     """
-    Simple momentum strategy:
-    - Long if rolling mean fast > rolling mean slow 
-    - Cash (0 position) otherwise
-    - Returns cumulative PnL
+    Position of the momentum strategy: 1 if rolling mean fast > rolling mean slow, else 0
     """
     if prices.empty:
         raise ValueError("Prices DataFrame is empty")
 
     # Compute rolling mean
-    rolling_mean_fast = prices.rolling(window=window_fast).mean()
-    rolling_mean_slow = prices.rolling(window = window_slow).mean()
-
-    # Signal: 1 if rolling mean fast > rolling mean slow, else 0
-    signal = (rolling_mean_fast > rolling_mean_slow).astype(int)
+    rolling_mean_fast = indicators.rolling_mean(prices, window_fast, cache)
+    rolling_mean_slow = indicators.rolling_mean(prices, window_slow, cache)
 
-    # Compute daily returns
-    daily_returns = prices.pct_change().fillna(0)
+    return (rolling_mean_fast > rolling_mean_slow).astype(int)
 
-    # Apply signal on next day
-    strategy_returns = signal.shift(1) * daily_returns
 
-    # Cumulative PnL
-    cum_pnl = (1 + strategy_returns).cumprod()
+@timed("strategy.momentum")
+def momentum(prices: pd.DataFrame, window_fast: int = 20, window_slow: int = 50, cache: indicators.IndicatorCache = None,
+             execution: ExecutionModel = None) -> pd.DataFrame:
+    """
+    Simple momentum strategy:
+    - Long if rolling mean fast > rolling mean slow 
+    - Cash (0 position) otherwise
+    - Returns cumulative PnL, net of the commissions and slippage of execution (ExecutionModel) when one is given
+    Indicators are shared through cache (IndicatorCache) when one is given
+    """
+    signal = momentum_signal(prices, window_fast, window_slow, cache)
 
-    return cum_pnl
+    # Apply signal on next day
+    return apply_signal(prices, signal, cache, execution)
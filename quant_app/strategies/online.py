@@ -0,0 +1,389 @@
+# strategies/online.py
+import json
+import math
+import os
+import threading
+from collections import deque
+import pandas as pd
+import config
+
+
+class _RollingWindow:
+    """
+    Last `window` prices with running sum and sum of squares, updated in O(1).
+    Prices are centered on a reference price to limit the rounding error of the sum of squares,
+    and the sums are recomputed from the buffer every `window` updates so errors do not accumulate.
+    """
+
+    def __init__(self, window: int, values=(), ref: float = None):
+        self.window = window
+        self.values = deque(values, maxlen=window)
+        self.ref = ref
+        self._since_resum = 0
+        self._resum()
+
+    def _resum(self):
+        centered = [v - (self.ref or 0.0) for v in self.values]
+        self.total = math.fsum(centered)
+        self.total_sq = math.fsum(c * c for c in centered)
+        self._since_resum = 0
+
+    def push(self, price: float):
+        if self.ref is None:
+            self.ref = price
+        if len(self.values) == self.window:
+            old = self.values[0] - self.ref
+            self.total -= old
+            self.total_sq -= old * old
+        self.values.append(price)
+        new = price - self.ref
+        self.total += new
+        self.total_sq += new * new
+
+        self._since_resum += 1
+        if self._since_resum >= self.window:
+            self._resum()
+
+    @property
+    def full(self) -> bool:
+        return len(self.values) == self.window
+
+    def mean(self) -> float:
+        """
+        Rolling mean, NaN until the window is full (like pandas).
+        """
+        if not self.full:
+            return math.nan
+        return self.ref + self.total / self.window
+
+    def std(self) -> float:
+        """
+        Rolling standard deviation (ddof=1), NaN until the window is full.
+        """
+        if not self.full or self.window < 2:
+            return math.nan
+        variance = (self.total_sq - self.total ** 2 / self.window) / (self.window - 1)
+        return math.sqrt(max(variance, 0.0))
+
+    def to_dict(self) -> dict:
+        return {"window": self.window, "values": list(self.values), "ref": self.ref}
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(data["window"], data["values"], data["ref"])
+
+
+def _z_score(price, window: _RollingWindow) -> float:
+    mean, std = window.mean(), window.std()
+    if math.isnan(mean) or math.isnan(std):
+        return math.nan
+    if std == 0:
+        return math.nan if price == mean else math.copysign(math.inf, price - mean)
+    return (price - mean) / std
+
+
+def _mean_reversion_signal(state: float, z: float, threshold: float) -> float:
+    """
+    Hysteresis: buy when very low, sell when it's back at rolling mean, else keep the position.
+    """
+    if z < -threshold:
+        return 1.0
+    if z >= 0:
+        return 0.0
+    return state
+
+
+class OnlineStrategy:
+    """
+    Incremental version of a strategy: a compact state updated in O(1) per new price.
+    Each update applies the previous signal on the new daily return (signal applied on next day),
+    then computes the signal of the day. Replaying a history gives the batch cumulative PnL
+    (the batch functions start with NaN where the online equity starts at 1.0).
+    """
+
+    name = None
+    _registry = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        OnlineStrategy._registry[cls.name] = cls
+
+    def __init__(self):
+        self.equity = 1.0
+        self.position = 0.0
+        self.last_price = None
+        self.last_date = None
+
+    def _signal(self, price: float) -> float:
+        raise NotImplementedError
+
+    def update(self, price: float, date=None) -> float:
+        """
+        Process one new price and return the equity after it.
+        """
+        price = float(price)
+        if self.last_price is not None:
+            self.equity *= 1 + self.position * (price / self.last_price - 1)
+        self.position = self._signal(price)
+        self.last_price = price
+        if date is not None:
+            self.last_date = pd.Timestamp(date)
+        return self.equity
+
+    def advance(self, prices) -> pd.Series:
+        """
+        Process the prices (Series or one-column DataFrame) dated after the last processed date.
+        Returns the equity of the processed dates.
+        """
+        series = prices.iloc[:, 0] if isinstance(prices, pd.DataFrame) else prices
+        series = series.dropna()
+        if self.last_date is not None:
+            series = series[series.index > self.last_date]
+
+        equity = [self.update(price, date) for date, price in series.items()]
+        return pd.Series(equity, index=series.index, name=series.name, dtype=float)
+
+    # Serialization
+    def _params(self) -> dict:
+        return {}
+
+    def _windows(self) -> dict:
+        return {}
+
+    def to_dict(self) -> dict:
+        return {
+            "strategy": self.name,
+            "params": self._params(),
+            "equity": self.equity,
+            "position": self.position,
+            "last_price": self.last_price,
+            "last_date": None if self.last_date is None else self.last_date.isoformat(),
+            "windows": {key: w.to_dict() for key, w in self._windows().items()},
+            "extra": self._extra()
+        }
+
+    def _extra(self) -> dict:
+        return {}
+
+    def _restore_extra(self, extra: dict):
+        pass
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        strategy_cls = OnlineStrategy._registry[data["strategy"]]
+        strategy = strategy_cls(**data["params"])
+        strategy.equity = data["equity"]
+        strategy.position = data["position"]
+        strategy.last_price = data["last_price"]
+        strategy.last_date = None if data["last_date"] is None else pd.Timestamp(data["last_date"])
+        for key, window in data["windows"].items():
+            setattr(strategy, key, _RollingWindow.from_dict(window))
+        strategy._restore_extra(data["extra"])
+        return strategy
+
+    def save(self, path: str):
+        """
+        Write the state as JSON (atomic replace).
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # One temporary file per writer: the scheduler threads and the daily report may save the same state
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def load(path: str):
+        with open(path, encoding="utf-8") as f:
+            return OnlineStrategy.from_dict(json.load(f))
+
+
+class OnlineBuyAndHold(OnlineStrategy):
+    """
+    Online Buy & Hold: always invested.
+    """
+    name = "buy_and_hold"
+
+    def __init__(self):
+        super().__init__()
+        # Invested from the first day, like the cumulative product of the daily returns
+        self.position = 1.0
+
+    def _signal(self, price):
+        return 1.0
+
+
+class OnlineMomentum(OnlineStrategy):
+    """
+    Online momentum: long if rolling mean fast > rolling mean slow.
+    """
+    name = "momentum"
+
+    def __init__(self, window_fast: int = 20, window_slow: int = 50):
+        super().__init__()
+        self.window_fast = window_fast
+        self.window_slow = window_slow
+        self.fast = _RollingWindow(window_fast)
+        self.slow = _RollingWindow(window_slow)
+
+    def _signal(self, price):
+        self.fast.push(price)
+        self.slow.push(price)
+        # NaN comparisons are False, like the batch version
+        return 1.0 if self.fast.mean() > self.slow.mean() else 0.0
+
+    def _params(self):
+        return {"window_fast": self.window_fast, "window_slow": self.window_slow}
+
+    def _windows(self):
+        return {"fast": self.fast, "slow": self.slow}
+
+
+class OnlineMeanReversion(OnlineStrategy):
+    """
+    Online mean reversion: buy at -threshold z-score, sell back at the rolling mean.
+    """
+    name = "mean_reversion"
+
+    def __init__(self, window: int = 20, threshold: float = 2.0):
+        super().__init__()
+        self.window = window
+        self.threshold = threshold
+        self.rolling = _RollingWindow(window)
+
+    def _signal(self, price):
+        self.rolling.push(price)
+        return _mean_reversion_signal(self.position, _z_score(price, self.rolling), self.threshold)
+
+    def _params(self):
+        return {"window": self.window, "threshold": self.threshold}
+
+    def _windows(self):
+        return {"rolling": self.rolling}
+
+
+class OnlineRegimeSwitching(OnlineStrategy):
+    """
+    Online regime switching: momentum in bull regime (price > long MA, or long MA rising
+    with regime="slope"), mean reversion otherwise.
+    The mean reversion state keeps evolving in both regimes, like the batch version.
+    """
+    name = "regime_switching"
+
+    def __init__(self, trend_window: int = 200, mom_window: int = 20, mr_window: int = 20, mr_threshold: float = 2.0, regime: str = "price"):
+        super().__init__()
+        self.trend_window = trend_window
+        self.mom_window = mom_window
+        self.mr_window = mr_window
+        self.mr_threshold = mr_threshold
+        self.regime = regime
+        self.trend = _RollingWindow(trend_window)
+        self.mom = _RollingWindow(mom_window)
+        self.mr = _RollingWindow(mr_window)
+        self.mr_state = 0.0
+        self.last_trend_mean = math.nan
+
+    def _signal(self, price):
+        self.trend.push(price)
+        self.mom.push(price)
+        self.mr.push(price)
+
+        self.mr_state = _mean_reversion_signal(self.mr_state, _z_score(price, self.mr), self.mr_threshold)
+        sig_momentum = 1.0 if price > self.mom.mean() else 0.0
+
+        trend_mean = self.trend.mean()
+        if self.regime == "price":
+            is_bull_regime = price > trend_mean
+        else:
+            is_bull_regime = trend_mean > self.last_trend_mean
+        self.last_trend_mean = trend_mean
+        return sig_momentum if is_bull_regime else self.mr_state
+
+    def _params(self):
+        return {
+            "trend_window": self.trend_window,
+            "mom_window": self.mom_window,
+            "mr_window": self.mr_window,
+            "mr_threshold": self.mr_threshold,
+            "regime": self.regime
+        }
+
+    def _windows(self):
+        return {"trend": self.trend, "mom": self.mom, "mr": self.mr}
+
+    def _extra(self):
+        # JSON has no NaN, None stands for a trend mean not available yet
+        last_trend_mean = None if math.isnan(self.last_trend_mean) else self.last_trend_mean
+        return {"mr_state": self.mr_state, "last_trend_mean": last_trend_mean}
+
+    def _restore_extra(self, extra):
+        self.mr_state = extra["mr_state"]
+        last_trend_mean = extra.get("last_trend_mean")
+        self.last_trend_mean = math.nan if last_trend_mean is None else last_trend_mean
+
+
+# Strategy name of the batch backtests (backtesting.batch.STRATEGIES) -> online version
+ONLINE_STRATEGIES = {
+    "Buy & Hold": OnlineBuyAndHold,
+    "Momentum": OnlineMomentum,
+    "Mean Reversion": OnlineMeanReversion,
+    "Regime Switching": OnlineRegimeSwitching
+}
+
+
+def state_path(ticker: str, name: str, start, directory=config.ONLINE_STATE_DIR) -> str:
+    """
+    File of the state of a strategy on a ticker, per history start: the equity and the hysteresis
+    positions depend on the first price replayed, so histories starting on other dates never share a state.
+    """
+    safe_name = f"{ticker}_{pd.Timestamp(start):%Y%m%d}_{ONLINE_STRATEGIES[name].name}".replace("/", "_")
+    return os.path.join(directory, f"{safe_name}.json")
+
+
+def _load_state(path, strategy_cls, params, first_date):
+    """
+    Saved state of a strategy, None when it has to be rebuilt: missing or unreadable, other parameters,
+    or last processed date before the prices (the rolling windows would miss the dates in between).
+    """
+    try:
+        strategy = OnlineStrategy.load(path)
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    if not isinstance(strategy, strategy_cls) or strategy._params() != strategy_cls(**params)._params():
+        return None
+    if strategy.last_date is not None and strategy.last_date < first_date:
+        return None
+    return strategy
+
+
+def advance_states(ticker: str, prices, strategies: dict, directory=config.ONLINE_STATE_DIR) -> pd.DataFrame:
+    """
+    Bring the saved online states of a ticker up to its last price, and save them back.
+    States are kept per history start (see state_path): callers pass the prices from a fixed start
+    date so that the same state is advanced run after run. Only the prices after the last processed
+    date are replayed (O(1) each), a state is rebuilt from the whole series when it cannot be reused.
+
+    Args:
+        prices: Series or one-column DataFrame of the ticker prices
+        strategies (dict): strategy name (ONLINE_STRATEGIES) -> parameters
+
+    Returns:
+        pd.DataFrame: one row per strategy, Position (signal held over the next bar) and Equity
+        (since the first price of the series)
+    """
+    series = prices.iloc[:, 0] if isinstance(prices, pd.DataFrame) else prices
+    series = series.dropna()
+    if series.empty:
+        raise ValueError("No prices to advance the online strategies")
+
+    rows = {}
+    for name, params in strategies.items():
+        strategy_cls = ONLINE_STRATEGIES[name]
+        path = state_path(ticker, name, series.index[0], directory)
+        strategy = _load_state(path, strategy_cls, params, series.index[0])
+        if strategy is None:
+            strategy = strategy_cls(**params)
+        if strategy.advance(series).size:
+            strategy.save(path)
+        rows[name] = {"Position": strategy.position, "Equity": strategy.equity}
+    return pd.DataFrame.from_dict(rows, orient="index")
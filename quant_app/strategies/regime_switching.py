@@ -1,30 +1,33 @@
 # strategies/regime_switching.py
 import pandas as pd
 import numpy as np
+from quant_app.core import indicators
+from quant_app.core.instrumentation import timed
+from quant_app.backtesting.execution import ExecutionModel, apply_signal
 
-def regime_switching(prices: pd.DataFrame, trend_window: int = 200, mom_window: int = 20, mr_window: int = 20, mr_threshold: float = 2.0) -> pd.DataFrame:
+# Regime definitions: price above the long MA, or long MA rising
+REGIMES = ("price", "slope")
+
+
+def regime_switching_signal(prices: pd.DataFrame, trend_window: int = 200, mom_window: int = 20, mr_window: int = 20, mr_threshold: float = 2.0, regime: str = "price", cache: indicators.IndicatorCache = None) -> pd.DataFrame:
     """
-    Regime Switching strategy (hybrid):
-    - Determines Market Regime using a Long Term Moving Average (trend_window)
-    - BULL REGIME (Price > Long MA): Uses Momentum logic
-    - BEAR REGIME (Price < Long MA): Uses Mean Reversion logic 
-    - Returns cumulative PnL
+    Position of the regime switching strategy: the momentum signal in bull regime, the mean reversion one otherwise
     """
     if prices.empty:
         raise ValueError("Prices DataFrame is empty")
+    if regime not in REGIMES:
+        raise ValueError(f"Unknown regime '{regime}', expected one of {REGIMES}")
 
     # 1. COMPUTE INDICATORS
 
     # Regime Filter
-    regime_ma = prices.rolling(window=trend_window).mean()
+    regime_ma = indicators.rolling_mean(prices, trend_window, cache)
 
     # Momentum Indicator
-    mom_ma = prices.rolling(window=mom_window).mean()
+    mom_ma = indicators.rolling_mean(prices, mom_window, cache)
 
     # Mean Reversion Indicators 
-    mr_ma = prices.rolling(window=mr_window).mean()
-    mr_std = prices.rolling(window=mr_window).std()
-    z_score = (prices - mr_ma) / mr_std
+    z_score = indicators.z_score(prices, mr_window, cache)
 
 
     # 2. GENERATE SIGNALS
@@ -44,22 +47,28 @@ def regime_switching(prices: pd.DataFrame, trend_window: int = 200, mom_window:
     # 3. COMBINE SIGNALS BASED ON REGIME
     
     # Define Regime
-    is_bull_regime = (prices > regime_ma)
+    if regime == "price":
+        is_bull_regime = (prices > regime_ma)
+    else:
+        is_bull_regime = (regime_ma > regime_ma.shift(1))
     
     # Vectorized condition
     final_signal = np.where(is_bull_regime, sig_momentum, sig_mean_reversion)
-    final_signal = pd.DataFrame(final_signal, index=prices.index, columns=prices.columns)
-
+    return pd.DataFrame(final_signal, index=prices.index, columns=prices.columns)
 
-    # 4. COMPUTE RETURNS
 
-    # Compute daily returns
-    daily_returns = prices.pct_change().fillna(0)
+@timed("strategy.regime_switching")
+def regime_switching(prices: pd.DataFrame, trend_window: int = 200, mom_window: int = 20, mr_window: int = 20, mr_threshold: float = 2.0, regime: str = "price", cache: indicators.IndicatorCache = None,
+                     execution: ExecutionModel = None) -> pd.DataFrame:
+    """
+    Regime Switching strategy (hybrid):
+    - Determines Market Regime using a Long Term Moving Average (trend_window)
+    - BULL REGIME (Price > Long MA, or Long MA rising with regime="slope"): Uses Momentum logic
+    - BEAR REGIME (otherwise): Uses Mean Reversion logic 
+    - Returns cumulative PnL, net of the commissions and slippage of execution (ExecutionModel) when one is given
+    Indicators are shared through cache (IndicatorCache) when one is given
+    """
+    final_signal = regime_switching_signal(prices, trend_window, mom_window, mr_window, mr_threshold, regime, cache)
 
     # Apply signal on next day
-    strategy_returns = final_signal.shift(1) * daily_returns
-
-    # Cumulative PnL
-    cum_pnl = (1 + strategy_returns).cumprod()
-
-    return cum_pnl
\ No newline at end of file
+    return apply_signal(prices, final_signal, cache, execution)
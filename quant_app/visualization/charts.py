@@ -0,0 +1,162 @@
+# visualization/charts.py
+import io
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import config
+from quant_app.core.fingerprint import fingerprint
+from quant_app.core.instrumentation import count, span
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling: positions of n_out points keeping the visual shape of the series.
+    The first and last points are kept, each bucket in between keeps the point forming the largest
+    triangle with the previously kept point and the average of the next bucket.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    kept = np.empty(n_out, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        # Average of the next bucket (the last point for the last bucket)
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        next_x = x[end:next_end].mean()
+        next_y = y[end:next_end].mean()
+
+        area = np.abs((x[a] - next_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (next_y - y[a]))
+        a = start + int(area.argmax())
+        kept[i + 1] = a
+    return kept
+
+
+def downsample(series: pd.Series, max_points=config.CHART_MAX_POINTS) -> pd.Series:
+    """
+    Series reduced to at most max_points points (missing values dropped), unchanged if already shorter.
+    """
+    series = series.dropna()
+    if len(series) <= max_points:
+        return series
+    index = series.index
+    x = index.asi8 if isinstance(index, pd.DatetimeIndex) else np.arange(len(series))
+    return series.iloc[lttb(x, series.to_numpy(dtype=float), max_points)]
+
+
+class FigureCache:
+    """
+    Rendered charts (PNG bytes) keyed by (chart, data fingerprint, plot parameters), shared by the sessions.
+    Entries are evicted least recently used first once max_bytes is reached.
+    """
+
+    def __init__(self, max_bytes: int = config.CHART_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get_or_render(self, key, render) -> bytes:
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                count("chart.cache_hit")
+                return self._entries[key]
+            self.misses += 1
+
+        png = render()
+        with self._lock:
+            if key not in self._entries and len(png) <= self.max_bytes:
+                self._entries[key] = png
+                self._bytes += len(png)
+                while self._bytes > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False)
+                    self._bytes -= len(evicted)
+        return png
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+_default_cache = FigureCache()
+
+
+def _render(draw, figsize) -> bytes:
+    """
+    Draw on a standalone Figure (not registered in pyplot, so nothing outlives the call) and return the PNG bytes.
+    matplotlib is imported on the first render, cached charts never load it.
+    """
+    from matplotlib.figure import Figure
+
+    with span("chart.render"):
+        fig = Figure(figsize=figsize, dpi=config.CHART_DPI)
+        try:
+            draw(fig.add_subplot())
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format="png", bbox_inches="tight")
+            return buffer.getvalue()
+        finally:
+            fig.clear()
+
+
+def line_chart(data: pd.DataFrame, title: str, ylabel: str = None, styles: dict = None, figsize=(12, 6),
+               max_points=config.CHART_MAX_POINTS, cache: FigureCache = None) -> bytes:
+    """
+    PNG line chart of every column of data, each one downsampled to max_points.
+    styles = column -> matplotlib keyword arguments, e.g. {"Momentum": {"color": "red", "linewidth": 1.5}}
+    """
+    styles = styles or {}
+    cache = cache or _default_cache
+    key = ("line", fingerprint(data), title, ylabel, repr(sorted(styles.items())), figsize, max_points)
+
+    def draw(ax):
+        for column in data.columns:
+            series = downsample(data[column], max_points)
+            ax.plot(series.index, series.to_numpy(), label=str(column), **styles.get(column, {}))
+        ax.set_title(title)
+        if ylabel:
+            ax.set_ylabel(ylabel)
+        if len(data.columns) > 1:
+            ax.legend()
+        ax.grid(True, linestyle="--", alpha=0.3)
+
+    return cache.get_or_render(key, lambda: _render(draw, figsize))
+
+
+def forecast_chart(history: pd.Series, forecast: pd.DataFrame, title: str, figsize=(12, 5),
+                   max_points=config.CHART_MAX_POINTS, cache: FigureCache = None) -> bytes:
+    """
+    PNG chart of the price history followed by the forecast and its confidence interval
+    (forecast columns "Forecast", "Lower_CI", "Upper_CI", as returned by forecast_arima).
+    """
+    cache = cache or _default_cache
+    key = ("forecast", fingerprint(history), fingerprint(forecast), title, figsize, max_points)
+
+    def draw(ax):
+        shown = downsample(history, max_points)
+        last_date, last_price = history.index[-1], history.iloc[-1]
+        dates = [last_date] + list(forecast.index)
+
+        ax.plot(shown.index, shown.to_numpy(), label="Historic", color="black", linewidth=1.5)
+        ax.plot(dates, [last_price] + list(forecast["Forecast"]), label="Prediction", color="darkorange", linewidth=2)
+        ax.fill_between(dates,
+                        [last_price] + list(forecast["Lower_CI"]),
+                        [last_price] + list(forecast["Upper_CI"]),
+                        color="orange", alpha=0.2, label="Intervalle de Confiance (95%)")
+        ax.set_title(title)
+        ax.legend(loc="upper left")
+        ax.grid(True, linestyle="--", alpha=0.3)
+
+    return cache.get_or_render(key, lambda: _render(draw, figsize))
@@ -1,27 +1,21 @@
-import yfinance as yf
-import pandas as pd
+from quant_app.data.panel import PricePanel
+from quant_app.data.price_store import get_default_store
 
 
-def get_multi_asset_data(tickers, start, end):
+def get_multi_asset_data(tickers, start, end, fill="ffill") -> PricePanel:
     """
     Récupère les prix ajustés de plusieurs actifs.
-    Retourne un DataFrame : dates x tickers
+    Les historiques déjà téléchargés sont lus depuis le stockage local,
+    seules les dates manquantes sont téléchargées.
+    fill = politique de remplissage des prix manquants ("none", "ffill", "interpolate"),
+    la même pour tous les actifs ou {"AAPL": "ffill", ...}
+    Retourne un PricePanel : un tableau contigu actifs x dates sur le calendrier commun,
+    avec le masque des prix observés (to_frame() pour un DataFrame dates x tickers, sans copie)
     """
-    data = yf.download(
-        tickers,
-        start=start,
-        end=end,
-        group_by="ticker",
-        auto_adjust=False
-    )
+    if isinstance(tickers, str):
+        tickers = [tickers]
+    tickers = list(dict.fromkeys(tickers))
 
-    # Multi-actifs
-    if isinstance(tickers, list) and len(tickers) > 1:
-        adj_close = pd.DataFrame(
-            {ticker: data[ticker]["Adj Close"] for ticker in tickers}
-        )
-    else:
-        # Mono-actif
-        adj_close = data["Adj Close"].to_frame(name=tickers[0])
+    data = get_default_store().get_many(tickers, start, end)
 
-    return adj_close
+    return PricePanel.from_series({ticker: data[ticker]["Adj Close"] for ticker in tickers}, fill=fill)
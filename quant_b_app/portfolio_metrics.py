@@ -1,9 +1,11 @@
 import pandas as pd
 import numpy as np
+from quant_app.data.bars import periods_per_year
 
 
 def portfolio_volatility(returns: pd.Series):
-    return returns.std() * np.sqrt(252)
+    # Annualisée selon l'espacement des barres (252 jours, ou barres intraday par an)
+    return returns.std() * np.sqrt(periods_per_year(returns.index))
 
 
 def portfolio_return(portfolio_value: pd.Series):
@@ -12,3 +14,118 @@ def portfolio_return(portfolio_value: pd.Series):
 
 def correlation_matrix(returns: pd.DataFrame):
     return returns.corr()
+
+
+# Mémoire de travail (float64) d'un bloc de dates du moteur de corrélations glissantes
+MAX_CHUNK_BYTES = 64 * 1024 ** 2
+
+
+class RollingCube:
+    """
+    Cube float32 dates x actifs x actifs de covariances ou corrélations glissantes.
+    values peut être un np.memmap sur disque, les tranches par date sont des vues (pas de copie).
+    """
+
+    def __init__(self, values, dates: pd.DatetimeIndex, assets: list):
+        self.values = values
+        self.dates = dates
+        self.assets = list(assets)
+
+    def __len__(self):
+        return len(self.dates)
+
+    def at(self, date) -> pd.DataFrame:
+        """
+        Matrice de la dernière date <= date.
+        """
+        position = self.dates.searchsorted(pd.Timestamp(date), side="right") - 1
+        if position < 0:
+            raise KeyError(f"No window ends before {date}")
+        return pd.DataFrame(self.values[position], index=self.assets, columns=self.assets)
+
+    def slice(self, start=None, end=None) -> "RollingCube":
+        """
+        Sous-cube des dates entre start et end (inclus), sans copie.
+        """
+        first = 0 if start is None else self.dates.searchsorted(pd.Timestamp(start), side="left")
+        last = len(self.dates) if end is None else self.dates.searchsorted(pd.Timestamp(end), side="right")
+        return RollingCube(self.values[first:last], self.dates[first:last], self.assets)
+
+    def pair(self, a, b) -> pd.Series:
+        i, j = self.assets.index(a), self.assets.index(b)
+        return pd.Series(self.values[:, i, j], index=self.dates, name=f"{a}/{b}")
+
+    def average(self) -> pd.Series:
+        """
+        Moyenne des termes hors diagonale à chaque date (corrélation moyenne du portefeuille).
+        """
+        n = len(self.assets)
+        if n < 2:
+            return pd.Series(np.nan, index=self.dates)
+        totals = self.values.sum(axis=(1, 2), dtype=float)
+        diagonal = np.trace(self.values, axis1=1, axis2=2, dtype=float)
+        return pd.Series((totals - diagonal) / (n * (n - 1)), index=self.dates)
+
+
+def rolling_covariance(returns: pd.DataFrame, window=63, correlation=True, path=None) -> RollingCube:
+    """
+    Covariances (ou corrélations) glissantes sur window dates, en O(T x N²) au total :
+    les sommes et produits croisés de la fenêtre sont mis à jour à chaque date
+    (+ nouvelle date, - date sortante) au lieu d'être recalculés fenêtre par fenêtre.
+    Les mises à jour sont vectorisées par blocs de dates, et les sommes sont recalculées
+    exactement au début de chaque bloc pour ne pas accumuler d'erreurs d'arrondi.
+    Le cube ne contient que les dates avec une fenêtre complète.
+    path = fichier .npy : le cube est écrit dans un memmap (grands univers)
+    """
+    if returns.isna().to_numpy().any():
+        raise ValueError("Returns contain NaN values")
+    if window < 2 or window > len(returns):
+        raise ValueError(f"Window must be between 2 and the number of dates ({len(returns)})")
+
+    x = returns.to_numpy(dtype=float)
+    x = x - x.mean(axis=0)
+    n_dates, n_assets = x.shape
+    dates = returns.index[window - 1:]
+    shape = (len(dates), n_assets, n_assets)
+    if path is None:
+        cube = np.empty(shape, dtype=np.float32)
+    else:
+        cube = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=shape)
+
+    chunk = max(1, MAX_CHUNK_BYTES // (8 * n_assets * n_assets))
+    for start in range(window - 1, n_dates, chunk):
+        end = min(n_dates, start + chunk)
+
+        # 1. Sommes exactes de la première fenêtre du bloc
+        first = x[start - window + 1:start + 1]
+        sums = first.sum(axis=0)
+
+        # 2. Sommes des fenêtres suivantes : entrée de x_t, sortie de x_(t-window)
+        entering, leaving = x[start + 1:end], x[start + 1 - window:end - window]
+        window_sums = np.empty((end - start, n_assets))
+        window_sums[0] = sums
+        np.cumsum(entering - leaving, axis=0, out=window_sums[1:])
+        window_sums[1:] += sums
+
+        # 3. Co-moments centrés C_t = X'X - s s' / window : chaque date ajoute une mise à jour de rang 4
+        # x_t x_t' - x_(t-window) x_(t-window)' - (s_t s_t' - s_(t-1) s_(t-1)') / window, puis somme cumulée
+        left = np.stack([entering, leaving, window_sums[1:], window_sums[:-1]], axis=2)
+        right = np.stack([entering, -leaving, -window_sums[1:] / window, window_sums[:-1] / window], axis=1)
+        comoments = np.empty((end - start, n_assets, n_assets))
+        comoments[0] = first.T @ first - np.outer(sums, sums) / window
+        np.matmul(left, right, out=comoments[1:])
+        np.cumsum(comoments, axis=0, out=comoments)
+
+        # 4. Covariance (ddof=1) ou corrélation, écrite directement en float32
+        target = cube[start - window + 1:end - window + 1]
+        if correlation:
+            with np.errstate(invalid="ignore", divide="ignore"):
+                scale = 1 / np.sqrt(np.einsum("tii->ti", comoments))
+            comoments *= scale[:, :, None]
+            np.multiply(comoments, scale[:, None, :], out=target)
+        else:
+            np.multiply(comoments, 1 / (window - 1), out=target)
+
+    if path is not None:
+        cube.flush()
+    return RollingCube(cube, dates, returns.columns)
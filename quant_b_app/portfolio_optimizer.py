@@ -0,0 +1,278 @@
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from quant_app.core.fingerprint import fingerprint
+from quant_app.data.bars import periods_per_year
+
+OBJECTIVES = ("min_variance", "max_sharpe", "risk_parity")
+SHRINKAGES = ("ledoit_wolf", "sample")
+
+# (fingerprint des rendements, shrinkage) -> estimations annualisées et factorisation de Cholesky
+_MAX_CACHED_MOMENTS = 32
+_moments_cache = OrderedDict()
+
+
+def _ledoit_wolf(x: np.ndarray) -> np.ndarray:
+    """
+    Covariance de Ledoit-Wolf (2004) : la covariance empirique est rétrécie vers
+    une matrice identité de même variance moyenne, avec l'intensité optimale en forme fermée.
+    x = rendements centrés (T x N)
+    """
+    t, n = x.shape
+    sample = x.T @ x / t
+    target = np.trace(sample) / n
+
+    delta = ((sample - target * np.eye(n)) ** 2).sum()
+    if delta == 0:
+        return sample
+    # Variance de l'estimateur empirique : moyenne des ||x_t x_t' - S||² / T
+    beta = ((np.einsum("ij,ij->i", x, x) ** 2).sum() / t - (sample ** 2).sum()) / t
+    shrinkage = min(max(beta, 0.0), delta) / delta
+
+    cov = (1 - shrinkage) * sample
+    cov[np.diag_indices(n)] += shrinkage * target
+    return cov
+
+
+def _cho_factor(cov):
+    # scipy est importé au premier calcul, pas au chargement du module
+    from scipy.linalg import cho_factor
+    return cho_factor(cov)
+
+
+def _cho_solve(chol, b) -> np.ndarray:
+    from scipy.linalg import cho_solve
+    return cho_solve(chol, b)
+
+
+def estimate_moments(returns: pd.DataFrame, shrinkage="ledoit_wolf") -> dict:
+    """
+    Rendements moyens et covariance annualisés, calculés une seule fois par matrice de rendements.
+    returns = rendements par barre (compute_returns), annualisés selon l'espacement des dates
+    Retourne un dict : "assets", "mean", "cov" et "chol" (facteur de Cholesky réutilisé par les optimisations)
+    """
+    if shrinkage not in SHRINKAGES:
+        raise ValueError(f"Unknown shrinkage '{shrinkage}', expected one of {SHRINKAGES}")
+
+    key = (fingerprint(returns), shrinkage)
+    moments = _moments_cache.get(key)
+    if moments is not None:
+        _moments_cache.move_to_end(key)
+        return moments
+
+    values = returns.dropna().to_numpy(dtype=float)
+    if len(values) < 2:
+        raise ValueError("Not enough returns to estimate the covariance")
+
+    mean = values.mean(axis=0)
+    centered = values - mean
+    if shrinkage == "ledoit_wolf":
+        cov = _ledoit_wolf(centered)
+    else:
+        cov = centered.T @ centered / (len(values) - 1)
+
+    bars_per_year = periods_per_year(returns.index)
+    mean = mean * bars_per_year
+    cov = cov * bars_per_year
+    moments = {
+        "assets": list(returns.columns),
+        "mean": mean,
+        "cov": cov,
+        "chol": _cho_factor(cov)
+    }
+
+    _moments_cache[key] = moments
+    if len(_moments_cache) > _MAX_CACHED_MOMENTS:
+        _moments_cache.popitem(last=False)
+    return moments
+
+
+def _to_weights(assets, w) -> dict:
+    return {asset: float(weight) for asset, weight in zip(assets, w)}
+
+
+def _solve_qp(cov, a, b, w0, tol=1e-12):
+    """
+    Minimise w' cov w avec a w = b et w >= 0, par ensemble actif primal (Nocedal & Wright, 16.3).
+    w0 doit être admissible : en partant de la solution d'un problème voisin (départ à chaud),
+    seuls quelques actifs entrent ou sortent du portefeuille, chaque étape est un système linéaire
+    sur les actifs non nuls.
+    """
+    n, m = len(w0), len(a)
+    w = w0.astype(float)
+    active = w <= 0
+    w[active] = 0.0
+
+    for _ in range(10 * n + 10):
+        free = np.flatnonzero(~active)
+        k = len(free)
+        gradient = 2 * cov @ w
+
+        # Pas optimal sur les actifs libres : [2 cov_FF, a_F'; a_F, 0] [p; nu] = [-g_F; 0]
+        kkt = np.zeros((k + m, k + m))
+        kkt[:k, :k] = 2 * cov[np.ix_(free, free)]
+        kkt[:k, k:] = a[:, free].T
+        kkt[k:, :k] = a[:, free]
+        rhs = np.concatenate([-gradient[free], np.zeros(m)])
+        try:
+            solution = np.linalg.solve(kkt, rhs)
+        except np.linalg.LinAlgError:
+            solution = np.linalg.lstsq(kkt, rhs, rcond=None)[0]
+        step, nu = solution[:k], solution[k:]
+
+        if np.abs(step).max(initial=0.0) <= tol * max(1.0, np.abs(w).max()):
+            # Multiplicateurs des contraintes w_i >= 0 actives : optimal s'ils sont tous positifs
+            multipliers = gradient + a.T @ nu
+            multipliers[~active] = np.inf
+            i = multipliers.argmin()
+            if multipliers[i] >= -tol * max(1.0, np.abs(gradient).max()):
+                return w
+            active[i] = False
+            continue
+
+        # Pas le plus long qui garde les poids positifs, l'actif bloquant sort du portefeuille
+        decreasing = step < 0
+        ratios = np.full(k, np.inf)
+        ratios[decreasing] = -w[free][decreasing] / step[decreasing]
+        j = ratios.argmin()
+        alpha = min(1.0, ratios[j])
+        w[free] += alpha * step
+        if alpha < 1.0:
+            active[free[j]] = True
+            w[free[j]] = 0.0
+
+    raise ValueError("Optimization failed: the active set did not converge")
+
+
+def _min_variance(moments, long_only=True) -> np.ndarray:
+    n = len(moments["assets"])
+    ones = np.ones(n)
+
+    # Solution en forme fermée : w = cov⁻¹ 1 / 1' cov⁻¹ 1
+    w = _cho_solve(moments["chol"], ones)
+    w /= w.sum()
+    if not long_only or (w >= 0).all():
+        return w
+
+    # Départ à chaud : solution sans contrainte ramenée sur les poids positifs
+    w0 = np.clip(w, 0.0, None)
+    w0 /= w0.sum()
+    w = _solve_qp(moments["cov"], ones[None, :], np.ones(1), w0)
+    return w / w.sum()
+
+
+def _max_sharpe(moments, risk_free_rate=0.0, long_only=True) -> np.ndarray:
+    excess = moments["mean"] - risk_free_rate
+    if (excess <= 0).all():
+        raise ValueError("No asset has an expected return above the risk free rate")
+
+    # Solution en forme fermée : w ∝ cov⁻¹ (mu - rf)
+    w = _cho_solve(moments["chol"], excess)
+    if (not long_only or (w >= 0).all()) and w.sum() > 0:
+        return w / w.sum()
+
+    # Forme quadratique équivalente : min y' cov y avec (mu - rf)' y = 1, y >= 0, puis w = y / sum(y)
+    y0 = np.clip(w, 0.0, None)
+    if y0 @ excess <= 0:
+        y0 = np.clip(excess, 0.0, None)
+    y0 /= y0 @ excess
+    y = _solve_qp(moments["cov"], excess[None, :], np.ones(1), y0)
+    return y / y.sum()
+
+
+def _risk_parity(moments, tol=1e-10, max_iter=1000) -> np.ndarray:
+    """
+    Contributions au risque égales, par descente de coordonnées cyclique (Griveau-Billion et al., 2013) :
+    min 1/2 y' cov y - sum(b log y), chaque coordonnée a une solution en forme fermée, puis w = y / sum(y).
+    """
+    cov = moments["cov"]
+    n = len(cov)
+    budget = 1.0 / n
+    diag = np.diag(cov)
+
+    y = 1 / np.sqrt(diag)
+    cov_y = cov @ y
+    for _ in range(max_iter):
+        previous = y.copy()
+        for i in range(n):
+            c = cov_y[i] - diag[i] * y[i]
+            new = (-c + np.sqrt(c * c + 4 * diag[i] * budget)) / (2 * diag[i])
+            cov_y += cov[:, i] * (new - y[i])
+            y[i] = new
+        if np.abs(y - previous).max() <= tol * np.abs(y).max():
+            break
+    return y / y.sum()
+
+
+def optimize_weights(returns: pd.DataFrame, objective="min_variance", shrinkage="ledoit_wolf",
+                     risk_free_rate=0.0, long_only=True) -> dict:
+    """
+    Poids optimaux du portefeuille, au même format que les poids de l'application.
+    objective = "min_variance", "max_sharpe" ou "risk_parity"
+    risk_free_rate = taux annuel (décimal) utilisé par le max Sharpe
+    long_only = pas de vente à découvert (la parité de risque est toujours long-only)
+    Retourne : {"AAPL": 0.4, ...}
+    """
+    moments = estimate_moments(returns, shrinkage)
+
+    if objective == "min_variance":
+        w = _min_variance(moments, long_only)
+    elif objective == "max_sharpe":
+        w = _max_sharpe(moments, risk_free_rate, long_only)
+    elif objective == "risk_parity":
+        w = _risk_parity(moments)
+    else:
+        raise ValueError(f"Unknown objective '{objective}', expected one of {OBJECTIVES}")
+
+    return _to_weights(moments["assets"], w)
+
+
+def efficient_frontier(returns: pd.DataFrame, n_points=50, shrinkage="ledoit_wolf",
+                       risk_free_rate=0.0, long_only=True) -> pd.DataFrame:
+    """
+    Frontière efficiente : portefeuilles de variance minimale pour n_points rendements cibles,
+    du portefeuille de variance minimale jusqu'au rendement maximal atteignable.
+    Sans contrainte, tous les points viennent de la même factorisation (théorème des deux fonds).
+    En long-only, chaque point part à chaud de la solution du point précédent.
+    Retourne un DataFrame : une ligne par point, "Return", "Volatility", "Sharpe Ratio" puis les poids
+    """
+    moments = estimate_moments(returns, shrinkage)
+    mean, cov = moments["mean"], moments["cov"]
+    n = len(mean)
+    ones = np.ones(n)
+
+    w_min = _min_variance(moments, long_only)
+    targets = np.linspace(w_min @ mean, mean.max(), n_points)
+
+    if not long_only:
+        # w(r) = ((C - rB) cov⁻¹ 1 + (rA - B) cov⁻¹ mu) / D
+        inv_ones = _cho_solve(moments["chol"], ones)
+        inv_mean = _cho_solve(moments["chol"], mean)
+        a, b, c = ones @ inv_ones, ones @ inv_mean, mean @ inv_mean
+        d = a * c - b * b
+        weights = (np.outer(c - targets * b, inv_ones) + np.outer(targets * a - b, inv_mean)) / d
+    else:
+        # Point de départ admissible de chaque cible : point précédent mélangé avec l'actif
+        # de rendement maximal, puis quelques changements d'ensemble actif
+        best = np.flatnonzero(mean == mean.max())
+        top = np.zeros(n)
+        top[best] = 1.0 / len(best)
+        constraints = np.vstack([ones, mean])
+        weights = np.empty((n_points, n))
+        weights[0] = w = w_min
+        for k in range(1, n_points):
+            r = w @ mean
+            alpha = 1.0 if mean.max() - r <= 0 else min(1.0, (targets[k] - r) / (mean.max() - r))
+            w0 = (1 - alpha) * w + alpha * top
+            w = top if alpha >= 1.0 else _solve_qp(cov, constraints, np.array([1.0, targets[k]]), w0)
+            weights[k] = w
+
+    # Rendement et volatilité de tous les points en une passe
+    frontier_returns = weights @ mean
+    volatility = np.sqrt(np.einsum("ij,jk,ik->i", weights, cov, weights))
+    frontier = pd.DataFrame(weights, columns=moments["assets"])
+    frontier.insert(0, "Return", frontier_returns)
+    frontier.insert(1, "Volatility", volatility)
+    frontier.insert(2, "Sharpe Ratio", (frontier_returns - risk_free_rate) / volatility)
+    frontier.index.name = "Point"
+    return frontier
@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+from quant_app.data.panel import PricePanel
+
+SCHEDULES = ("daily", "weekly", "monthly", "threshold")
+
+# Fréquences pandas des rééquilibrages calendaires
+_PERIODS = {"weekly": "W", "monthly": "M"}
+
+
+def _calendar_dates(index: pd.DatetimeIndex, schedule: str) -> np.ndarray:
+    """
+    Positions des rééquilibrages calendaires : le premier jour puis la clôture du dernier jour de chaque période.
+    """
+    if schedule == "daily":
+        return np.arange(len(index))
+    periods = index.to_period(_PERIODS[schedule])
+    ends = np.flatnonzero(periods[1:] != periods[:-1])
+    return np.unique(np.concatenate([[0], ends]))
+
+
+def _threshold_dates(log_growth: np.ndarray, targets: np.ndarray, threshold: float, block=32) -> np.ndarray:
+    """
+    Positions des rééquilibrages à seuil : dès qu'un poids dérivé s'écarte de sa cible de plus de threshold.
+    La dérive d'un segment est calculée par blocs de dates de taille croissante :
+    une boucle Python par rééquilibrage, pas par jour.
+    """
+    n_dates = len(log_growth)
+    dates = [0]
+    while True:
+        r = dates[-1]
+        position, size, found = r + 1, block, None
+        while position < n_dates and found is None:
+            end = min(n_dates, position + size)
+            drifted = targets[r] * np.exp(log_growth[position:end] - log_growth[r])
+            drifted /= drifted.sum(axis=1, keepdims=True)
+            hits = np.flatnonzero(np.abs(drifted - targets[position:end]).max(axis=1) > threshold)
+            if hits.size:
+                found = position + hits[0]
+            position, size = end, size * 2
+        if found is None:
+            return np.array(dates)
+        dates.append(found)
+
+
+def rebalance_portfolio(prices: pd.DataFrame, weights: dict, schedule="monthly", threshold=0.05, cost=0.0,
+                        initial_value=100) -> dict:
+    """
+    Valeur d'un portefeuille rééquilibré périodiquement vers des poids cibles.
+    prices = prix (DataFrame dates x actifs, trous possibles, ou PricePanel), weights = {"AAPL": 0.4, ...}
+    schedule = "daily", "weekly", "monthly" (clôture du dernier jour de la période) ou "threshold"
+    threshold = écart maximal d'un poids à sa cible avant rééquilibrage (schedule="threshold")
+    cost = coût proportionnel au montant échangé (0.001 = 10 pb), hors investissement initial
+
+    Entre deux rééquilibrages les poids dérivent avec les prix. Les données manquantes sont gérées
+    par actif : un trou garde le dernier prix connu (ou la politique de remplissage du PricePanel),
+    un actif pas encore coté est exclu des cibles (poids renormalisés) jusqu'au rééquilibrage
+    suivant sa première cotation.
+    Chaque segment entre deux rééquilibrages est un produit cumulé, calculé pour toutes les dates
+    à la fois à partir des rendements logarithmiques cumulés.
+
+    Retourne un dict :
+    - "value", "returns" : valeur (base initial_value) et rendements journaliers du portefeuille
+    - "weights" : poids de chaque actif après les échanges du jour (dates x actifs)
+    - "turnover", "costs" : montant échangé (en fraction du portefeuille) et coût, aux dates de rééquilibrage
+    """
+    if 0 in prices.shape:
+        raise ValueError("Prices DataFrame is empty")
+    if schedule not in SCHEDULES:
+        raise ValueError(f"Unknown schedule '{schedule}', expected one of {SCHEDULES}")
+
+    if isinstance(prices, PricePanel):
+        # Prix déjà complétés selon la politique de chaque actif, rendements calculés une fois par le panel
+        dates, assets = prices.dates, prices.assets
+        filled, all_returns = prices.values.T, prices.returns().T
+    else:
+        dates, assets = prices.index, prices.columns
+        filled = prices.ffill().to_numpy(dtype=float)
+        all_returns = None
+    w = pd.Series(weights, dtype=float).reindex(assets).fillna(0.0).to_numpy()
+
+    # 1. Cibles : poids renormalisés sur les actifs déjà cotés
+    targets = np.where(np.isnan(filled), 0.0, w)
+    invested = targets.sum(axis=1)
+    if not (invested > 0).any():
+        raise ValueError("No price available for the weighted assets")
+    start = int(np.argmax(invested > 0))
+    index = dates[start:]
+    targets = targets[start:] / invested[start:, None]
+
+    # 2. Rendements logarithmiques cumulés par actif (0 pendant les trous et avant la cotation)
+    if all_returns is None:
+        all_returns = np.full(filled.shape, np.nan)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            np.divide(filled[1:], filled[:-1], out=all_returns[1:])
+        all_returns[1:] -= 1
+    returns = np.nan_to_num(all_returns[start:], nan=0.0)
+    returns[0] = 0.0
+    log_growth = np.log1p(returns)
+    np.cumsum(log_growth, axis=0, out=log_growth)
+
+    # 3. Dates de rééquilibrage et segment de chaque date : (r_k, r_k+1] appartient au segment k
+    if schedule == "threshold":
+        rebalances = _threshold_dates(log_growth, targets, threshold)
+    else:
+        rebalances = _calendar_dates(index, schedule)
+    segment = np.maximum(np.searchsorted(rebalances, np.arange(len(index)), side="left") - 1, 0)
+
+    # 4. Croissance de chaque actif depuis le début de son segment, valeur relative du segment
+    segment_weights = targets[rebalances]
+    growth = np.exp(log_growth - log_growth[rebalances[segment]])
+    holdings = segment_weights[segment] * growth
+    gross = holdings.sum(axis=1)
+
+    # 5. Echanges : des poids dérivés aux cibles, aux dates de rééquilibrage (hors premier jour)
+    drifted = holdings[rebalances[1:]] / gross[rebalances[1:], None]
+    turnover = np.concatenate([[0.0], np.abs(segment_weights[1:] - drifted).sum(axis=1)])
+    kept = 1 - cost * turnover
+
+    # 6. Valeur : produit cumulé des segments, puis valeur du jour dans le segment
+    segment_base = initial_value * np.cumprod(np.concatenate([[1.0], gross[rebalances[1:]]]) * kept)
+    value = segment_base[segment] * gross
+    value[rebalances[1:]] *= kept[1:]
+
+    holdings /= gross[:, None]
+    holdings[rebalances] = segment_weights
+
+    value = pd.Series(value, index=index, name="Portfolio")
+    rebalance_dates = index[rebalances]
+    return {
+        "value": value,
+        "returns": value.pct_change().fillna(value.iloc[0] / initial_value - 1),
+        "weights": pd.DataFrame(holdings, index=index, columns=assets),
+        "turnover": pd.Series(turnover, index=rebalance_dates, name="Turnover"),
+        "costs": pd.Series(cost * turnover * segment_base / kept, index=rebalance_dates, name="Costs")
+    }
@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+
+METHODS = ("bootstrap", "normal", "student")
+
+
+def _portfolio_history(returns: pd.DataFrame, weights: dict) -> np.ndarray:
+    """
+    Rendements historiques du portefeuille (poids fixes, comme compute_portfolio_returns).
+    """
+    w = pd.Series(weights).reindex(returns.columns).fillna(0.0)
+    return returns.to_numpy(dtype=float) @ w.to_numpy()
+
+
+def _draw_returns(method, history, mean, std, n_paths, horizon, block_size, dof, rng):
+    """
+    Tire un bloc de chemins de rendements (n_paths x horizon).
+    """
+    if method == "bootstrap":
+        # Block bootstrap : blocs consécutifs de l'historique, départs aléatoires
+        n_blocks = -(-horizon // block_size)
+        starts = rng.integers(0, len(history) - block_size + 1, size=(n_paths, n_blocks))
+        indices = (starts[:, :, None] + np.arange(block_size)).reshape(n_paths, -1)[:, :horizon]
+        return history[indices]
+
+    draws = rng.standard_normal((n_paths, horizon))
+    if method == "student":
+        # Student multivariée : un facteur chi2 commun par date, variance ramenée à celle de l'historique
+        scale = np.sqrt(rng.chisquare(dof, size=(n_paths, horizon)) / dof)
+        draws *= np.sqrt((dof - 2) / dof) / scale
+    return mean + std * draws
+
+
+def simulate_portfolio(returns: pd.DataFrame, weights: dict, n_paths=100_000, horizon=252, method="bootstrap",
+                       block_size=20, dof=5, chunk_size=10_000, initial_value=100, alpha=0.05,
+                       fan_quantiles=(0.05, 0.25, 0.5, 0.75, 0.95), max_fan_paths=20_000, seed=None) -> dict:
+    """
+    Simule n_paths trajectoires futures de la valeur du portefeuille.
+    returns = rendements journaliers (compute_returns), weights = {"AAPL": 0.4, ...}
+    Méthodes : block bootstrap de l'historique, loi normale ou Student (multivariées).
+    Avec des poids fixes, le rendement du portefeuille est une combinaison linéaire des actifs :
+    la loi multivariée se projette sur les poids, on simule donc directement le rendement du portefeuille.
+    Les chemins sont générés par blocs de chunk_size : la mémoire de travail est bornée
+    (chunk_size x horizon), le temps de calcul est linéaire en n_paths.
+
+    Retourne un dict :
+    - "VaR", "CVaR" : perte sur l'horizon au niveau 1 - alpha (positives = pertes)
+    - "terminal_values", "max_drawdowns" : une valeur par chemin
+    - "drawdown_quantiles" : quantiles des max drawdowns
+    - "fan" : DataFrame (jours x quantiles) pour le fan chart, sur max_fan_paths chemins
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown method '{method}', expected one of {METHODS}")
+    if method == "student" and dof <= 2:
+        raise ValueError("dof must be greater than 2")
+
+    history = _portfolio_history(returns, weights)
+    history = history[~np.isnan(history)]
+    if len(history) < 2:
+        raise ValueError("Not enough returns to simulate")
+    block_size = min(block_size, len(history))
+    mean, std = history.mean(), history.std(ddof=1)
+
+    rng = np.random.default_rng(seed)
+    terminal_values = np.empty(n_paths, dtype=np.float32)
+    max_drawdowns = np.empty(n_paths, dtype=np.float32)
+    n_fan = min(max_fan_paths, n_paths)
+    fan_paths = np.empty((n_fan, horizon + 1), dtype=np.float32)
+    fan_paths[:, 0] = initial_value
+
+    for start in range(0, n_paths, chunk_size):
+        n = min(chunk_size, n_paths - start)
+
+        # 1. Rendements puis valeur des chemins
+        values = _draw_returns(method, history, mean, std, n, horizon, block_size, dof, rng)
+        values += 1
+        np.multiply.accumulate(values, axis=1, out=values)
+        values *= initial_value
+
+        # 2. Statistiques par chemin
+        terminal_values[start:start + n] = values[:, -1]
+        running_max = np.maximum.accumulate(values, axis=1)
+        np.maximum(running_max, initial_value, out=running_max)
+        np.divide(values, running_max, out=running_max)
+        max_drawdowns[start:start + n] = running_max.min(axis=1) - 1
+
+        # 3. Echantillon de chemins pour le fan chart
+        if start < n_fan:
+            kept = min(n, n_fan - start)
+            fan_paths[start:start + kept, 1:] = values[:kept]
+
+    # VaR / CVaR de la perte sur l'horizon
+    losses = 1 - terminal_values.astype(float) / initial_value
+    var = float(np.quantile(losses, 1 - alpha))
+    cvar = float(losses[losses >= var].mean())
+
+    fan = pd.DataFrame(np.quantile(fan_paths, fan_quantiles, axis=0).T, columns=list(fan_quantiles))
+    fan.index.name = "Day"
+
+    return {
+        "VaR": var,
+        "CVaR": cvar,
+        "terminal_values": terminal_values,
+        "max_drawdowns": max_drawdowns,
+        "drawdown_quantiles": pd.Series(np.quantile(max_drawdowns, fan_quantiles), index=list(fan_quantiles)),
+        "fan": fan
+    }
@@ -1,11 +1,17 @@
 import pandas as pd
 import numpy as np
+from quant_app.data.panel import PricePanel
 
 
-def compute_returns(prices: pd.DataFrame) -> pd.DataFrame:
+def compute_returns(prices) -> pd.DataFrame:
     """
     Calcule les rendements journaliers à partir des prix.
+    prices = DataFrame (les dates avec un prix manquant sont supprimées) ou PricePanel :
+    vue sur les rendements du panel, à partir de la première date où tous les actifs sont cotés,
+    les trous étant complétés selon la politique de chaque actif
     """
+    if isinstance(prices, PricePanel):
+        return prices.returns_frame()
     return prices.pct_change().dropna()
 
 
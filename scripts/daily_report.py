@@ -1,56 +1,184 @@
 #scripts/daily_reports
 import sys
 import os
+import json
+import time
+import argparse
+import contextvars
 import datetime
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, as_completed
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from quant_app.data.market_data import get_price 
+from quant_app.data.price_store import get_default_store
+from quant_app.data.economic_data import get_risk_free_curve
 from quant_app.strategies.buy_and_hold import buy_and_hold
-from quant_app.backtesting.metrics import compute_metrics
+from quant_app.strategies.online import advance_states
+from quant_app.backtesting.batch import STRATEGIES
+from quant_app.backtesting.metrics import compute_metrics, format_metrics, _resolve_risk_free_rate
+from quant_app.core.result_cache import get_default_cache
+from quant_app.core import instrumentation
 import config
 
 # Parameters
-TARGET_TICKER = config.DEFAULT_TICKER 
-REPORT_FILE_PATH = os.path.join(os.path.dirname(__file__), '..', 'daily_reports.txt')
+REPORT_FILE_PATH = os.path.join(os.path.dirname(__file__), '..', 'daily_reports.jsonl')
 
-def run_daily_job():
+
+def read_tickers_file(path):
+    """
+    One ticker per line, empty lines and # comments are ignored.
+    """
+    with open(path, encoding="utf-8") as f:
+        lines = [line.split("#")[0].strip() for line in f]
+    return [line for line in lines if line]
+
+
+def report_batch(tickers, start_date, today):
+    """
+    Fetch a batch of tickers (one provider call per missing range) and compute one record per ticker.
+    The history since config.DEFAULT_START_DATE is fetched for the online strategies, whose states are
+    shared with the background scheduler (same history start); the metrics use the dates since start_date.
+    """
+    # 1. Download
+    t0 = time.perf_counter()
+    try:
+        data = get_default_store().get_many(tickers, str(min(start_date, config.DEFAULT_START_DATE)), str(today))
+        fetch_error = None
+    except Exception as e:
+        data, fetch_error = {}, str(e)
+    fetch_time = (time.perf_counter() - t0) / len(tickers)
+
+    # 2. Computation
+    records = []
+    for ticker in tickers:
+        t1 = time.perf_counter()
+        record = {"date": str(today), "ticker": ticker, "status": "ok", "error": None}
+        try:
+            if fetch_error is not None:
+                raise RuntimeError(fetch_error)
+            history = data[ticker][["Close"]].rename(columns={"Close": ticker}).dropna()
+            df = history[history.index >= pd.Timestamp(start_date)]
+            if df.empty:
+                raise ValueError("No data")
+
+            # B&H simulation to have the metrics, read back when these prices were already reported
+            risk_free_rate = _resolve_risk_free_rate(None, df.index)
+            metrics = get_default_cache().get_or_compute(
+                [buy_and_hold, compute_metrics], [df], {"risk_free_rate": risk_free_rate},
+                lambda: {"metrics": pd.DataFrame([compute_metrics(buy_and_hold(df), risk_free_rate=risk_free_rate)])}
+            )["metrics"].iloc[0].to_dict()
+            record["close"] = float(df.iloc[-1, 0])
+            # Positions for the next session, the saved online states only replay the new prices
+            positions = advance_states(ticker, history, {name: params for name, (_, params) in STRATEGIES.items()})
+            record["positions"] = positions["Position"].to_dict()
+            record["metrics"] = {name: (None if np.isnan(value) else float(value)) for name, value in metrics.items()}
+        except Exception as e:
+            record["status"] = "error"
+            record["error"] = str(e)
+        record["timings"] = {"fetch": fetch_time, "compute": time.perf_counter() - t1}
+        records.append(record)
+    return records
+
+
+def upsert_records(path, records):
+    """
+    Write the records in the JSONL report, one line per (date, ticker): a rerun replaces the lines of the day.
+    """
+    existing = {}
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    existing[(record["date"], record["ticker"])] = record
+
+    for record in records:
+        existing[(record["date"], record["ticker"])] = record
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for key in sorted(existing):
+            f.write(json.dumps(existing[key]) + "\n")
+    os.replace(tmp_path, path)
+
+
+def log_timings(recorder, today):
+    """
+    Spans and counters of the run as JSON lines on stdout (QUANT_INSTRUMENTATION=1), one event per line.
+    """
+    for row in recorder.records():
+        print(json.dumps({"date": str(today), **row}))
+
+
+def run_daily_job(tickers=None, workers=config.REPORT_WORKERS, batch_size=config.REPORT_BATCH_SIZE, output=REPORT_FILE_PATH):
+    with instrumentation.recording() as recorder:
+        records = _run_daily_job(tickers, workers, batch_size, output)
+    if instrumentation.ENABLED:
+        log_timings(recorder, datetime.date.today())
+    return records
+
+
+def _run_daily_job(tickers, workers, batch_size, output):
     print(f"⏰ Starting computation for the report of : {datetime.datetime.now()}")
-    
+    started = time.perf_counter()
+    tickers = list(dict.fromkeys(tickers or config.REPORT_TICKERS))
+
     # 1. Dates
     today = datetime.date.today()
     start_date = today - datetime.timedelta(days=365)
-    
+
+    # Risk free curve refreshed once for the run (at most once per config.RISK_FREE_TTL), the batches read it from disk
     try:
-        # 2. Download
-        print(f"📥 Downloading data for {TARGET_TICKER}...")
-        df = get_price(TARGET_TICKER, str(start_date), str(today))
-        
-        if df.empty:
-            print("⚠️ Error : No data.")
-            return
-
-        # 3. COmputation
-        current_price = df.iloc[-1]
-        
-        # B&H simulation to have the metrics
-        cum_bh = buy_and_hold(df)
-        metrics = compute_metrics(cum_bh)
-        
-        # 4. Report writing
-        with open(REPORT_FILE_PATH, "a", encoding="utf-8") as f:
-            f.write(f"\n========================================\n")
-            f.write(f"📅 DAILY REPORT - {today}\n")
-            f.write(f"========================================\n")
-            f.write(f"🔹 Asset            : {TARGET_TICKER}\n")
-            f.write(f"💰 Closing price  : {current_price:.2f} $\n")
-            f.write(f"📈 Performance (1Y) : {metrics.get('Total Return', 'N/A')}\n")
-            f.write(f"📉 Max Drawdown     : {metrics.get('Max Drawdown', 'N/A')}\n")
-            f.write(f"📊 Volatility       : {metrics.get('Volatility', 'N/A')}\n")
-            f.write(f"----------------------------------------\n")
-            
-        print(f"✅ Report wrote with success in {REPORT_FILE_PATH}")
-        
+        get_risk_free_curve()
     except Exception as e:
-        print(f"❌ Critical Error : {e}")
+        print(f"Risk free rate refresh failed: {e}")
+
+    # 2. Download and computation, batches of tickers in a bounded pool
+    print(f"📥 Processing {len(tickers)} tickers with {workers} workers...")
+    batches = [tickers[i:i + batch_size] for i in range(0, len(tickers), batch_size)]
+    records = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # Each batch runs in a copy of the current context, so its spans go to the run recorder
+        futures = [executor.submit(contextvars.copy_context().run, report_batch, batch, start_date, today) for batch in batches]
+        for future in as_completed(futures):
+            records.extend(future.result())
+
+    # 3. Report writing
+    t0 = time.perf_counter()
+    with instrumentation.span("report.write"):
+        upsert_records(output, records)
+    write_time = time.perf_counter() - t0
+
+    # 4. Summary
+    failed = [r for r in records if r["status"] != "ok"]
+    for record in sorted(records, key=lambda r: r["ticker"]):
+        if record["status"] == "ok":
+            metrics = format_metrics({k: (np.nan if v is None else v) for k, v in record["metrics"].items()})
+            print(f"🔹 {record['ticker']:<8} {record['close']:>10.2f} $  1Y: {metrics['Total Return']:>8}  MDD: {metrics['Max Drawdown']:>8}  Vol: {metrics['Volatility']:>8}")
+        else:
+            print(f"⚠️ {record['ticker']:<8} {record['error']}")
+
+    timings = {stage: sum(r["timings"][stage] for r in records) for stage in ("fetch", "compute")}
+    timings["write"] = write_time
+    print("⏱️ Stage timings (s): " + ", ".join(f"{stage}={seconds:.2f}" for stage, seconds in timings.items())
+          + f", wall={time.perf_counter() - started:.2f}")
+    print(f"✅ {len(records) - len(failed)}/{len(records)} records wrote with success in {output}")
+    return records
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Daily report of a list of tickers (JSONL, one record per ticker and date)")
+    parser.add_argument("--tickers", nargs="+", help="tickers to report (default: config.REPORT_TICKERS)")
+    parser.add_argument("--tickers-file", help="file with one ticker per line")
+    parser.add_argument("--workers", type=int, default=config.REPORT_WORKERS, help="size of the worker pool")
+    parser.add_argument("--batch-size", type=int, default=config.REPORT_BATCH_SIZE, help="tickers per download batch")
+    parser.add_argument("--output", default=REPORT_FILE_PATH, help="JSONL report file")
+    return parser.parse_args(argv)
+
 
 if __name__ == "__main__":
-    run_daily_job()
\ No newline at end of file
+    args = parse_args()
+    tickers = list(args.tickers or [])
+    if args.tickers_file:
+        tickers += read_tickers_file(args.tickers_file)
+    run_daily_job(tickers or None, workers=args.workers, batch_size=args.batch_size, output=args.output)
@@ -0,0 +1,34 @@
+# tests/test_kernels.py
+import numpy as np
+import pandas as pd
+import pytest
+from quant_app.backtesting.batch import STRATEGIES
+from quant_app.backtesting.execution import ExecutionModel
+from quant_app.strategies import kernels
+
+EXECUTIONS = [
+    None,
+    ExecutionModel(commission=0.001, slippage=0.0005),
+    ExecutionModel(commission=0.0005, slippage=0.5, slippage_model="volatility")
+]
+
+
+def _prices(gaps=False):
+    rng = np.random.default_rng(1)
+    values = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (600, 4)), axis=0))
+    prices = pd.DataFrame(values, index=pd.bdate_range("2020-01-01", periods=600), columns=list("ABCD"))
+    if gaps:
+        prices.iloc[250, 1] = np.nan
+        prices.iloc[400:403, 2] = np.nan
+    return prices
+
+
+@pytest.mark.parametrize("gaps", [False, True])
+@pytest.mark.parametrize("execution", EXECUTIONS)
+@pytest.mark.parametrize("name", list(STRATEGIES))
+def test_kernels_match_dataframe_strategies(name, execution, gaps):
+    prices = _prices(gaps)
+    function, params = STRATEGIES[name]
+    expected = function(prices, execution=execution, **params).to_numpy().T
+    curves = kernels.strategy_curves(name, kernels.panel_values(prices), params, execution)
+    np.testing.assert_allclose(curves, expected, rtol=1e-12, atol=1e-12)
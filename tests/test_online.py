@@ -0,0 +1,50 @@
+# tests/test_online.py
+import numpy as np
+import pandas as pd
+import pytest
+from quant_app.backtesting.batch import STRATEGIES
+from quant_app.strategies.online import ONLINE_STRATEGIES, OnlineStrategy, advance_states
+
+
+def _prices():
+    rng = np.random.default_rng(2)
+    values = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 600)))
+    return pd.DataFrame({"X": values}, index=pd.bdate_range("2020-01-01", periods=600))
+
+
+@pytest.mark.parametrize("name", list(STRATEGIES))
+def test_online_replay_matches_batch(name):
+    prices = _prices()
+    function, params = STRATEGIES[name]
+    expected = function(prices, **params).iloc[:, 0]
+
+    equity = ONLINE_STRATEGIES[name](**params).advance(prices)
+    # The batch curve starts with NaN where the online equity starts at 1.0
+    np.testing.assert_array_equal(equity.iloc[1:].to_numpy(), expected.iloc[1:].to_numpy())
+
+
+@pytest.mark.parametrize("name", list(STRATEGIES))
+def test_online_state_resumes_after_save(name, tmp_path):
+    prices = _prices()
+    params = STRATEGIES[name][1]
+    full = ONLINE_STRATEGIES[name](**params)
+    full.advance(prices)
+
+    partial = ONLINE_STRATEGIES[name](**params)
+    partial.advance(prices.iloc[:350])
+    partial.save(str(tmp_path / "state.json"))
+    resumed = OnlineStrategy.load(str(tmp_path / "state.json"))
+    resumed.advance(prices)
+
+    assert resumed.equity == full.equity
+    assert resumed.position == full.position
+
+
+def test_advance_states_replays_only_new_prices(tmp_path):
+    prices = _prices()
+    strategies = {name: params for name, (_, params) in STRATEGIES.items()}
+    advance_states("X", prices.iloc[:500], strategies, str(tmp_path))
+    resumed = advance_states("X", prices, strategies, str(tmp_path))
+
+    expected = pd.DataFrame({name: function(prices, **params).iloc[:, 0] for name, (function, params) in STRATEGIES.items()})
+    np.testing.assert_array_equal(resumed["Equity"].to_numpy(), expected.iloc[-1].to_numpy())
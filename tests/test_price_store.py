@@ -0,0 +1,41 @@
+# tests/test_price_store.py
+import numpy as np
+import pandas as pd
+from quant_app.data.price_store import PriceStore
+from quant_app.data.providers import CSVProvider
+
+
+def _write_fixture(directory, ticker="TEST"):
+    dates = pd.bdate_range("2019-01-01", "2025-12-31", name="Date")
+    close = 100 + np.arange(len(dates), dtype=float)
+    pd.DataFrame({"Close": close, "Adj Close": close}, index=dates).to_csv(directory / f"{ticker}.csv")
+    return dates
+
+
+def test_non_overlapping_requests_leave_no_gap(tmp_path):
+    fixtures = tmp_path / "fixtures"
+    fixtures.mkdir()
+    dates = _write_fixture(fixtures)
+    store = PriceStore(str(tmp_path / "store"), CSVProvider(str(fixtures)))
+
+    store.get("TEST", "2020-01-01", "2021-01-01")
+    store.get("TEST", "2023-01-01", "2024-01-01")
+    df = store.get("TEST", "2021-06-01", "2022-06-01")
+
+    expected = dates[(dates >= "2021-06-01") & (dates < "2022-06-01")]
+    assert len(df) == len(expected)
+    assert (df.index == expected).all()
+
+
+def test_request_before_coverage_fills_up_to_it(tmp_path):
+    fixtures = tmp_path / "fixtures"
+    fixtures.mkdir()
+    dates = _write_fixture(fixtures)
+    store = PriceStore(str(tmp_path / "store"), CSVProvider(str(fixtures)))
+
+    store.get("TEST", "2023-01-01", "2024-01-01")
+    store.get("TEST", "2020-01-01", "2021-01-01")
+    df = store.get("TEST", "2021-06-01", "2022-06-01")
+
+    expected = dates[(dates >= "2021-06-01") & (dates < "2022-06-01")]
+    assert len(df) == len(expected)
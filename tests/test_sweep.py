@@ -0,0 +1,32 @@
+# tests/test_sweep.py
+import numpy as np
+import pandas as pd
+from quant_app.backtesting.metrics import compute_metrics
+from quant_app.backtesting.sweep import mean_reversion_sweep, momentum_sweep
+from quant_app.strategies.mean_reversion import mean_reversion
+from quant_app.strategies.momentum import momentum
+
+
+def _prices(gap=None):
+    rng = np.random.default_rng(0)
+    prices = pd.DataFrame({"X": 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 1000)))},
+                          index=pd.bdate_range("2020-01-01", periods=1000))
+    if gap is not None:
+        prices.iloc[gap] = np.nan
+    return prices
+
+
+def test_momentum_sweep_matches_strategy_across_a_gap():
+    prices = _prices(gap=300)
+    surfaces = momentum_sweep(prices, [10], [60], risk_free_rate=0.0)
+    expected = compute_metrics(momentum(prices, 10, 60), risk_free_rate=0.0)
+    for name in ("Total Return", "Sharpe Ratio", "Max Drawdown"):
+        assert np.isclose(surfaces[name].loc[10, 60], expected[name], rtol=1e-9)
+
+
+def test_mean_reversion_sweep_matches_strategy_across_a_gap():
+    prices = _prices(gap=300)
+    surfaces = mean_reversion_sweep(prices, [20], [2.0], risk_free_rate=0.0)
+    expected = compute_metrics(mean_reversion(prices, 20, 2.0), risk_free_rate=0.0)
+    for name in ("Total Return", "Sharpe Ratio", "Max Drawdown"):
+        assert np.isclose(surfaces[name].iloc[0, 0], expected[name], rtol=1e-9)